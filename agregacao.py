@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from ranking import maiores_posicoes
+
+# ============================================================================
+# AGREGAÇÃO BASE COMPARTILHADA
+# ============================================================================
+#
+# Cada combinação de filtros produz uma única agregação base na granularidade
+# estado × ano (a fatia do cubo). Mapa, série temporal, top 10, pizza, tabela
+# e métricas são reduções baratas dessa matriz: nenhum callback volta a
+# percorrer a tabela de fatos. A matriz vem do motor de consultas configurado
+# (o cubo, pandas ou DuckDB; consultas.py).
+
+
+class AgregadoFiltrado:
+    """Agregação estado × ano dos filtros atuais e todas as visões derivadas dela"""
+
+    def __init__(self, motor, range_ano, regioes_selecionadas, estados_selecionados):
+        inicio = time.perf_counter()
+        consulta = motor.consultar(range_ano[0], range_ano[1],
+                                  regioes_selecionadas, estados_selecionados)
+        self.consulta = consulta
+        fim_filtro = time.perf_counter()
+
+        # Reduções sobre a matriz estado × ano
+        self.totais = consulta.totais
+        anos_presentes = consulta.presente.any(axis=0)
+        self.anos = consulta.anos[anos_presentes]
+        self.serie = consulta.producao.sum(axis=0)[anos_presentes]
+
+        regiao_id = motor.regiao_id[consulta.indices]
+        n_regioes = len(motor.nomes_regioes)
+        self.totais_regiao = np.zeros(n_regioes, dtype=np.int64)
+        np.add.at(self.totais_regiao, regiao_id, self.totais)
+        regioes_presentes = np.bincount(regiao_id, minlength=n_regioes) > 0
+
+        self.metricas = calcular_metricas(self)
+
+        # Visões rotuladas: junção com a dimensão apenas para exibição
+        self.df_totais = consulta.totais_por_estado()
+        self.df_serie = pd.DataFrame({'ano': self.anos, 'producao': self.serie})
+        self.df_regiao = pd.DataFrame({
+            'regiao': np.asarray(motor.nomes_regioes, dtype=object)[regioes_presentes],
+            'producao': self.totais_regiao[regioes_presentes]
+        })
+        self.df_filtrado = consulta.para_dataframe()
+
+        # Duração de cada etapa (segundos), exposta pela instrumentação
+        self.tempos = {'filtro': fim_filtro - inicio, 'agregacao': time.perf_counter() - fim_filtro}
+
+    def ranking_estados(self, k):
+        """Os k estados de maior produção na janela, do maior para o menor (seleção parcial)"""
+        return self.df_totais.iloc[maiores_posicoes(self.totais, k)]
+
+
+def calcular_metricas(agregado):
+    """Calcula métricas principais do dashboard"""
+    if agregado.consulta.vazia:
+        return {
+            'producao_total': 0,
+            'media_anual': 0,
+            'estado_lider': 'N/A',
+            'crescimento': 0
+        }
+
+    producao_total = agregado.totais.sum()
+    media_anual = agregado.serie.mean()
+
+    # Estado líder: top-1 da seleção parcial, sem ordenar os totais
+    lider = agregado.consulta.indices[maiores_posicoes(agregado.totais, 1)[0]]
+    estado_lider = agregado.consulta.cubo.dimensao['estado'].iat[lider]
+
+    # Crescimento (primeiro vs último ano disponível)
+    if len(agregado.serie) >= 2:
+        prod_inicial = agregado.serie[0]
+        prod_final = agregado.serie[-1]
+        crescimento = ((prod_final - prod_inicial) / prod_inicial * 100) if prod_inicial > 0 else 0
+    else:
+        crescimento = 0
+
+    return {
+        'producao_total': producao_total,
+        'media_anual': media_anual,
+        'estado_lider': estado_lider,
+        'crescimento': crescimento
+    }
@@ -1,12 +1,34 @@
 
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.express as px
+from dash import dcc, html, dash_table, Input, Output, State, ClientsideFunction, callback
+from dash.exceptions import PreventUpdate
+from dash.dash_table.Format import Format
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 import json
 import dash_bootstrap_components as dbc
 from dash_bootstrap_templates import load_figure_template
+from agregacao import AgregadoFiltrado
+from figuras import (montar_esqueletos, figura_mapa, figura_coropletico, figura_serie,
+                     figura_top, figura_regiao)
+from tabela import filtrar_tabela, criterios_ordenacao, pagina_tabela
+from recarga import RecarregadorDados, montar_base
+from ingestao import registrar_ingestao
+from geometria import ler_geojson, publicar_geojson
+from simplificacao import carregar_niveis, nivel_para_zoom
+from cache_resultados import CacheResultados, normalizar_filtros
+from serializacao import configurar_motor_json, registrar_cache_respostas
+from compressao import EstatisticasCompressao, registrar_compressao
+from instrumentacao import (registrar_instrumentacao, instrumentar_callback, medir_etapa,
+                            registrar_etapa)
+from config import (ENABLE_CACHING, CACHE_TIMEOUT, MAX_FILTER_COMBINATIONS,
+                    MAX_RECORDS_TABLE, MAP_CENTER, MAP_ZOOM, CLIENTSIDE_FILTERING,
+                    JSON_ENGINE, CACHE_RESPONSES, DATA_GEOJSON,
+                    MAP_MODE, COMPRESS_RESPONSES, COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL,
+                    COMPRESS_BROTLI_QUALITY, METRICS_ENABLED, HOST, PORT, DEBUG,
+                    SHARED_MEMORY, SHARED_MEMORY_DIR, DATA_RELOAD, DATA_RELOAD_INTERVAL,
+                    INGEST_TOKEN, QUERY_ENGINE)
 
 # ============================================================================
 # CONFIGURAÇÃO INICIAL
@@ -22,21 +44,131 @@ from dash_bootstrap_templates import load_figure_template, ThemeSwitchAIO
 app = dash.Dash(__name__)#, external_stylesheets=[dbc.themes.DARKLY])
 #app = dash.Dash(__name__)
 
+# Aplicação WSGI para servidores de produção (gunicorn -c gunicorn.conf.py app:server)
+server = app.server
+
+# Motor JSON das respostas (orjson quando instalado)
+configurar_motor_json(JSON_ENGINE)
+
 # ============================================================================
 # CARREGAMENTO DE DADOS
 # ============================================================================
 
-# Carregar dados de produção
-df = pd.read_csv('dados_algodao.csv')
-
 # Carregar GeoJSON dos estados
-with open('brasil_estados_poligonos.geojson', 'r') as f:
-    geojson_brasil = json.load(f)
+geojson_brasil = ler_geojson(DATA_GEOJSON)
+
+# Geometria simplificada por nível de zoom (TopoJSON gerado por simplificacao.py), servida
+# uma única vez em URLs versionadas: o mapa coroplético só referencia a URL do nível
+urls_geojson = {
+    zoom: publicar_geojson(app.server, geojson_nivel, app.config.routes_pathname_prefix,
+                           app.config.requests_pathname_prefix, nome=f'estados_z{zoom}')
+    for zoom, geojson_nivel in carregar_niveis(DATA_GEOJSON).items()
+}
+
+# Caches por combinação de filtros: agregado compartilhado e saídas de cada callback
+cache_agregados = CacheResultados(MAX_FILTER_COMBINATIONS, CACHE_TIMEOUT, ativo=ENABLE_CACHING)
+cache_saidas = CacheResultados(MAX_FILTER_COMBINATIONS, CACHE_TIMEOUT, ativo=ENABLE_CACHING)
+
+# Respostas HTTP dos callbacks: JSON já serializado, corpos comprimidos e bytes por callback
+ROTA_CALLBACKS = app.config.routes_pathname_prefix + '_dash-update-component'
+estatisticas_compressao = EstatisticasCompressao()
+cache_compressao = CacheResultados(MAX_FILTER_COMBINATIONS, CACHE_TIMEOUT, ativo=ENABLE_CACHING)
+cache_respostas = CacheResultados(MAX_FILTER_COMBINATIONS, CACHE_TIMEOUT, ativo=ENABLE_CACHING)
+
+
+def atualizar_caches(anterior, base):
+    """Descarta os resultados da versão anterior que dependem dos anos alterados
+
+    Depois de uma revisão incremental (base.anos_alterados), agregados e saídas
+    cuja janela de anos não contém nenhum ano alterado continuam válidos e
+    passam para a chave da versão nova. As respostas serializadas não guardam
+    a janela na chave e são descartadas (refazê-las a partir das saídas custa
+    só a serialização).
+    """
+    cache_respostas.limpar()
+    if base.anos_alterados is None:
+        cache_agregados.limpar()
+        cache_saidas.limpar()
+        return
+
+    def intacta(janela):
+        return not any(janela[0] <= ano <= janela[1] for ano in base.anos_alterados)
+
+    # Chaves: (versão, janela, ...) nos agregados e (nome, versão, janela, ...) nas saídas
+    cache_agregados.migrar(lambda chave: (base.versao,) + chave[1:]
+                           if chave[0] == anterior.versao and intacta(chave[1]) else None)
+    cache_saidas.migrar(lambda chave: (chave[0], base.versao) + chave[2:]
+                        if chave[1] == anterior.versao and intacta(chave[2]) else None)
+
+
+# Dados de produção (formato colunar mapeado em memória, gerado a partir do CSV) e o cubo
+# estado × ano com somas prefixas, montado na inicialização ou, com SHARED_MEMORY, anexado
+# somente para leitura ao segmento compartilhado pelos processos. Com DATA_RELOAD, uma
+# thread troca a base inteira quando o CSV muda, sem reiniciar o servidor, e aplica as
+# revisões ingeridas (ingestao.py) ao cubo atual.
+recarregador = RecarregadorDados(
+    lambda anterior=None: montar_base(memoria_compartilhada=SHARED_MEMORY,
+                                      diretorio_segmento=SHARED_MEMORY_DIR, anterior=anterior,
+                                      motor=QUERY_ENGINE),
+    intervalo=DATA_RELOAD_INTERVAL, ao_trocar=[atualizar_caches])
+
+
+def base_atual():
+    """Versão dos dados em uso (leia uma vez e use a mesma base até o fim do cálculo)"""
+    return recarregador.atual
+
+
+# Os hooks do Flask são registrados na ordem: instrumentação, compressão e cache de
+# respostas. Os before_request rodam nessa ordem e os after_request na inversa, então
+# a latência medida inclui tudo, o cache guarda o JSON original e a compressão é
+# aplicada por último.
+
+# Métricas dos callbacks (latência por etapa, tamanho das respostas, caches) em /metrics
+if METRICS_ENABLED:
+    registrar_instrumentacao(app.server, ROTA_CALLBACKS,
+                             app.config.routes_pathname_prefix + 'metrics',
+                             caches={'agregados': cache_agregados, 'saidas': cache_saidas,
+                                     'respostas': cache_respostas, 'compressao': cache_compressao},
+                             compressao=estatisticas_compressao)
+
+# Compressão gzip/brotli das respostas, com os bytes originais e enviados por callback
+if COMPRESS_RESPONSES:
+    registrar_compressao(app.server, ROTA_CALLBACKS, COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL,
+                         COMPRESS_BROTLI_QUALITY,
+                         cache=cache_compressao if ENABLE_CACHING else None,
+                         estatisticas=estatisticas_compressao)
+
+# JSON já serializado das respostas dos callbacks, por corpo de requisição
+if ENABLE_CACHING and CACHE_RESPONSES:
+    registrar_cache_respostas(app.server, cache_respostas, ROTA_CALLBACKS,
+                              versao=lambda: base_atual().versao)
+
+# Verificação periódica dos dados, iniciada no primeiro request de cada processo
+# (após o fork, nos workers do gunicorn)
+if DATA_RELOAD:
+    app.server.before_request(recarregador.iniciar)
+
+# Ingestão de revisões (ano, sigla, producao) por POST, só com INGEST_TOKEN definido
+if INGEST_TOKEN:
+    registrar_ingestao(app.server, app.config.routes_pathname_prefix + 'api/ingestao',
+                       recarregador, INGEST_TOKEN)
+
+# Configuração de cada tema, enviada uma única vez ao navegador
+TEMAS = {
+    'bootstrap': {
+        'href': dbc.themes.BOOTSTRAP,
+        'mapbox_style': 'carto-positron',
+        'template': pio.templates['bootstrap'].to_plotly_json()
+    },
+    'darkly': {
+        'href': dbc.themes.DARKLY,
+        'mapbox_style': 'carto-darkmatter',
+        'template': pio.templates['darkly'].to_plotly_json()
+    }
+}
 
-# Preparar listas para filtros
-anos = sorted(df['ano'].unique())
-regioes = sorted(df['regiao'].unique())
-estados = sorted(df['estado'].unique())
+# Layouts de cada gráfico montados uma única vez por tema
+ESQUELETOS = montar_esqueletos(TEMAS, MAP_CENTER, MAP_ZOOM)
 
 # ============================================================================
 # FUNÇÕES AUXILIARES
@@ -51,483 +183,526 @@ def formatar_numero(num):
     else:
         return str(num)
 
-def calcular_metricas(df_filtrado):
-    """Calcula métricas principais do dashboard"""
-    if df_filtrado.empty:
-        return {
-            'producao_total': 0,
-            'media_anual': 0,
-            'estado_lider': 'N/A',
-            'crescimento': 0
-        }
-
-    producao_total = df_filtrado['producao'].sum()
-    media_anual = df_filtrado.groupby('ano')['producao'].sum().mean()
-
-    # Estado líder
-    estado_lider = df_filtrado.groupby('estado')['producao'].sum().idxmax()
-
-    # Crescimento (primeiro vs último ano disponível)
-    anos_disp = sorted(df_filtrado['ano'].unique())
-    if len(anos_disp) >= 2:
-        prod_inicial = df_filtrado[df_filtrado['ano'] == anos_disp[0]]['producao'].sum()
-        prod_final = df_filtrado[df_filtrado['ano'] == anos_disp[-1]]['producao'].sum()
-        crescimento = ((prod_final - prod_inicial) / prod_inicial * 100) if prod_inicial > 0 else 0
-    else:
-        crescimento = 0
-
-    return {
-        'producao_total': producao_total,
-        'media_anual': media_anual,
-        'estado_lider': estado_lider,
-        'crescimento': crescimento
-    }
+def codificar_dados_navegador(base):
+    """Cubo e dimensões em colunas compactas para os callbacks clientside"""
+    colunas = base.cubo.para_colunas()
+    colunas['mapa_centro'] = MAP_CENTER
+    colunas['mapa_zoom'] = MAP_ZOOM
+    colunas['geojson_urls'] = urls_geojson
+    colunas['colunas_tabela'] = ['estado', 'regiao', 'ano', 'producao']
+    return colunas
 
 #html.Link(rel="stylesheet", href=dbc.themes.BOOTSTRAP, id="theme-link")
 
 
-@callback(
-    Output('theme-link', 'href'),
-    Input('theme-store', 'data')
-)
-def alternar_tema_css(theme_data):
-    if theme_data is None:
-        return dbc.themes.BOOTSTRAP  # fallback padrão
-    tema = theme_data.get('theme', 'bootstrap')
-    if tema == 'darkly':
-        return dbc.themes.DARKLY
-    return dbc.themes.BOOTSTRAP
-
 # ============================================================================
 # LAYOUT DO DASHBOARD
 # ============================================================================
 
-app.layout = html.Div([
-    # Inclusão dinâmica do tema via href
-    html.Link(rel="stylesheet", href=dbc.themes.BOOTSTRAP, id="theme-link"),
+def montar_layout():
+    """Layout de cada nova sessão, com os limites dos filtros da versão atual dos dados"""
+    base = base_atual()
+    anos, regioes, estados = base.anos, base.regioes, base.estados
+
+    return html.Div([
+        # Inclusão dinâmica do tema via href
+        html.Link(rel="stylesheet", href=dbc.themes.BOOTSTRAP, id="theme-link"),
     
 
-    dbc.Container([
-        # Header
-        dbc.Row([
-            dbc.Col([
-                html.Div([
-                    html.H1("🌱 Dashboard Produção de Algodão - Brasil", 
-                           className="text-center mb-0"),
-                    html.P("Análise da série histórica de produção por estados e regiões",
-                           className="text-center text-muted mb-3"),
-                    dbc.Button(id="dark-mode-toggle", color="secondary", size="sm",
-                        className="position-absolute", style={"top": "10px", "right": "10px"})
-                ], style={"position": "relative"})
-            ])
-        ], className="mb-4"),
-
-        # Filtros
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("🎛️ Filtros", className="card-title"),
-                        html.Label("📅 Período:", className="fw-bold"),
-                        dcc.RangeSlider(
-                            id='range-slider-ano',
-                            min=min(anos),
-                            max=max(anos),
-                            value=[min(anos), max(anos)],
-                            marks={ano: str(ano) for ano in range(min(anos), max(anos)+1, 5)},
-                            step=1,
-                            tooltip={"placement": "bottom", "always_visible": True}
-                        ),
-                        html.Br(),
-                        dbc.Row([
-                            dbc.Col([
-                                html.Label("🗺️ Regiões:", className="fw-bold"),
-                                dcc.Dropdown(
-                                    id='dropdown-regiao',
-                                    options=[{'label': regiao, 'value': regiao} for regiao in regioes],
-                                    multi=True,
-                                    placeholder="Todas as regiões"
-                                )
-                            ], md=4),
-                            dbc.Col([
-                                html.Label("📍 Estados:", className="fw-bold"),
-                                dcc.Dropdown(
-                                    id='dropdown-estado',
-                                    options=[{'label': estado, 'value': estado} for estado in estados],
-                                    multi=True,
-                                    placeholder="Todos os estados"
-                                )
-                            ], md=4),
-                            dbc.Col([
-                                html.Label("📊 Ordenar por:", className="fw-bold"),
-                                dcc.Dropdown(
-                                    id='dropdown-ordenacao',
-                                    options=[
-                                        {'label': 'Produção Total', 'value': 'producao'},
-                                        {'label': 'Nome do Estado', 'value': 'estado'},
-                                        {'label': 'Região', 'value': 'regiao'}
-                                    ],
-                                    value='producao',
-                                    clearable=False
-                                )
-                            ], md=4)
+        dbc.Container([
+            # Header
+            dbc.Row([
+                dbc.Col([
+                    html.Div([
+                        html.H1("🌱 Dashboard Produção de Algodão - Brasil", 
+                               className="text-center mb-0"),
+                        html.P("Análise da série histórica de produção por estados e regiões",
+                               className="text-center text-muted mb-3"),
+                        dbc.Button(id="dark-mode-toggle", color="secondary", size="sm",
+                            className="position-absolute", style={"top": "10px", "right": "10px"})
+                    ], style={"position": "relative"})
+                ])
+            ], className="mb-4"),
+
+            # Filtros
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H5("🎛️ Filtros", className="card-title"),
+                            html.Label("📅 Período:", className="fw-bold"),
+                            dcc.RangeSlider(
+                                id='range-slider-ano',
+                                min=min(anos),
+                                max=max(anos),
+                                value=[min(anos), max(anos)],
+                                marks={ano: str(ano) for ano in range(min(anos), max(anos)+1, 5)},
+                                step=1,
+                                tooltip={"placement": "bottom", "always_visible": True}
+                            ),
+                            html.Br(),
+                            dbc.Row([
+                                dbc.Col([
+                                    html.Label("🗺️ Regiões:", className="fw-bold"),
+                                    dcc.Dropdown(
+                                        id='dropdown-regiao',
+                                        options=[{'label': regiao, 'value': regiao} for regiao in regioes],
+                                        multi=True,
+                                        placeholder="Todas as regiões"
+                                    )
+                                ], md=4),
+                                dbc.Col([
+                                    html.Label("📍 Estados:", className="fw-bold"),
+                                    dcc.Dropdown(
+                                        id='dropdown-estado',
+                                        options=[{'label': estado, 'value': estado} for estado in estados],
+                                        multi=True,
+                                        placeholder="Todos os estados"
+                                    )
+                                ], md=4),
+                                dbc.Col([
+                                    html.Label("📊 Ordenar por:", className="fw-bold"),
+                                    dcc.Dropdown(
+                                        id='dropdown-ordenacao',
+                                        options=[
+                                            {'label': 'Produção Total', 'value': 'producao'},
+                                            {'label': 'Nome do Estado', 'value': 'estado'},
+                                            {'label': 'Região', 'value': 'regiao'}
+                                        ],
+                                        value='producao',
+                                        clearable=False
+                                    )
+                                ], md=4)
+                            ])
                         ])
                     ])
                 ])
-            ])
-        ], className="mb-4"),
-
-        # Cards de Métricas
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(id="metrica-total", className="text-primary"),
-                        html.P("📈 Produção Total", className="text-muted mb-0")
+            ], className="mb-4"),
+
+            # Cards de Métricas
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(id="metrica-total", className="text-primary"),
+                            html.P("📈 Produção Total", className="text-muted mb-0")
+                        ])
+                    ], className="h-100")
+                ], md=3),
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(id="metrica-media", className="text-info"),
+                            html.P("📊 Média Anual", className="text-muted mb-0")
+                        ])
+                    ], className="h-100")
+                ], md=3),
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(id="metrica-lider", className="text-success"),
+                            html.P("🏆 Estado Líder", className="text-muted mb-0")
+                        ])
+                    ], className="h-100")
+                ], md=3),
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(id="metrica-crescimento", className="text-warning"),
+                            html.P("📈 Crescimento", className="text-muted mb-0")
+                        ])
+                    ], className="h-100")
+                ], md=3)
+            ], className="mb-4"),
+
+            # Gráficos principais
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.Div([
+                            html.H5("🗺️ Mapa de Calor - Estados do Brasil", className="mb-0"),
+                            dbc.RadioItems(
+                                id='modo-mapa',
+                                options=[
+                                    {'label': 'Bolhas', 'value': 'bubbles'},
+                                    {'label': 'Coroplético', 'value': 'choropleth'}
+                                ],
+                                value=MAP_MODE,
+                                inline=True
+                            )
+                        ], className="d-flex justify-content-between align-items-center")),
+                        dbc.CardBody([dcc.Graph(id='mapa-brasil')])
                     ])
-                ], className="h-100")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(id="metrica-media", className="text-info"),
-                        html.P("📊 Média Anual", className="text-muted mb-0")
+                ], lg=6),
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H5("📈 Evolução Temporal da Produção", className="mb-0")),
+                        dbc.CardBody([dcc.Graph(id='serie-temporal')])
                     ])
-                ], className="h-100")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(id="metrica-lider", className="text-success"),
-                        html.P("🏆 Estado Líder", className="text-muted mb-0")
+                ], lg=6)
+            ], className="mb-4"),
+
+            # Gráficos secundários
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H5("🏆 Top 10 Estados Produtores", className="mb-0")),
+                        dbc.CardBody([dcc.Graph(id='top-estados')])
                     ])
-                ], className="h-100")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(id="metrica-crescimento", className="text-warning"),
-                        html.P("📈 Crescimento", className="text-muted mb-0")
+                ], lg=6),
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H5("🍰 Distribuição por Região", className="mb-0")),
+                        dbc.CardBody([dcc.Graph(id='distribuicao-regiao')])
+                    ])
+                ], lg=6)
+            ], className="mb-4"),
+
+            # Tabela
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H5("📋 Dados Detalhados", className="mb-0")),
+                        dbc.CardBody([
+                            html.P(id='tabela-total', className="text-muted mb-2"),
+                            dash_table.DataTable(
+                                id='tabela-dados',
+                                columns=[
+                                    {'name': 'Estado', 'id': 'estado'},
+                                    {'name': 'Região', 'id': 'regiao'},
+                                    {'name': 'Ano', 'id': 'ano', 'type': 'numeric'},
+                                    {'name': 'Produção (ton)', 'id': 'producao', 'type': 'numeric',
+                                     'format': Format().group(True)}
+                                ],
+                                # Paginação, ordenação e filtro resolvidos no servidor
+                                page_current=0,
+                                page_size=MAX_RECORDS_TABLE,
+                                page_action='custom',
+                                sort_action='custom',
+                                sort_mode='single',
+                                sort_by=[],
+                                filter_action='custom',
+                                filter_query='',
+                                style_table={'overflowX': 'auto'},
+                                style_cell={'textAlign': 'left', 'padding': '4px 8px',
+                                            'backgroundColor': 'var(--bs-body-bg)',
+                                            'color': 'var(--bs-body-color)',
+                                            'border': '1px solid var(--bs-border-color)'},
+                                style_header={'fontWeight': 'bold',
+                                              'backgroundColor': 'var(--bs-tertiary-bg)'},
+                                style_filter={'backgroundColor': 'var(--bs-body-bg)'}
+                            )
+                        ])
                     ])
-                ], className="h-100")
-            ], md=3)
-        ], className="mb-4"),
-
-        # Gráficos principais
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(html.H5("🗺️ Mapa de Calor - Estados do Brasil", className="mb-0")),
-                    dbc.CardBody([dcc.Graph(id='mapa-brasil')])
-                ])
-            ], lg=6),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(html.H5("📈 Evolução Temporal da Produção", className="mb-0")),
-                    dbc.CardBody([dcc.Graph(id='serie-temporal')])
-                ])
-            ], lg=6)
-        ], className="mb-4"),
-
-        # Gráficos secundários
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(html.H5("🏆 Top 10 Estados Produtores", className="mb-0")),
-                    dbc.CardBody([dcc.Graph(id='top-estados')])
-                ])
-            ], lg=6),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(html.H5("🍰 Distribuição por Região", className="mb-0")),
-                    dbc.CardBody([dcc.Graph(id='distribuicao-regiao')])
-                ])
-            ], lg=6)
-        ], className="mb-4"),
-
-        # Tabela
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(html.H5("📋 Dados Detalhados", className="mb-0")),
-                    dbc.CardBody([html.Div(id='tabela-dados')])
                 ])
-            ])
-        ]),
+            ]),
+
+            # Armazenamento do tema
+            dcc.Store(id='theme-store', data={'theme': 'darkly'}),
+            dcc.Store(id='temas-store', data=TEMAS),
 
-        # Armazenamento do tema
-        dcc.Store(id='theme-store', data={'theme': 'darkly'})
-    ], fluid=True, className="py-3")
-])
+            # Nível de geometria do mapa coroplético (atualizado no navegador conforme o zoom)
+            dcc.Store(id='nivel-mapa', data=nivel_para_zoom(MAP_ZOOM, urls_geojson)),
+            dcc.Store(id='niveis-mapa', data=sorted(urls_geojson)),
 
+            # Cubo em colunas compactas para o modo clientside (enviado uma única vez)
+            dcc.Store(id='dados-store',
+                      data=codificar_dados_navegador(base) if CLIENTSIDE_FILTERING else None)
+        ], fluid=True, className="py-3")
+    ])
+
+
+
+# Avaliado a cada carregamento da página: novas sessões já veem os dados recarregados
+app.layout = montar_layout
 
 # ============================================================================
 # CALLBACKS
 # ============================================================================
 
-# Callback para toggle do dark mode
-@callback(
+# Tema: alternância, folha de estilo, botão e template das figuras são
+# resolvidos no navegador (assets/clientside.js), sem ida ao servidor
+app.clientside_callback(
+    ClientsideFunction('tema', 'alternar'),
     Output('theme-store', 'data'),
     Input('dark-mode-toggle', 'n_clicks'),
-    prevent_initial_call=True,
-    allow_duplicate=True
-)
-def toggle_theme(n_clicks):
-    # Esta função não precisa fazer nada. A lógica real está abaixo.
-    pass
-from dash import State
-
-@callback(
-    Output('theme-store', 'data', allow_duplicate=True),
-    Input('dark-mode-toggle', 'n_clicks'),
     State('theme-store', 'data'),
     prevent_initial_call=True
 )
-def toggle_theme_click(n_clicks, theme_data):
-    if theme_data is None:
-        theme_data = {'theme': 'darkly'}
-    current = theme_data.get('theme', 'darkly')
-    new_theme = 'bootstrap' if current == 'darkly' else 'darkly'
-    return {'theme': new_theme}
-
 
-
-@callback(
+app.clientside_callback(
+    ClientsideFunction('tema', 'aplicarPagina'),
+    Output('theme-link', 'href'),
     Output('dark-mode-toggle', 'children'),
-    Input('theme-store', 'data')
+    Input('theme-store', 'data'),
+    State('temas-store', 'data')
 )
-def atualizar_botao_tema(theme_data):
-    if theme_data is None:
-        return "🌙 Dark Mode"  # fallback
-    return "☀️ Light Mode" if theme_data.get('theme', 'bootstrap') == 'darkly' else "🌙 Dark Mode"
-
-
-# Callback principal para atualizar todas as visualizações
-@callback(
-    [Output('mapa-brasil', 'figure'),
-     Output('serie-temporal', 'figure'),
-     Output('top-estados', 'figure'),
-     Output('distribuicao-regiao', 'figure'),
-     Output('tabela-dados', 'children'),
-     Output('metrica-total', 'children'),
-     Output('metrica-media', 'children'),
-     Output('metrica-lider', 'children'),
-     Output('metrica-crescimento', 'children')],
-    [Input('range-slider-ano', 'value'),
-     Input('dropdown-regiao', 'value'),
-     Input('dropdown-estado', 'value'),
-     Input('dropdown-ordenacao', 'value'),
-     Input('theme-store', 'data')]
+
+app.clientside_callback(
+    ClientsideFunction('tema', 'aplicarFiguras'),
+    Output('mapa-brasil', 'figure', allow_duplicate=True),
+    Output('serie-temporal', 'figure', allow_duplicate=True),
+    Output('top-estados', 'figure', allow_duplicate=True),
+    Output('distribuicao-regiao', 'figure', allow_duplicate=True),
+    Input('theme-store', 'data'),
+    State('temas-store', 'data'),
+    State('mapa-brasil', 'figure'),
+    State('serie-temporal', 'figure'),
+    State('top-estados', 'figure'),
+    State('distribuicao-regiao', 'figure'),
+    prevent_initial_call=True
+)
+
+# Zoom do mapa → nível de geometria; só há requisição quando o nível muda
+app.clientside_callback(
+    ClientsideFunction('geometria', 'nivel'),
+    Output('nivel-mapa', 'data'),
+    Input('mapa-brasil', 'relayoutData'),
+    State('nivel-mapa', 'data'),
+    State('niveis-mapa', 'data'),
+    prevent_initial_call=True
 )
-def update_dashboard(range_ano, regioes_selecionadas, estados_selecionados, 
-                    ordenacao, theme_data):
+
+
+# ============================================================================
+# AGREGADO COMPARTILHADO
+# ============================================================================
+
+def obter_agregado(range_ano, regioes_selecionadas, estados_selecionados):
+    """Agregado em cache para a combinação de filtros (calculado uma vez por combinação)"""
+    base = base_atual()
+    chave = (base.versao,) + normalizar_filtros(range_ano, regioes_selecionadas,
+                                                estados_selecionados)
+    return cache_agregados.obter_ou_calcular(chave, construir_agregado, base.motor, *chave[1:])
+
+
+def construir_agregado(motor, *filtros):
+    """Agregado novo, com os tempos de filtro e agregação enviados às métricas"""
+    agregado = AgregadoFiltrado(motor, *filtros)
+    for etapa, segundos in agregado.tempos.items():
+        registrar_etapa(etapa, segundos)
+    return agregado
+
+
+def tema_atual(theme_data):
     if theme_data is None:
-        theme_data = {'theme': 'bootstrap'}
-
-    # Filtrar dados
-    df_filtrado = df[
-        (df['ano'] >= range_ano[0]) & 
-        (df['ano'] <= range_ano[1])
-    ]
-
-    if regioes_selecionadas:
-        df_filtrado = df_filtrado[df_filtrado['regiao'].isin(regioes_selecionadas)]
-
-    if estados_selecionados:
-        df_filtrado = df_filtrado[df_filtrado['estado'].isin(estados_selecionados)]
-
-    # Tema
-    template = theme_data['theme']
-
-    # ========================================================================
-    # 1. MAPA DE CALOR DO BRASIL
-    # ========================================================================
-
-    # Agregar dados por estado para o mapa
-    df_mapa = df_filtrado.groupby(['sigla', 'estado', 'regiao'])['producao'].sum().reset_index()
-
-    # fig_mapa = px.choropleth_mapbox(
-    #     df_mapa,
-    #     geojson=geojson_brasil,
-    #     locations='sigla',
-    #     color='producao',
-    #     hover_name='estado',
-    #     hover_data={'regiao': True, 'producao': ':,'},
-    #     color_continuous_scale='Viridis',
-    #     mapbox_style="carto-positron",
-    #     zoom=3.5,
-    #     center={"lat": -14, "lon": -55},
-    #     opacity=0.7,
-    #     labels={'producao': 'Produção (ton)'},
-    #     template=template
-    # )
-    # Obter coordenadas centrais dos estados (você pode carregar isso de um CSV auxiliar ou definir manualmente)
-    coordenadas_estados = {
-        'MT': [-56.1, -12.7],
-        'BA': [-41.7, -12.9],
-        'GO': [-49.6, -15.9],
-        'MS': [-54.5, -20.5],
-        'MA': [-45.2, -5.4],
-        'PI': [-42.3, -7.5],
-        'CE': [-39.5, -5.2],
-        'MG': [-44.4, -18.1],
-        'SP': [-48.6, -22.5],
-        'PR': [-51.5, -24.9],
-        'TO': [-48.2, -10.3],
-        'PA': [-52.0, -3.8],
-        'AL': [-36.6, -9.6],
-        'PB': [-36.7, -7.0],
-        'RN': [-36.7, -5.8],
-        'PE': [-37.8, -8.3],
-        'SE': [-37.4, -10.6],
-        'RO': [-63.9, -10.8],
-        'DF': [-47.9, -15.8]
-    }
+        return 'bootstrap'
+    return theme_data.get('theme', 'bootstrap')
 
-    # Adiciona colunas de latitude e longitude
-    df_mapa['lat'] = df_mapa['sigla'].map(lambda x: coordenadas_estados[x][1])
-    df_mapa['lon'] = df_mapa['sigla'].map(lambda x: coordenadas_estados[x][0])
-
-    mapbox_style = "carto-darkmatter" if template == "darkly" else "carto-positron"
-    # Criar bolhas proporcionais
-    fig_mapa = px.scatter_mapbox(
-        df_mapa,
-        lat='lat',
-        lon='lon',
-        size='producao',
-        color='regiao',
-        hover_name='estado',
-        hover_data={'producao': ':,'},
-        size_max=50,
-        zoom=3.5,
-        # Definir estilo do mapa com base no tema
-        mapbox_style = mapbox_style,#"carto-darkmatter",
-
-        center={"lat": -14, "lon": -55},
-        template=template
-    )
 
-    # fig_mapa.update_layout(
-    #     title="Produção de Algodão por Estado (Mapa de Bolhas)",
-    #     margin={"r":0,"t":30,"l":0,"b":0}
-    # )
+def saida_em_cache(nome, funcao, range_ano, regioes_selecionadas, estados_selecionados, *extras):
+    """Reaproveita a saída de um callback para filtros equivalentes"""
+    # A versão dos dados faz parte da chave: resultados de uma base anterior nunca são reusados
+    chave = (nome, base_atual().versao) + normalizar_filtros(range_ano, regioes_selecionadas,
+                                                             estados_selecionados, *extras)
+    # O tempo de montagem da saída não inclui o filtro e a agregação, medidos à parte
+    return cache_saidas.obter_ou_calcular(chave, medir_etapa, 'montagem', funcao, *chave[2:])
 
 
-    fig_mapa.update_layout(
-        title="Produção de Algodão por Estado",
-        margin={"r":0,"t":30,"l":0,"b":0},
-        coloraxis_colorbar=dict(title="Produção (ton)")
-    )
+# ============================================================================
+# CONSTRUÇÃO DAS VISUALIZAÇÕES
+# ============================================================================
 
-    # ========================================================================
-    # 2. SÉRIE TEMPORAL
-    # ========================================================================
+def criar_mapa(range_ano, regioes_selecionadas, estados_selecionados, template, modo, nivel):
+    """Mapa da produção total de cada estado (bolhas ou coroplético)"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
 
-    df_temporal = df_filtrado.groupby('ano')['producao'].sum().reset_index()
+    # Totais por estado já trazem o centroide da tabela de dimensão
+    df_mapa = agregado.df_totais.sort_values('sigla').reset_index(drop=True)
 
-    fig_temporal = px.line(
-        df_temporal, 
-        x='ano', 
-        y='producao',
-        title='Evolução da Produção Nacional',
-        template=template
-    )
+    if modo == 'choropleth':
+        return figura_coropletico(ESQUELETOS[template], df_mapa, urls_geojson[nivel])
+    return figura_mapa(ESQUELETOS[template], df_mapa)
 
-    fig_temporal.update_traces(line=dict(width=3))
-    fig_temporal.update_layout(
-        xaxis_title="Ano",
-        yaxis_title="Produção (toneladas)",
-        hovermode='x unified'
-    )
 
-    # ========================================================================
-    # 3. TOP ESTADOS
-    # ========================================================================
-
-    df_top = df_filtrado.groupby(['estado', 'regiao'])['producao'].sum().reset_index()
-    df_top = df_top.sort_values('producao', ascending=True).tail(10)
-
-    fig_top = px.bar(
-        df_top,
-        x='producao',
-        y='estado',
-        color='regiao',
-        orientation='h',
-        title='Top 10 Estados Produtores',
-        template=template
-    )
+def criar_serie_temporal(range_ano, regioes_selecionadas, estados_selecionados, template):
+    """Evolução anual da produção somada dos estados selecionados"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
 
-    fig_top.update_layout(
-        xaxis_title="Produção (toneladas)",
-        yaxis_title="Estado",
-        legend_title="Região"
-    )
+    return figura_serie(ESQUELETOS[template], agregado.anos, agregado.serie)
 
-    # ========================================================================
-    # 4. DISTRIBUIÇÃO POR REGIÃO
-    # ========================================================================
 
-    df_regiao = df_filtrado.groupby('regiao')['producao'].sum().reset_index()
+def criar_top_estados(range_ano, regioes_selecionadas, estados_selecionados, template):
+    """Ranking dos 10 maiores produtores na janela"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
 
-    fig_regiao = px.pie(
-        df_regiao,
-        values='producao',
-        names='regiao',
-        title='Distribuição da Produção por Região',
-        template=template
-    )
+    # Seleção parcial dos 10 maiores; invertida para o maior ficar no topo das barras
+    df_top = agregado.ranking_estados(10).iloc[::-1]
 
-    # ========================================================================
-    # 5. TABELA DE DADOS
-    # ========================================================================
+    return figura_top(ESQUELETOS[template], df_top)
 
-    df_tabela = df_filtrado.groupby(['estado', 'regiao', 'ano'])['producao'].sum().reset_index()
-    df_tabela['producao_formatada'] = df_tabela['producao'].apply(lambda x: f"{x:,}")
 
-    if ordenacao == 'producao':
-        df_tabela = df_tabela.sort_values('producao', ascending=False)
-    else:
-        df_tabela = df_tabela.sort_values(ordenacao)
-
-    # Limitar a 100 registros para performance
-    df_tabela_show = df_tabela.head(100)
-
-    tabela = dbc.Table.from_dataframe(
-        df_tabela_show[['estado', 'regiao', 'ano', 'producao_formatada']].rename(columns={
-            'estado': 'Estado',
-            'regiao': 'Região', 
-            'ano': 'Ano',
-            'producao_formatada': 'Produção (ton)'
-        }),
-        striped=True,
-        bordered=True,
-        hover=True,
-        responsive=True,
-        size='sm'
-    )
+def criar_distribuicao_regiao(range_ano, regioes_selecionadas, estados_selecionados, template):
+    """Participação de cada região na produção da janela"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
+
+    return figura_regiao(ESQUELETOS[template], agregado.df_regiao)
+
+
+def criar_tabela(range_ano, regioes_selecionadas, estados_selecionados, ordenacao,
+                 pagina, tamanho_pagina, ordem_tabela, filtro_tabela):
+    """Página visível da tabela estado × ano (filtro, ordenação e paginação no servidor)"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
+
+    df_tabela = filtrar_tabela(agregado.df_filtrado, filtro_tabela)
+    criterios = criterios_ordenacao([{'column_id': coluna, 'direction': direcao}
+                                     for coluna, direcao in ordem_tabela], ordenacao)
+    df_pagina, total, page_count, pagina = pagina_tabela(df_tabela, criterios, pagina,
+                                                         tamanho_pagina)
+
+    # Números vão crus; a formatação com separador de milhar é feita pela própria tabela
+    return df_pagina.to_dict('records'), page_count, pagina, f"{total:,} registros"
+
 
-    # ========================================================================
-    # 6. MÉTRICAS
-    # ========================================================================
+def criar_metricas(range_ano, regioes_selecionadas, estados_selecionados):
+    """Textos dos quatro cards de métricas"""
+    agregado = obter_agregado(range_ano, regioes_selecionadas, estados_selecionados)
 
-    metricas = calcular_metricas(df_filtrado)
+    metricas = agregado.metricas
 
     return (
-        fig_mapa,
-        fig_temporal, 
-        fig_top,
-        fig_regiao,
-        tabela,
         formatar_numero(metricas['producao_total']) + " ton",
         formatar_numero(metricas['media_anual']) + " ton/ano",
         metricas['estado_lider'],
         f"{metricas['crescimento']:.1f}%"
     )
 
+
+# ============================================================================
+# CALLBACKS DAS VISUALIZAÇÕES
+# ============================================================================
+
+def atualizar_mapa(range_ano, regioes_selecionadas, estados_selecionados, modo, nivel, theme_data):
+    # O nível de geometria só muda a figura do mapa coroplético
+    if dash.ctx.triggered_id == 'nivel-mapa' and modo != 'choropleth':
+        raise PreventUpdate
+    return saida_em_cache('mapa', criar_mapa, range_ano, regioes_selecionadas,
+                          estados_selecionados, tema_atual(theme_data), modo, nivel)
+
+
+def atualizar_serie_temporal(range_ano, regioes_selecionadas, estados_selecionados, theme_data):
+    return saida_em_cache('serie', criar_serie_temporal, range_ano, regioes_selecionadas,
+                          estados_selecionados, tema_atual(theme_data))
+
+
+def atualizar_top_estados(range_ano, regioes_selecionadas, estados_selecionados, theme_data):
+    return saida_em_cache('top', criar_top_estados, range_ano, regioes_selecionadas,
+                          estados_selecionados, tema_atual(theme_data))
+
+
+def atualizar_distribuicao_regiao(range_ano, regioes_selecionadas, estados_selecionados, theme_data):
+    return saida_em_cache('regiao', criar_distribuicao_regiao, range_ano, regioes_selecionadas,
+                          estados_selecionados, tema_atual(theme_data))
+
+
+def atualizar_tabela(range_ano, regioes_selecionadas, estados_selecionados, ordenacao,
+                     pagina, tamanho_pagina, sort_by, filter_query):
+    # Mudanças de filtro ou ordenação voltam para a primeira página
+    if 'tabela-dados.page_current' not in dash.ctx.triggered_prop_ids:
+        pagina = 0
+    ordem_tabela = tuple((item['column_id'], item['direction']) for item in sort_by or [])
+    return saida_em_cache('tabela', criar_tabela, range_ano, regioes_selecionadas,
+                          estados_selecionados, ordenacao, pagina or 0,
+                          tamanho_pagina or MAX_RECORDS_TABLE, ordem_tabela, filter_query or '')
+
+
+def atualizar_metricas(range_ano, regioes_selecionadas, estados_selecionados):
+    return saida_em_cache('metricas', criar_metricas, range_ano, regioes_selecionadas,
+                          estados_selecionados)
+
+
+# Cada saída depende apenas das entradas que realmente usa: a ordenação só
+# afeta a tabela e as métricas dependem apenas dos filtros. O tema é lido
+# como State (novas figuras já saem no tema atual) e sua troca é aplicada
+# no navegador. Todos compartilham o mesmo agregado em cache.
+
+FILTROS = [
+    Input('range-slider-ano', 'value'),
+    Input('dropdown-regiao', 'value'),
+    Input('dropdown-estado', 'value')
+]
+
+ENTRADAS_MAPA = [
+    Input('modo-mapa', 'value'),
+    Input('nivel-mapa', 'data')
+]
+
+ENTRADAS_TABELA = [
+    Input('dropdown-ordenacao', 'value'),
+    Input('tabela-dados', 'page_current'),
+    Input('tabela-dados', 'page_size'),
+    Input('tabela-dados', 'sort_by'),
+    Input('tabela-dados', 'filter_query')
+]
+
+SAIDA_TABELA = [
+    Output('tabela-dados', 'data'),
+    Output('tabela-dados', 'page_count'),
+    Output('tabela-dados', 'page_current'),
+    Output('tabela-total', 'children')
+]
+
+SAIDA_METRICAS = [
+    Output('metrica-total', 'children'),
+    Output('metrica-media', 'children'),
+    Output('metrica-lider', 'children'),
+    Output('metrica-crescimento', 'children')
+]
+
+if CLIENTSIDE_FILTERING:
+    # Filtros e agregações rodam no navegador sobre o cubo em 'dados-store'
+    DADOS_NAVEGADOR = [State('dados-store', 'data')]
+    TEMA_NAVEGADOR = [State('theme-store', 'data')] + DADOS_NAVEGADOR + [State('temas-store', 'data')]
+
+    app.clientside_callback(ClientsideFunction('dados', 'mapa'),
+                            Output('mapa-brasil', 'figure'), *FILTROS, *ENTRADAS_MAPA,
+                            *TEMA_NAVEGADOR)
+    app.clientside_callback(ClientsideFunction('dados', 'serie'),
+                            Output('serie-temporal', 'figure'), *FILTROS, *TEMA_NAVEGADOR)
+    app.clientside_callback(ClientsideFunction('dados', 'top'),
+                            Output('top-estados', 'figure'), *FILTROS, *TEMA_NAVEGADOR)
+    app.clientside_callback(ClientsideFunction('dados', 'regiao'),
+                            Output('distribuicao-regiao', 'figure'), *FILTROS, *TEMA_NAVEGADOR)
+    app.clientside_callback(ClientsideFunction('dados', 'tabela'),
+                            *SAIDA_TABELA, *FILTROS, *ENTRADAS_TABELA, *DADOS_NAVEGADOR)
+    app.clientside_callback(ClientsideFunction('dados', 'metricas'),
+                            *SAIDA_METRICAS, *FILTROS, *DADOS_NAVEGADOR)
+else:
+    callback(Output('mapa-brasil', 'figure'), *FILTROS, *ENTRADAS_MAPA,
+             State('theme-store', 'data'))(instrumentar_callback(atualizar_mapa))
+    callback(Output('serie-temporal', 'figure'), *FILTROS,
+             State('theme-store', 'data'))(instrumentar_callback(atualizar_serie_temporal))
+    callback(Output('top-estados', 'figure'), *FILTROS,
+             State('theme-store', 'data'))(instrumentar_callback(atualizar_top_estados))
+    callback(Output('distribuicao-regiao', 'figure'), *FILTROS,
+             State('theme-store', 'data'))(instrumentar_callback(atualizar_distribuicao_regiao))
+    callback(*SAIDA_TABELA, *FILTROS, *ENTRADAS_TABELA)(instrumentar_callback(atualizar_tabela))
+    callback(*SAIDA_METRICAS, *FILTROS)(instrumentar_callback(atualizar_metricas))
+
+# ============================================================================
+# AQUECIMENTO DOS CACHES
+# ============================================================================
+
+def aquecer_caches():
+    """Calcula o agregado e as saídas da carga inicial da página (estado padrão dos filtros)"""
+    if not ENABLE_CACHING or CLIENTSIDE_FILTERING:
+        return
+    anos = base_atual().anos
+    range_inicial = [min(anos), max(anos)]
+    for tema in ESQUELETOS:
+        saida_em_cache('mapa', criar_mapa, range_inicial, None, None, tema, MAP_MODE,
+                       nivel_para_zoom(MAP_ZOOM, urls_geojson))
+        saida_em_cache('serie', criar_serie_temporal, range_inicial, None, None, tema)
+        saida_em_cache('top', criar_top_estados, range_inicial, None, None, tema)
+        saida_em_cache('regiao', criar_distribuicao_regiao, range_inicial, None, None, tema)
+    saida_em_cache('tabela', criar_tabela, range_inicial, None, None, 'producao', 0,
+                   MAX_RECORDS_TABLE, (), '')
+    saida_em_cache('metricas', criar_metricas, range_inicial, None, None)
+
 # ============================================================================
 # EXECUTAR APP
 # ============================================================================
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=8050)
+    app.run(debug=DEBUG, host=HOST, port=PORT)
 
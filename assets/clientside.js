@@ -0,0 +1,415 @@
+// ============================================================================
+// CALLBACKS EXECUTADOS NO NAVEGADOR
+// ============================================================================
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    tema: {
+        // Alterna entre os temas claro e escuro
+        alternar: function (n_clicks, theme_data) {
+            var atual = (theme_data && theme_data.theme) || 'darkly';
+            return {theme: atual === 'darkly' ? 'bootstrap' : 'darkly'};
+        },
+
+        // Folha de estilo Bootstrap e texto do botão
+        aplicarPagina: function (theme_data, temas) {
+            var tema = (theme_data && theme_data.theme) || 'bootstrap';
+            var config = temas[tema] || temas.bootstrap;
+            var rotulo = tema === 'darkly' ? '☀️ Light Mode' : '🌙 Dark Mode';
+            return [config.href, rotulo];
+        },
+
+        // Troca apenas template e estilo do mapa das figuras já renderizadas,
+        // reaproveitando os dados (sem recalcular nada no servidor); os traços
+        // não fixam cor, então o colorway do novo template os recolore
+        aplicarFiguras: function (theme_data, temas) {
+            var tema = (theme_data && theme_data.theme) || 'bootstrap';
+            var config = temas[tema] || temas.bootstrap;
+            var figuras = Array.prototype.slice.call(arguments, 2);
+
+            return figuras.map(function (figura) {
+                if (!figura) {
+                    return window.dash_clientside.no_update;
+                }
+                var layout = Object.assign({}, figura.layout, {template: config.template});
+                if (layout.mapbox) {
+                    layout.mapbox = Object.assign({}, layout.mapbox, {style: config.mapbox_style});
+                }
+                return Object.assign({}, figura, {layout: layout});
+            });
+        }
+    },
+
+    geometria: {
+        // Nível de simplificação da geometria para o zoom atual do mapa
+        // (o mais detalhado cujo zoom mínimo já foi atingido; ver nivel_para_zoom)
+        nivel: function (relayoutData, nivelAtual, niveis) {
+            if (!relayoutData || relayoutData['mapbox.zoom'] === undefined) {
+                return window.dash_clientside.no_update;
+            }
+            var zoom = relayoutData['mapbox.zoom'];
+            var nivel = niveis[0];
+            niveis.forEach(function (n) {
+                if (n <= zoom) {
+                    nivel = n;
+                }
+            });
+            return nivel === nivelAtual ? window.dash_clientside.no_update : nivel;
+        }
+    }
+});
+
+// ============================================================================
+// MODO CLIENTSIDE: FILTROS E AGREGAÇÕES NO NAVEGADOR
+// ============================================================================
+//
+// Usado quando CLIENTSIDE_FILTERING = True em config.py. O cubo estado × ano
+// chega uma única vez em 'dados-store' (colunas compactas) e todos os gráficos,
+// a tabela e as métricas são calculados aqui, sem POST ao servidor.
+
+(function () {
+    var ultimaChave = null;
+    var ultimaConsulta = null;
+
+    function configTema(theme_data, temas) {
+        var tema = (theme_data && theme_data.theme) || 'bootstrap';
+        return temas[tema] || temas.bootstrap;
+    }
+
+    function formatarNumero(num) {
+        if (num >= 1000000) {
+            return (num / 1000000).toFixed(1) + 'M';
+        } else if (num >= 1000) {
+            return (num / 1000).toFixed(0) + 'K';
+        }
+        return String(num);
+    }
+
+    // Mesma semântica de CuboProducao.consultar: janela de anos e seleção de estados
+    function consultar(dados, range_ano, regioes, estados) {
+        var chave = JSON.stringify([range_ano, regioes || [], estados || []]);
+        if (chave === ultimaChave) {
+            return ultimaConsulta;
+        }
+        var nAnos = dados.anos.length;
+        var iIni = Math.max(0, Math.min(range_ano[0] - dados.anos[0], nAnos));
+        var iFim = Math.max(-1, Math.min(range_ano[1] - dados.anos[0], nAnos - 1));
+
+        var indices = [];
+        var totais = [];
+        var serie = new Array(Math.max(iFim - iIni + 1, 0)).fill(0);
+        var anoPresente = new Array(serie.length).fill(false);
+        var linhas = [];
+
+        for (var e = 0; e < dados.estados.length; e++) {
+            var regiao = dados.regioes[dados.regiao_estado[e]];
+            if (regioes && regioes.length && regioes.indexOf(regiao) < 0) {
+                continue;
+            }
+            if (estados && estados.length && estados.indexOf(dados.estados[e]) < 0) {
+                continue;
+            }
+            var total = 0;
+            var algum = false;
+            var base = e * nAnos;
+            for (var j = iIni; j <= iFim; j++) {
+                if (dados.presente[base + j]) {
+                    var valor = dados.producao[base + j];
+                    total += valor;
+                    algum = true;
+                    serie[j - iIni] += valor;
+                    anoPresente[j - iIni] = true;
+                    linhas.push({estado: dados.estados[e], regiao: regiao,
+                                 ano: dados.anos[j], producao: valor});
+                }
+            }
+            if (algum) {
+                indices.push(e);
+                totais.push(total);
+            }
+        }
+
+        var anosSerie = [];
+        var valoresSerie = [];
+        for (var k = 0; k < serie.length; k++) {
+            if (anoPresente[k]) {
+                anosSerie.push(dados.anos[iIni + k]);
+                valoresSerie.push(serie[k]);
+            }
+        }
+
+        ultimaChave = chave;
+        ultimaConsulta = {indices: indices, totais: totais, linhas: linhas,
+                          anos: anosSerie, serie: valoresSerie};
+        return ultimaConsulta;
+    }
+
+    // Agrupa posições por região na ordem da primeira ocorrência (como o plotly.express)
+    function gruposPorRegiao(dados, indices, ordem) {
+        var grupos = [];
+        var porNome = {};
+        ordem.forEach(function (pos) {
+            var regiao = dados.regioes[dados.regiao_estado[indices[pos]]];
+            if (!(regiao in porNome)) {
+                porNome[regiao] = {nome: regiao, posicoes: []};
+                grupos.push(porNome[regiao]);
+            }
+            porNome[regiao].posicoes.push(pos);
+        });
+        return grupos;
+    }
+
+    function mapa(range_ano, regioes, estados, modo, nivel, theme_data, dados, temas) {
+        var config = configTema(theme_data, temas);
+        var c = consultar(dados, range_ano, regioes, estados);
+        var ordem = c.indices.map(function (_, i) { return i; });
+        ordem.sort(function (a, b) {
+            var sa = dados.siglas[c.indices[a]], sb = dados.siglas[c.indices[b]];
+            return sa < sb ? -1 : (sa > sb ? 1 : 0);
+        });
+        if (modo === 'choropleth') {
+            return coropletico(c, ordem, config, dados, dados.geojson_urls[nivel]);
+        }
+        var maximo = Math.max.apply(null, c.totais.concat([0]));
+        var traces = gruposPorRegiao(dados, c.indices, ordem).map(function (grupo, i) {
+            var idx = grupo.posicoes.map(function (p) { return c.indices[p]; });
+            return {
+                type: 'scattermapbox', mode: 'markers', name: grupo.nome,
+                legendgroup: grupo.nome, showlegend: true, subplot: 'mapbox',
+                lat: idx.map(function (e) { return dados.lat[e]; }),
+                lon: idx.map(function (e) { return dados.lon[e]; }),
+                hovertext: idx.map(function (e) { return dados.estados[e]; }),
+                customdata: grupo.posicoes.map(function (p) { return [c.totais[p]]; }),
+                hovertemplate: '<b>%{hovertext}</b><br><br>regiao=' + grupo.nome +
+                    '<br>producao=%{customdata[0]:,}<br>lat=%{lat}<br>lon=%{lon}<extra></extra>',
+                marker: {
+                    sizemode: 'area', sizeref: maximo / (50 * 50),
+                    size: grupo.posicoes.map(function (p) { return c.totais[p]; })
+                }
+            };
+        });
+        return {data: traces, layout: {
+            template: config.template,
+            title: {text: 'Produção de Algodão por Estado'},
+            margin: {r: 0, t: 30, l: 0, b: 0},
+            legend: {title: {text: 'regiao'}, tracegroupgap: 0, itemsizing: 'constant'},
+            mapbox: {center: dados.mapa_centro, zoom: dados.mapa_zoom, style: config.mapbox_style,
+                     domain: {x: [0, 1], y: [0, 1]}},
+            uirevision: 'mapa'
+        }};
+    }
+
+    // Equivalente a figura_coropletico: a geometria vem da URL publicada pelo servidor
+    function coropletico(c, ordem, config, dados, url_geojson) {
+        var idx = ordem.map(function (p) { return c.indices[p]; });
+        return {data: [{
+            type: 'choroplethmapbox', name: '', subplot: 'mapbox', coloraxis: 'coloraxis',
+            geojson: url_geojson, featureidkey: 'properties.sigla',
+            locations: idx.map(function (e) { return dados.siglas[e]; }),
+            z: ordem.map(function (p) { return c.totais[p]; }),
+            hovertext: idx.map(function (e) { return dados.estados[e]; }),
+            customdata: idx.map(function (e) { return [dados.regioes[dados.regiao_estado[e]]]; }),
+            hovertemplate: '<b>%{hovertext}</b><br><br>regiao=%{customdata[0]}' +
+                '<br>producao=%{z:,}<extra></extra>',
+            marker: {opacity: 0.7}
+        }], layout: {
+            template: config.template,
+            title: {text: 'Produção de Algodão por Estado'},
+            margin: {r: 0, t: 30, l: 0, b: 0},
+            legend: {tracegroupgap: 0},
+            coloraxis: {colorscale: 'Viridis', colorbar: {title: {text: 'Produção (ton)'}}},
+            mapbox: {center: dados.mapa_centro, zoom: dados.mapa_zoom, style: config.mapbox_style,
+                     domain: {x: [0, 1], y: [0, 1]}},
+            uirevision: 'mapa'
+        }};
+    }
+
+    function serie(range_ano, regioes, estados, theme_data, dados, temas) {
+        var config = configTema(theme_data, temas);
+        var c = consultar(dados, range_ano, regioes, estados);
+        return {data: [{
+            type: 'scatter', mode: 'lines', x: c.anos, y: c.serie, name: '', showlegend: false,
+            line: {width: 3},
+            hovertemplate: 'ano=%{x}<br>producao=%{y}<extra></extra>'
+        }], layout: {
+            template: config.template,
+            title: {text: 'Evolução da Produção Nacional'},
+            xaxis: {title: {text: 'Ano'}},
+            yaxis: {title: {text: 'Produção (toneladas)'}},
+            hovermode: 'x unified'
+        }};
+    }
+
+    function top(range_ano, regioes, estados, theme_data, dados, temas) {
+        var config = configTema(theme_data, temas);
+        var c = consultar(dados, range_ano, regioes, estados);
+        var ordem = c.totais.map(function (_, i) { return i; });
+        ordem.sort(function (a, b) { return c.totais[a] - c.totais[b]; });
+        ordem = ordem.slice(Math.max(ordem.length - 10, 0));
+        var traces = gruposPorRegiao(dados, c.indices, ordem).map(function (grupo, i) {
+            return {
+                type: 'bar', orientation: 'h', name: grupo.nome, legendgroup: grupo.nome,
+                offsetgroup: grupo.nome, alignmentgroup: 'True', showlegend: true,
+                x: grupo.posicoes.map(function (p) { return c.totais[p]; }),
+                y: grupo.posicoes.map(function (p) { return dados.estados[c.indices[p]]; }),
+                hovertemplate: 'regiao=' + grupo.nome + '<br>producao=%{x}<br>estado=%{y}<extra></extra>'
+            };
+        });
+        return {data: traces, layout: {
+            template: config.template,
+            title: {text: 'Top 10 Estados Produtores'},
+            xaxis: {title: {text: 'Produção (toneladas)'}},
+            yaxis: {title: {text: 'Estado'}},
+            legend: {title: {text: 'Região'}, tracegroupgap: 0},
+            barmode: 'relative'
+        }};
+    }
+
+    function regiao(range_ano, regioes, estados, theme_data, dados, temas) {
+        var config = configTema(theme_data, temas);
+        var c = consultar(dados, range_ano, regioes, estados);
+        var somas = {};
+        c.indices.forEach(function (e, i) {
+            var nome = dados.regioes[dados.regiao_estado[e]];
+            somas[nome] = (somas[nome] || 0) + c.totais[i];
+        });
+        var nomes = Object.keys(somas).sort();
+        return {data: [{
+            type: 'pie', name: '', labels: nomes, values: nomes.map(function (n) { return somas[n]; }),
+            hovertemplate: 'regiao=%{label}<br>producao=%{value}<extra></extra>'
+        }], layout: {
+            template: config.template,
+            title: {text: 'Distribuição da Produção por Região'}
+        }};
+    }
+
+    // Mesma sintaxe de filter_query tratada por tabela.filtrar_tabela
+    var CONDICAO = /^\s*\{([^}]+)\}\s*([is]?)(>=|<=|!=|<|>|=|(?:ge|le|lt|gt|ne|eq|contains|datestartswith)\b)\s*(.*?)\s*$/;
+    var OPERADORES = {ge: '>=', le: '<=', lt: '<', gt: '>', ne: '!=', eq: '='};
+
+    function separarFiltro(parte) {
+        var encontrado = CONDICAO.exec(parte);
+        if (!encontrado) {
+            return null;
+        }
+        var operador = OPERADORES[encontrado[3]] || encontrado[3];
+
+        var valor = encontrado[4];
+        var aspas = valor.charAt(0);
+        if (valor.length >= 2 && aspas === valor.charAt(valor.length - 1) && '"\'`'.indexOf(aspas) >= 0) {
+            valor = valor.slice(1, -1).split('\\' + aspas).join(aspas);
+        } else if (valor !== '' && !isNaN(Number(valor))) {
+            valor = Number(valor);
+        }
+        return {coluna: encontrado[1], prefixo: encontrado[2], operador: operador, valor: valor};
+    }
+
+    function atendeFiltro(linha, filtro) {
+        var campo = linha[filtro.coluna];
+        var valor = filtro.valor;
+        switch (filtro.operador) {
+            case 'contains':
+                // Só o prefixo 'i' ignora maiúsculas/minúsculas; 's' ou sem prefixo
+                // diferencia, como o padrão da DataTable
+                if (filtro.prefixo !== 'i') {
+                    return String(campo).indexOf(String(valor)) >= 0;
+                }
+                return String(campo).toLowerCase().indexOf(String(valor).toLowerCase()) >= 0;
+            case 'datestartswith':
+                return String(campo).indexOf(String(valor)) === 0;
+        }
+        if (typeof valor === 'string' && typeof campo === 'number') {
+            return false;
+        }
+        switch (filtro.operador) {
+            case '>=': return campo >= valor;
+            case '<=': return campo <= valor;
+            case '<': return campo < valor;
+            case '>': return campo > valor;
+            case '!=': return campo !== valor;
+            default: return campo === valor;
+        }
+    }
+
+    // Equivalente a criar_tabela: filtra, ordena (sort estável) e devolve só a página visível
+    function tabela(range_ano, regioes, estados, ordenacao, page_current, page_size,
+                    sort_by, filter_query, dados) {
+        var c = consultar(dados, range_ano, regioes, estados);
+        var linhas = c.linhas;
+
+        if (filter_query) {
+            var filtros = filter_query.split(' && ').map(separarFiltro).filter(function (f) {
+                return f && dados.colunas_tabela.indexOf(f.coluna) >= 0;
+            });
+            linhas = linhas.filter(function (l) {
+                return filtros.every(function (f) { return atendeFiltro(l, f); });
+            });
+        }
+
+        var criterios;
+        if (sort_by && sort_by.length) {
+            criterios = sort_by.map(function (s) { return [s.column_id, s.direction === 'asc']; });
+        } else {
+            criterios = [[ordenacao, ordenacao !== 'producao']];
+        }
+        linhas = linhas.map(function (l, i) { return [l, i]; });
+        linhas.sort(function (a, b) {
+            for (var k = 0; k < criterios.length; k++) {
+                var coluna = criterios[k][0];
+                var x = a[0][coluna];
+                var y = b[0][coluna];
+                if (x !== y) {
+                    return (x < y ? -1 : 1) * (criterios[k][1] ? 1 : -1);
+                }
+            }
+            return a[1] - b[1];
+        });
+
+        // Filtros e ordenação voltam à primeira página; só a paginação a preserva
+        var disparo = window.dash_clientside.callback_context.triggered.map(function (t) {
+            return t.prop_id;
+        });
+        var pagina = disparo.indexOf('tabela-dados.page_current') >= 0 ? (page_current || 0) : 0;
+        var total = linhas.length;
+        var nPaginas = Math.max(1, Math.ceil(total / page_size));
+        pagina = Math.min(Math.max(pagina, 0), nPaginas - 1);
+
+        var pagina_linhas = linhas.slice(pagina * page_size, (pagina + 1) * page_size)
+            .map(function (par) { return par[0]; });
+        return [pagina_linhas, nPaginas, pagina, total.toLocaleString('en-US') + ' registros'];
+    }
+
+    // Equivalente a calcular_metricas
+    function metricas(range_ano, regioes, estados, dados) {
+        var c = consultar(dados, range_ano, regioes, estados);
+        if (!c.indices.length) {
+            return ['0 ton', '0 ton/ano', 'N/A', '0.0%'];
+        }
+        var total = c.totais.reduce(function (a, b) { return a + b; }, 0);
+        var media = total / c.anos.length;
+        var lider = 0;
+        for (var i = 1; i < c.totais.length; i++) {
+            if (c.totais[i] > c.totais[lider]) {
+                lider = i;
+            }
+        }
+        var crescimento = 0;
+        if (c.anos.length >= 2 && c.serie[0] > 0) {
+            crescimento = (c.serie[c.serie.length - 1] - c.serie[0]) / c.serie[0] * 100;
+        }
+        return [
+            formatarNumero(total) + ' ton',
+            formatarNumero(media) + ' ton/ano',
+            dados.estados[c.indices[lider]],
+            crescimento.toFixed(1) + '%'
+        ];
+    }
+
+    window.dash_clientside.dados = {
+        mapa: mapa,
+        serie: serie,
+        top: top,
+        regiao: regiao,
+        tabela: tabela,
+        metricas: metricas
+    };
+})();
@@ -0,0 +1,113 @@
+# Benchmark: pipeline antigo (filtros + vários groupby por requisição) versus
+# agregação base única derivada do cubo estado × ano.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_agregacao.py [fator_municipios]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agregacao import AgregadoFiltrado
+from comum import cronometrar
+from cubo import CuboProducao
+from dados import DadosProducao, carregar_centroides, codificar, ler_csv, montar_dimensao
+
+FILTROS = [
+    ('período completo', (2000, 2024), None, None),
+    ('um ano', (2012, 2012), None, None),
+    ('uma região', (2000, 2024), ['Nordeste'], None),
+    ('vários estados', (2005, 2020), None, ['Bahia', 'Goiás', 'Mato Grosso', 'Paraná', 'Ceará']),
+]
+
+
+def ampliar(df, fator, seed=42):
+    """Divide cada registro estado × ano em `fator` registros (granularidade municipal)"""
+    if fator <= 1:
+        return df
+    rng = np.random.default_rng(seed)
+    linhas = df.loc[df.index.repeat(fator)].reset_index(drop=True)
+    pesos = rng.random(len(linhas))
+    grupos = np.repeat(np.arange(len(df)), fator)
+    pesos /= np.bincount(grupos, weights=pesos)[grupos]
+    linhas['producao'] = np.rint(linhas['producao'].to_numpy() * pesos).astype(np.int64)
+    return linhas
+
+
+class Contador:
+    """Conta passadas sobre dados no nível de linha e quantas linhas cada uma percorre"""
+
+    def __init__(self):
+        self.passadas = 0
+        self.linhas = 0
+
+    def __call__(self, df):
+        self.passadas += 1
+        self.linhas += len(df)
+        return df
+
+
+def pipeline_antigo(df, range_ano, regioes, estados, conta):
+    """Reprodução do caminho anterior de update_dashboard + calcular_metricas"""
+    df_filtrado = df[(conta(df)['ano'] >= range_ano[0]) & (df['ano'] <= range_ano[1])]
+    if regioes:
+        df_filtrado = df_filtrado[conta(df_filtrado)['regiao'].isin(regioes)]
+    if estados:
+        df_filtrado = df_filtrado[conta(df_filtrado)['estado'].isin(estados)]
+
+    conta(df_filtrado).groupby(['sigla', 'estado', 'regiao'])['producao'].sum().reset_index()
+    conta(df_filtrado).groupby('ano')['producao'].sum().reset_index()
+    df_top = conta(df_filtrado).groupby(['estado', 'regiao'])['producao'].sum().reset_index()
+    df_top.sort_values('producao', ascending=True).tail(10)
+    conta(df_filtrado).groupby('regiao')['producao'].sum().reset_index()
+    df_tabela = conta(df_filtrado).groupby(['estado', 'regiao', 'ano'])['producao'].sum().reset_index()
+    df_tabela.sort_values('producao', ascending=False).head(100)
+
+    if df_filtrado.empty:
+        return
+    conta(df_filtrado)['producao'].sum()
+    conta(df_filtrado).groupby('ano')['producao'].sum().mean()
+    conta(df_filtrado).groupby('estado')['producao'].sum().idxmax()
+    anos_disp = sorted(conta(df_filtrado)['ano'].unique())
+    if len(anos_disp) >= 2:
+        conta(df_filtrado)[df_filtrado['ano'] == anos_disp[0]]['producao'].sum()
+        conta(df_filtrado)[df_filtrado['ano'] == anos_disp[-1]]['producao'].sum()
+
+
+def main(fator=100, repeticoes=5):
+    df = ampliar(ler_csv(), fator)
+    df[['estado', 'sigla', 'regiao']] = df[['estado', 'sigla', 'regiao']].astype(str)
+    fatos, dimensao, regioes = codificar(df, carregar_centroides()[0])
+    dados = DadosProducao(fatos, montar_dimensao(dimensao, regioes), regioes)
+
+    inicio = time.perf_counter()
+    cubo = CuboProducao(dados)
+    montagem = (time.perf_counter() - inicio) * 1000
+
+    print(f"Registros: {len(df):,} (fator {fator})")
+    print(f"Montagem do cubo (uma vez, na inicialização): {montagem:.1f} ms - 1 passada\n")
+    print(f"{'filtro':<18}{'antigo (ms)':>12}{'passadas':>10}{'linhas lidas':>14}"
+          f"{'novo (ms)':>11}{'células':>9}{'ganho':>8}")
+
+    for nome, range_ano, regioes_sel, estados_sel in FILTROS:
+        conta = Contador()
+        pipeline_antigo(df, range_ano, regioes_sel, estados_sel, conta)
+        t_antigo = cronometrar(
+            lambda: pipeline_antigo(df, range_ano, regioes_sel, estados_sel, Contador()), repeticoes)
+
+        agregado = AgregadoFiltrado(cubo, range_ano, regioes_sel, estados_sel)
+        celulas = agregado.consulta.producao.size
+        t_novo = cronometrar(
+            lambda: AgregadoFiltrado(cubo, range_ano, regioes_sel, estados_sel), repeticoes)
+
+        print(f"{nome:<18}{t_antigo:>12.2f}{conta.passadas:>10}{conta.linhas:>14,}"
+              f"{t_novo:>11.2f}{celulas:>9}{t_antigo / t_novo:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
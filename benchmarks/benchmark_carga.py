@@ -0,0 +1,392 @@
+# Teste de carga: usuários virtuais concorrentes navegando no dashboard, contra
+# o servidor Flask do próprio app rodando localmente (sem acesso à rede). Cada
+# usuário abre a página e repete eventos sorteados com pesos realistas:
+# arrastes do período, troca de regiões, estados e ordenação, páginas da
+# tabela, modo e zoom do mapa e troca de tema. Como o navegador, cada evento
+# dispara os callbacks do servidor que têm a propriedade alterada como Input
+# (lidos de /_dash-dependencies), com o estado atual dos demais controles; a
+# troca de tema é resolvida no navegador e só muda o tema enviado nas
+# requisições seguintes.
+#
+# Cada usuário mantém uma conexão e envia as requisições de um evento em
+# sequência, então a concorrência é o número de requisições em andamento.
+# Para cada nível de concorrência mostra vazão, percentis de latência, taxa
+# de erros e bytes recebidos, no total, por callback e por evento.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_carga.py --concorrencia 1 4 16 --duracao 20
+#   python benchmarks/benchmark_carga.py --servidor gunicorn
+#   python benchmarks/benchmark_carga.py --url http://127.0.0.1:8050/   (app já em execução)
+
+import argparse
+import http.client
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from comum import HOST, aguardar_porta, porta_livre, requisicao, servidor_local
+
+# Peso de cada evento em uma sessão (os arrastes do período são o gesto mais comum)
+EVENTOS = {
+    'periodo': 8,
+    'regiao': 3,
+    'estado': 2,
+    'ordenacao': 1,
+    'pagina': 2,
+    'modo_mapa': 1,
+    'zoom': 1,
+    'tema': 1,
+}
+
+# Eventos por sessão antes de o usuário abrir a página de novo
+EVENTOS_SESSAO = 20
+
+# Cabeçalhos enviados pelo navegador nos callbacks (a resposta pode vir comprimida)
+CABECALHOS = {'Content-Type': 'application/json', 'Accept': 'application/json',
+              'Accept-Encoding': 'gzip, deflate, br'}
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+# ============================================================================
+# ALVO
+# ============================================================================
+
+class Alvo:
+    """Endereço do app: host, porta e prefixo das rotas do Dash"""
+
+    def __init__(self, url):
+        partes = urlsplit(url)
+        self.host, self.porta = partes.hostname, partes.port or 80
+        self.prefixo = partes.path.rstrip('/') + '/'
+
+    def conexao(self, timeout=60):
+        return http.client.HTTPConnection(self.host, self.porta, timeout=timeout)
+
+    def obter_json(self, rota):
+        conexao = self.conexao()
+        try:
+            conexao.request('GET', self.prefixo + rota)
+            resposta = conexao.getresponse()
+            corpo = resposta.read()
+        finally:
+            conexao.close()
+        if resposta.status != 200:
+            raise RuntimeError(f'GET {self.prefixo}{rota}: HTTP {resposta.status}')
+        return json.loads(corpo)
+
+
+# ============================================================================
+# PAINEL: CALLBACKS E VALORES INICIAIS LIDOS DO PRÓPRIO APP
+# ============================================================================
+
+def nome_callback(dependencia):
+    """Componente da primeira saída ('..tabela-dados.data...' → 'tabela-dados')"""
+    return dependencia['output'].strip('.').split('...')[0].rsplit('.', 1)[0]
+
+
+def propriedades(no, encontradas=None):
+    """{id: props} de todos os componentes com id no layout serializado"""
+    encontradas = {} if encontradas is None else encontradas
+    if isinstance(no, list):
+        for filho in no:
+            propriedades(filho, encontradas)
+    elif isinstance(no, dict) and 'props' in no:
+        props = no['props']
+        if isinstance(props.get('id'), str):
+            encontradas[props['id']] = props
+        propriedades(props.get('children'), encontradas)
+    return encontradas
+
+
+class Painel:
+    """Callbacks do servidor e controles do dashboard, como o navegador os recebe"""
+
+    def __init__(self, alvo):
+        dependencias = alvo.obter_json('_dash-dependencies')
+        # Callbacks clientside e dos componentes de tema (ids por padrão) não chegam ao servidor
+        self.callbacks = [d for d in dependencias if not d.get('clientside_function')
+                          and not d['output'].lstrip('.').startswith('{')]
+        if not self.callbacks:
+            raise SystemExit('Nenhum callback roda no servidor (CLIENTSIDE_FILTERING ativo?)')
+
+        componentes = propriedades(alvo.obter_json('_dash-layout'))
+        self.iniciais = {}
+        for dependencia in self.callbacks:
+            for item in dependencia['inputs'] + dependencia['state']:
+                chave = f"{item['id']}.{item['property']}"
+                self.iniciais[chave] = componentes.get(item['id'], {}).get(item['property'])
+
+        def opcoes(componente):
+            return [o['value'] if isinstance(o, dict) else o
+                    for o in componentes.get(componente, {}).get('options') or []]
+
+        slider = componentes['range-slider-ano']
+        self.anos = (slider['min'], slider['max'])
+        self.regioes = opcoes('dropdown-regiao')
+        self.estados = opcoes('dropdown-estado')
+        self.ordenacoes = opcoes('dropdown-ordenacao')
+        self.modos_mapa = opcoes('modo-mapa')
+        self.niveis = componentes.get('niveis-mapa', {}).get('data') or []
+        self.temas = list(componentes.get('temas-store', {}).get('data') or {'darkly': None})
+
+    def disparados(self, alteradas):
+        """Callbacks com alguma das propriedades alteradas como Input (None: carga da página)"""
+        for dependencia in self.callbacks:
+            entradas = [f"{x['id']}.{x['property']}" for x in dependencia['inputs']]
+            if alteradas is None:
+                yield dependencia, []
+            elif any(p in alteradas for p in entradas):
+                yield dependencia, [p for p in entradas if p in alteradas]
+
+
+# ============================================================================
+# USUÁRIOS VIRTUAIS
+# ============================================================================
+
+class Sessao:
+    """Estado dos controles de um usuário; cada evento altera alguns e devolve quais"""
+
+    def __init__(self, painel, rng):
+        self.painel, self.rng = painel, rng
+        self.valores = dict(painel.iniciais)
+
+    def subconjunto(self, opcoes, maximo):
+        quantidade = int(self.rng.integers(0, min(maximo, len(opcoes)) + 1))
+        return [str(x) for x in self.rng.choice(opcoes, quantidade, replace=False)]
+
+    def evento(self, nome):
+        painel, rng, valores = self.painel, self.rng, self.valores
+        if nome == 'periodo':
+            # Um arraste move uma das pontas alguns anos a partir da posição atual
+            inicio, fim = valores.get('range-slider-ano.value') or painel.anos
+            passo = int(rng.choice([-1, 1])) * int(rng.integers(1, 6))
+            if rng.random() < 0.5:
+                inicio = int(np.clip(inicio + passo, painel.anos[0], fim))
+            else:
+                fim = int(np.clip(fim + passo, inicio, painel.anos[1]))
+            valores['range-slider-ano.value'] = [inicio, fim]
+            alteradas = ['range-slider-ano.value']
+        elif nome == 'regiao':
+            valores['dropdown-regiao.value'] = self.subconjunto(painel.regioes, 2)
+            alteradas = ['dropdown-regiao.value']
+        elif nome == 'estado':
+            valores['dropdown-estado.value'] = self.subconjunto(painel.estados, 5)
+            alteradas = ['dropdown-estado.value']
+        elif nome == 'ordenacao':
+            valores['dropdown-ordenacao.value'] = str(rng.choice(painel.ordenacoes))
+            alteradas = ['dropdown-ordenacao.value']
+        elif nome == 'pagina':
+            valores['tabela-dados.page_current'] = int(rng.integers(0, 5))
+            return ['tabela-dados.page_current']
+        elif nome == 'modo_mapa':
+            valores['modo-mapa.value'] = str(rng.choice(painel.modos_mapa))
+            return ['modo-mapa.value']
+        elif nome == 'zoom':
+            if not painel.niveis:
+                return []
+            valores['nivel-mapa.data'] = rng.choice(painel.niveis).item()
+            return ['nivel-mapa.data']
+        elif nome == 'tema':
+            # Resolvido no navegador: nenhuma requisição, só o State das próximas
+            atual = (valores.get('theme-store.data') or {}).get('theme')
+            outros = [t for t in painel.temas if t != atual] or painel.temas
+            valores['theme-store.data'] = {'theme': str(rng.choice(outros))}
+            return []
+        else:
+            raise ValueError(f'Evento desconhecido: {nome}')
+        # Filtros e ordenação levam a tabela de volta à primeira página
+        valores['tabela-dados.page_current'] = 0
+        return alteradas
+
+
+def usuario(painel, alvo, medir_de, ate, pausa, seed):
+    """Sessões de um usuário virtual até `ate`; devolve (requisições, eventos) medidos"""
+    rng = np.random.default_rng(seed)
+    nomes, pesos = list(EVENTOS), np.array(list(EVENTOS.values()), dtype=float)
+    pesos /= pesos.sum()
+    requisicoes, eventos = [], []
+    conexao = alvo.conexao()
+
+    def enviar(rotulo, metodo, rota, corpo=None):
+        nonlocal conexao
+        inicio = time.perf_counter()
+        try:
+            conexao.request(metodo, alvo.prefixo + rota, corpo, CABECALHOS if corpo else {})
+            resposta = conexao.getresponse()
+            recebidos = len(resposta.read())
+            status = resposta.status
+        except (OSError, http.client.HTTPException):
+            # Falha de conexão ou tempo esgotado: conta como erro e reconecta
+            conexao.close()
+            conexao = alvo.conexao()
+            recebidos, status = 0, 0
+        fim = time.perf_counter()
+        if inicio >= medir_de:
+            requisicoes.append((rotulo, fim - inicio, status, recebidos))
+        return status in (200, 204)
+
+    sessao, restantes = None, 0
+    try:
+        while time.perf_counter() < ate:
+            inicio = time.perf_counter()
+            if restantes == 0:
+                # Abertura da página: layout, dependências e todos os callbacks iniciais
+                sessao, restantes, nome = Sessao(painel, rng), EVENTOS_SESSAO, 'abertura'
+                ok = enviar('GET /', 'GET', '') and enviar('GET _dash-layout', 'GET', '_dash-layout')
+                ok = ok and enviar('GET _dash-dependencies', 'GET', '_dash-dependencies')
+                disparos = list(painel.disparados(None)) if ok else []
+            else:
+                nome = str(rng.choice(nomes, p=pesos))
+                disparos = list(painel.disparados(sessao.evento(nome)))
+                restantes -= 1
+            for dependencia, alteradas in disparos:
+                enviar(nome_callback(dependencia), 'POST', '_dash-update-component',
+                       json.dumps(requisicao(dependencia, sessao.valores, alteradas)).encode())
+            if inicio >= medir_de:
+                eventos.append((nome, time.perf_counter() - inicio, len(disparos)))
+            if pausa:
+                time.sleep(rng.exponential(pausa))
+    finally:
+        conexao.close()
+    return requisicoes, eventos
+
+
+def executar_nivel(painel, alvo, usuarios, duracao, aquecimento, pausa, seed):
+    """Roda `usuarios` usuários virtuais; devolve (requisições, eventos) após o aquecimento"""
+    inicio = time.perf_counter()
+    medir_de = inicio + aquecimento
+    ate = medir_de + duracao
+    with ThreadPoolExecutor(usuarios) as executor:
+        resultados = list(executor.map(
+            lambda i: usuario(painel, alvo, medir_de, ate, pausa, [seed, usuarios, i]),
+            range(usuarios)))
+    return ([r for requisicoes, _ in resultados for r in requisicoes],
+            [e for _, eventos in resultados for e in eventos])
+
+
+# ============================================================================
+# RELATÓRIO
+# ============================================================================
+
+def percentis(latencias):
+    """{'p50': ms, ..., 'max': ms}"""
+    if not latencias:
+        return {**{f'p{p}': 0.0 for p in PERCENTIS}, 'max': 0.0}
+    valores = np.array(latencias) * 1000
+    return {**{f'p{p}': float(v) for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS))},
+            'max': float(valores.max())}
+
+
+def resumir(requisicoes, eventos, duracao):
+    latencias = [r[1] for r in requisicoes]
+    erros = Counter('conexão' if r[2] == 0 else str(r[2]) for r in requisicoes if r[2] not in (200, 204))
+    por_callback = defaultdict(list)
+    for rotulo, latencia, status, _ in requisicoes:
+        por_callback[rotulo].append((latencia, status not in (200, 204)))
+    por_evento = defaultdict(list)
+    for nome, latencia, disparos in eventos:
+        por_evento[nome].append((latencia, disparos))
+    return {
+        'requisicoes': len(requisicoes),
+        'req_s': len(requisicoes) / duracao,
+        'eventos_s': len(eventos) / duracao,
+        'latencia_ms': percentis(latencias),
+        'erros': sum(erros.values()),
+        'taxa_erros': sum(erros.values()) / max(len(requisicoes), 1),
+        'erros_por_status': dict(erros),
+        'mb_s': sum(r[3] for r in requisicoes) / duracao / 1e6,
+        'callbacks': {rotulo: {'requisicoes': len(itens),
+                               'erros': sum(e for _, e in itens),
+                               'latencia_ms': percentis([l for l, _ in itens])}
+                      for rotulo, itens in sorted(por_callback.items())},
+        'eventos': {nome: {'eventos': len(itens),
+                           'requisicoes_por_evento': float(np.mean([d for _, d in itens])),
+                           'latencia_ms': percentis([l for l, _ in itens])}
+                    for nome, itens in sorted(por_evento.items())},
+    }
+
+
+def linha_percentis(latencia):
+    return ''.join(f"{latencia[f'p{p}']:>9.1f}" for p in PERCENTIS) + f"{latencia['max']:>9.1f}"
+
+
+def imprimir_nivel(usuarios, resumo):
+    cabecalho = ''.join(f"{f'p{p}':>9}" for p in PERCENTIS) + f"{'máx':>9}"
+    print(f"\nConcorrência {usuarios}: {resumo['requisicoes']:,} requisições, "
+          f"{resumo['req_s']:.1f} req/s, {resumo['eventos_s']:.1f} eventos/s, "
+          f"{resumo['mb_s']:.2f} MB/s, erros {resumo['erros']} ({resumo['taxa_erros']:.2%})"
+          + (f" {resumo['erros_por_status']}" if resumo['erros'] else ''))
+    print(f"  {'callback':<26}{'req':>7}{'erros':>7}{cabecalho}   (ms)")
+    for rotulo, dados in resumo['callbacks'].items():
+        print(f"  {rotulo:<26}{dados['requisicoes']:>7}{dados['erros']:>7}"
+              f"{linha_percentis(dados['latencia_ms'])}")
+    print(f"  {'evento':<26}{'qtd':>7}{'req/ev':>7}{cabecalho}   (ms)")
+    for nome, dados in resumo['eventos'].items():
+        print(f"  {nome:<26}{dados['eventos']:>7}{dados['requisicoes_por_evento']:>7.1f}"
+              f"{linha_percentis(dados['latencia_ms'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga dos callbacks do dashboard')
+    parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 4, 16],
+                        help='usuários virtuais simultâneos (um teste por valor)')
+    parser.add_argument('--duracao', type=float, default=20, help='segundos medidos por nível')
+    parser.add_argument('--aquecimento', type=float, default=3,
+                        help='segundos iniciais de cada nível fora das medidas')
+    parser.add_argument('--pausa', type=float, default=0,
+                        help='pausa média entre eventos de um usuário, em segundos (0 = sem pausa)')
+    parser.add_argument('--servidor', choices=('dev', 'gunicorn'), default='dev',
+                        help='servidor iniciado para o teste (python app.py ou gunicorn.conf.py)')
+    parser.add_argument('--url', help='usa um app já em execução (ex.: http://127.0.0.1:8050/)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--salvar', help='grava os resultados em JSON')
+    argumentos = parser.parse_args()
+
+    if argumentos.url:
+        alvo, servidor = Alvo(argumentos.url), nullcontext()
+    else:
+        porta = porta_livre()
+        alvo = Alvo(f'http://{HOST}:{porta}/')
+        servidor = servidor_local(argumentos.servidor, porta)
+    with servidor:
+        aguardar_porta(alvo.host, alvo.porta)
+        painel = Painel(alvo)
+        print(f"Alvo: http://{alvo.host}:{alvo.porta}{alvo.prefixo} "
+              f"({argumentos.servidor if argumentos.url is None else 'em execução'}); "
+              f"{len(painel.callbacks)} callbacks no servidor; {argumentos.duracao:g}s por nível"
+              + (f"; pausa média de {argumentos.pausa:g}s" if argumentos.pausa else ''))
+
+        resultados = {}
+        for usuarios in argumentos.concorrencia:
+            requisicoes, eventos = executar_nivel(painel, alvo, usuarios, argumentos.duracao,
+                                                  argumentos.aquecimento, argumentos.pausa,
+                                                  argumentos.seed)
+            resultados[usuarios] = resumir(requisicoes, eventos, argumentos.duracao)
+            imprimir_nivel(usuarios, resultados[usuarios])
+
+    print(f"\n{'usuários':>9}{'req/s':>9}{'eventos/s':>11}"
+          + ''.join(f"{f'p{p} (ms)':>11}" for p in PERCENTIS) + f"{'erros':>9}")
+    for usuarios, resumo in resultados.items():
+        print(f"{usuarios:>9}{resumo['req_s']:>9.1f}{resumo['eventos_s']:>11.1f}"
+              + ''.join(f"{resumo['latencia_ms'][f'p{p}']:>11.1f}" for p in PERCENTIS)
+              + f"{resumo['taxa_erros']:>9.2%}")
+
+    if argumentos.salvar:
+        with open(argumentos.salvar, 'w', encoding='utf-8') as f:
+            json.dump({'servidor': argumentos.url or argumentos.servidor,
+                       'duracao': argumentos.duracao, 'pausa': argumentos.pausa,
+                       'eventos': EVENTOS, 'niveis': resultados}, f, ensure_ascii=False, indent=1)
+        print(f"\nResultados gravados em: {argumentos.salvar}")
+    if any(resumo['erros'] for resumo in resultados.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Benchmark: compressão das respostas (callbacks, assets e GeoJSON). Mede
+# bytes originais e comprimidos por callback, custo de CPU de cada nível de
+# gzip/brotli e o tempo de transferência estimado em links móveis lentos.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_compressao.py [repeticoes]
+
+import json
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+import app as dashboard
+from benchmark_serializacao import FILTROS
+from comum import cronometrar, requisicao
+from compressao import brotli, comprimir
+
+# Vazão típica de links móveis (kbit/s) para estimar o tempo de transferência
+LINKS = {'2G/EDGE': 200, '3G rural': 750}
+
+NIVEIS = [('gzip', 1), ('gzip', 6), ('gzip', 9)]
+if brotli is not None:
+    NIVEIS += [('br', 5), ('br', 11)]
+
+
+def comprimir_nivel(corpo, codificacao, nivel):
+    if codificacao == 'br':
+        return comprimir(corpo, 'br', qualidade_brotli=nivel)
+    return comprimir(corpo, 'gzip', nivel_gzip=nivel)
+
+
+def main(repeticoes=20):
+    cliente = dashboard.app.server.test_client()
+    cliente.get('/')
+    dependencias = json.loads(cliente.get('/_dash-dependencies').data)
+    valores = {'range-slider-ano.value': list(FILTROS[0]), 'dropdown-ordenacao.value': 'producao',
+               'theme-store.data': {'theme': 'darkly'}, 'modo-mapa.value': 'choropleth',
+               'nivel-mapa.data': min(dashboard.urls_geojson, default=None),
+               'tabela-dados.page_current': 0}
+
+    # Corpos originais (sem Accept-Encoding) de cada callback e dos arquivos estáticos
+    corpos = {}
+    for dependencia in dependencias:
+        if dependencia.get('clientside_function') or 'aio' in dependencia['output']:
+            continue
+        resposta = cliente.post('/_dash-update-component', json=requisicao(dependencia, valores))
+        if resposta.status_code == 200:
+            corpos[dependencia['output'].strip('.').split('.')[0]] = resposta.data
+    for url in ['/', '/assets/custom.css', '/assets/clientside.js', *dashboard.urls_geojson.values()]:
+        corpos[url.rsplit('/', 1)[-1] or 'index'] = cliente.get(url).data
+
+    cabecalho = ''.join(f'{f"{c} {n}":>10}' for c, n in NIVEIS)
+    print(f"{'resposta':<34}{'original':>10}{cabecalho}   (bytes)")
+    for nome, corpo in corpos.items():
+        tamanhos = ''.join(f'{len(comprimir_nivel(corpo, c, n)):>10,}' for c, n in NIVEIS)
+        print(f"{nome[:33]:<34}{len(corpo):>10,}{tamanhos}")
+
+    print(f"\n{'tempo de compressão (ms)':<34}{'':>10}{cabecalho}")
+    for nome, corpo in corpos.items():
+        tempos = ''.join(f'{cronometrar(lambda: comprimir_nivel(corpo, c, n), repeticoes):>10.3f}'
+                         for c, n in NIVEIS)
+        print(f"{nome[:33]:<34}{'':>10}{tempos}")
+
+    # Atualização completa da página (todos os callbacks) em cada link
+    original = sum(len(corpo) for corpo in corpos.values() if not corpo.startswith(b'<'))
+    comprimido = sum(len(comprimir(corpo, 'gzip')) for corpo in corpos.values()
+                     if not corpo.startswith(b'<'))
+    print(f"\nCallbacks + assets + GeoJSON: {original:,} B -> {comprimido:,} B com gzip 6")
+    for link, kbps in LINKS.items():
+        print(f"  {link:<9} ({kbps} kbit/s): {original * 8 / kbps:>7.0f} ms -> "
+              f"{comprimido * 8 / kbps:>6.0f} ms")
+
+    # Contadores coletados pelo próprio servidor ao responder com gzip
+    cliente.environ_base['HTTP_ACCEPT_ENCODING'] = 'gzip, br'
+    for dependencia in dependencias:
+        if not dependencia.get('clientside_function') and 'aio' not in dependencia['output']:
+            cliente.post('/_dash-update-component', json=requisicao(dependencia, valores))
+    print(f"\n{'chave':<40}{'codif.':>8}{'resp.':>7}{'originais':>11}{'enviados':>10}{'razão':>7}")
+    for linha in dashboard.estatisticas_compressao.resumo():
+        print(f"{linha['chave'][:39]:<40}{linha['codificacao']:>8}{linha['respostas']:>7}"
+              f"{linha['bytes_originais']:>11,}{linha['bytes_enviados']:>10,}{linha['razao']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,238 @@
+# Benchmark: caminho completo de uma atualização do dashboard em várias escalas
+# de dados (gerar_dados_sinteticos.py) e combinações de filtros. Cada etapa é
+# medida isoladamente com as funções do próprio app: agregação (filtro no
+# motor de consultas), métricas, cada figura, a tabela, a serialização das
+# respostas e a atualização completa sem cache. Mostra p50/p95 e o pico de
+# memória alocada (tracemalloc) de cada etapa.
+#
+# Os resultados podem ser gravados como referência e comparados depois: uma
+# etapa cujo p50 ou pico de memória piorar mais que o limite (20% por padrão)
+# é apontada como regressão e o script termina com código 1. As etapas são
+# medidas em rodadas intercaladas com uma carga fixa de calibração, cujo
+# tempo desconta a diferença de velocidade da máquina entre a referência e a
+# execução atual.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_dashboard.py --salvar referencia.json
+#   python benchmarks/benchmark_dashboard.py --comparar referencia.json [--limite 0.2]
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from agregacao import AgregadoFiltrado, calcular_metricas
+from config import DATA_GEOJSON, MAX_RECORDS_TABLE
+from gerar_dados_sinteticos import GeradorSintetico, gerar
+from recarga import montar_base
+
+FILTROS = [
+    ('período completo', (2000, 2024), [], []),
+    ('um ano', (2012, 2012), [], []),
+    ('uma região', (2000, 2024), ['Nordeste'], []),
+    ('vários estados', (2005, 2020), [], ['Bahia', 'Ceará', 'Goiás', 'Maranhão', 'Mato Grosso',
+                                          'Mato Grosso do Sul', 'Minas Gerais', 'Paraná', 'Piauí',
+                                          'São Paulo']),
+]
+
+# Diferenças abaixo disso (ms) são ruído de medição, nunca regressão
+TOLERANCIA_MS = 0.05
+
+
+def etapas(base, filtros):
+    """Funções sem argumentos de cada etapa de uma atualização, para uma combinação de filtros"""
+    nivel = min(app.urls_geojson)
+
+    # As figuras e a tabela partem do agregado já em cache: medem só a própria montagem
+    app.cache_agregados.limpar()
+    agregado = app.obter_agregado(*filtros)
+
+    def saidas():
+        return [app.criar_mapa(*filtros, 'bootstrap', 'bubbles', nivel),
+                app.criar_serie_temporal(*filtros, 'bootstrap'),
+                app.criar_top_estados(*filtros, 'bootstrap'),
+                app.criar_distribuicao_regiao(*filtros, 'bootstrap'),
+                app.criar_tabela(*filtros, 'producao', 0, MAX_RECORDS_TABLE, [], ''),
+                app.obter_agregado(*filtros).metricas]
+
+    respostas = saidas()
+
+    def completa():
+        # Equivalente ao antigo update_dashboard: tudo recalculado e serializado
+        app.cache_agregados.limpar()
+        return pio.json.to_json_plotly(saidas())
+
+    return {
+        'agregacao': lambda: AgregadoFiltrado(base.motor, *filtros),
+        'metricas': lambda: calcular_metricas(agregado),
+        'mapa': lambda: app.criar_mapa(*filtros, 'bootstrap', 'bubbles', nivel),
+        'coropletico': lambda: app.criar_mapa(*filtros, 'bootstrap', 'choropleth', nivel),
+        'serie': lambda: app.criar_serie_temporal(*filtros, 'bootstrap'),
+        'top': lambda: app.criar_top_estados(*filtros, 'bootstrap'),
+        'regiao': lambda: app.criar_distribuicao_regiao(*filtros, 'bootstrap'),
+        'tabela': lambda: app.criar_tabela(*filtros, 'producao', 0, MAX_RECORDS_TABLE, [], ''),
+        'serializacao': lambda: pio.json.to_json_plotly(respostas),
+        'atualizacao completa': completa,
+    }
+
+
+def medir(funcoes, repeticoes):
+    """{nome: (p50 ms, p95 ms, pico de memória alocada em KB)} de cada função sem argumentos"""
+    # Rodadas intercaladas (cada rodada executa todas as funções uma vez): oscilações de
+    # velocidade da máquina atingem todas as etapas e a calibração por igual
+    tempos = {nome: [] for nome in funcoes}
+    for funcao in funcoes.values():
+        funcao()  # aquecimento
+    for _ in range(repeticoes):
+        for nome, funcao in funcoes.items():
+            inicio = time.perf_counter()
+            funcao()
+            tempos[nome].append(time.perf_counter() - inicio)
+
+    medidas = {}
+    for nome, funcao in funcoes.items():
+        # Memória em uma execução à parte: o tracemalloc deixa as medições de tempo lentas
+        tracemalloc.start()
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        p50, p95 = np.percentile(tempos[nome], [50, 95]) * 1000
+        medidas[nome] = (p50, p95, pico / 1024)
+    return medidas
+
+
+def carga_calibracao():
+    """Carga fixa de numpy, pandas e Python puro, que não depende do código do dashboard"""
+    rng = np.random.default_rng(0)
+    valores = rng.random(20000)
+    tabela = pd.DataFrame({'grupo': rng.integers(0, 100, 20000), 'valor': valores})
+
+    def carga():
+        np.sort(valores)
+        tabela.groupby('grupo')['valor'].sum()
+        json.dumps([{'x': i, 'y': i * 0.5} for i in range(1000)])
+
+    return carga
+
+
+def executar(escalas, repeticoes, motor, seed):
+    """(resultados de cada etapa, p50 da calibração em ms)"""
+    resultados, calibracao = [], []
+    base_original = app.recarregador.atual
+    try:
+        for escala in escalas:
+            with tempfile.TemporaryDirectory() as diretorio:
+                gerador = GeradorSintetico(escala, seed=seed)
+                gerar(gerador, None, diretorio, DATA_GEOJSON)
+
+                def carregar():
+                    return montar_base(os.path.join(diretorio, 'ausente.csv'), diretorio,
+                                       DATA_GEOJSON, motor=motor)
+
+                print(f"\nEscala {escala}x: {gerador.linhas:,} linhas (motor {motor})")
+                print(f"{'filtro':<18}{'etapa':<22}{'p50 (ms)':>10}{'p95 (ms)':>10}{'pico (KB)':>11}")
+                # Carga do formato colunar e montagem do cubo/motor: o único custo que cresce
+                # com os dados quando as consultas usam o cubo
+                app.recarregador.atual = base = carregar()
+                grupos = [('-', lambda: {'montagem da base': carregar}, max(3, repeticoes // 10))]
+                # etapas() aquece o cache de agregados só para os filtros do próprio grupo
+                grupos += [(nome, lambda filtros=filtros: etapas(base, filtros), repeticoes)
+                           for nome, *filtros in FILTROS]
+
+                for nome, funcoes, vezes in grupos:
+                    medidas = medir({**funcoes(), 'calibracao': carga_calibracao()}, vezes)
+                    calibracao.append(medidas.pop('calibracao')[0])
+                    for etapa, (p50, p95, pico) in medidas.items():
+                        print(f"{nome:<18}{etapa:<22}{p50:>10.3f}{p95:>10.3f}{pico:>11.1f}")
+                        resultados.append({'escala': escala, 'filtro': nome, 'etapa': etapa,
+                                           'p50_ms': p50, 'p95_ms': p95, 'pico_kb': pico})
+                del base
+    finally:
+        app.recarregador.atual = base_original
+    return resultados, float(np.median(calibracao))
+
+
+def comparar(resultados, referencia, limite, calibracao):
+    """Etapas com p50 ou pico de memória acima da referência × (1 + limite)"""
+    anteriores = {(r['escala'], r['filtro'], r['etapa']): r for r in referencia['resultados']}
+    # Tempos da referência ajustados à velocidade atual da máquina
+    fator = calibracao / referencia['calibracao_ms']
+    regressoes = []
+    print(f"\nComparação com a referência (limite de {limite:.0%}; máquina {fator:.2f}x "
+          f"o tempo da referência na calibração)")
+    print(f"{'escala':>7} {'filtro':<18}{'etapa':<22}{'p50 ref':>9}{'p50':>9}{'Δ':>8}"
+          f"{'pico ref':>10}{'pico':>9}{'Δ':>8}")
+    for atual in resultados:
+        anterior = anteriores.get((atual['escala'], atual['filtro'], atual['etapa']))
+        if anterior is None:
+            continue
+        p50_ref = anterior['p50_ms'] * fator
+        delta_tempo = atual['p50_ms'] / max(p50_ref, 1e-9) - 1
+        delta_pico = atual['pico_kb'] / max(anterior['pico_kb'], 1e-9) - 1
+        piorou = ((delta_tempo > limite and atual['p50_ms'] - p50_ref > TOLERANCIA_MS)
+                  or (delta_pico > limite and atual['pico_kb'] - anterior['pico_kb'] > 1))
+        marca = '  ← regressão' if piorou else ''
+        print(f"{atual['escala']:>7} {atual['filtro']:<18}{atual['etapa']:<22}"
+              f"{p50_ref:>9.3f}{atual['p50_ms']:>9.3f}{delta_tempo:>+8.0%}"
+              f"{anterior['pico_kb']:>10.1f}{atual['pico_kb']:>9.1f}{delta_pico:>+8.0%}{marca}")
+        if piorou:
+            regressoes.append(atual)
+    return regressoes
+
+
+def ambiente():
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'maquina': platform.machine(), 'nucleos': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do caminho de dados e figuras')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeticoes', type=int, default=30)
+    parser.add_argument('--motor', default='cubo', help="motor de consultas: cubo, pandas ou duckdb")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--salvar', help='grava os resultados (JSON) como referência')
+    parser.add_argument('--comparar', help='referência (JSON) gravada com --salvar')
+    parser.add_argument('--limite', type=float, default=0.2,
+                        help='piora relativa tolerada antes de acusar regressão (0.2 = 20%%)')
+    argumentos = parser.parse_args()
+
+    # As figuras medem só a montagem: o agregado vem do cache mesmo com ENABLE_CACHING desligado
+    app.cache_agregados.ativo = True
+    resultados, calibracao = executar(argumentos.escalas, argumentos.repeticoes,
+                                      argumentos.motor, argumentos.seed)
+    print(f"\nCalibração: {calibracao:.3f} ms")
+
+    if argumentos.salvar:
+        with open(argumentos.salvar, 'w', encoding='utf-8') as f:
+            json.dump({'ambiente': ambiente(), 'motor': argumentos.motor,
+                       'repeticoes': argumentos.repeticoes, 'calibracao_ms': calibracao,
+                       'resultados': resultados},
+                      f, ensure_ascii=False, indent=1)
+        print(f"\nReferência gravada em: {argumentos.salvar}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, 'r', encoding='utf-8') as f:
+            referencia = json.load(f)
+        if referencia.get('ambiente') != ambiente():
+            print(f"\nAtenção: referência gravada em outro ambiente ({referencia.get('ambiente')})")
+        regressoes = comparar(resultados, referencia, argumentos.limite, calibracao)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {argumentos.limite:.0%}")
+            sys.exit(1)
+        print('\nNenhuma regressão')
+
+
+if __name__ == '__main__':
+    main()
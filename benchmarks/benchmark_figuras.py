@@ -0,0 +1,96 @@
+# Benchmark: construção das figuras com plotly.express (caminho anterior)
+# versus esqueletos pré-montados de figuras.py, a partir do mesmo agregado.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_figuras.py [repeticoes]
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import plotly.express as px
+import plotly.io as pio
+from dash_bootstrap_templates import load_figure_template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agregacao import AgregadoFiltrado
+from comum import cronometrar
+from config import MAP_CENTER, MAP_ZOOM
+from cubo import CuboProducao
+from dados import carregar_dados
+from figuras import figura_mapa, figura_regiao, figura_serie, figura_top, montar_esqueletos
+
+TEMA = 'darkly'
+MAPBOX_STYLE = 'carto-darkmatter'
+
+
+def mapa_px(agregado):
+    df_mapa = agregado.df_totais.sort_values('sigla').reset_index(drop=True)
+    fig = px.scatter_mapbox(df_mapa, lat='lat', lon='lon', size='producao', color='regiao',
+                            hover_name='estado', hover_data={'producao': ':,'}, size_max=50,
+                            zoom=MAP_ZOOM, mapbox_style=MAPBOX_STYLE, center=MAP_CENTER,
+                            template=TEMA)
+    fig.update_layout(title="Produção de Algodão por Estado",
+                      margin={"r": 0, "t": 30, "l": 0, "b": 0},
+                      coloraxis_colorbar=dict(title="Produção (ton)"))
+    return fig
+
+
+def serie_px(agregado):
+    fig = px.line(agregado.df_serie, x='ano', y='producao',
+                  title='Evolução da Produção Nacional', template=TEMA)
+    fig.update_traces(line=dict(width=3))
+    fig.update_layout(xaxis_title="Ano", yaxis_title="Produção (toneladas)", hovermode='x unified')
+    return fig
+
+
+def top_px(agregado):
+    df_top = agregado.df_totais[['estado', 'regiao', 'producao']]
+    df_top = df_top.sort_values('producao', ascending=True).tail(10)
+    fig = px.bar(df_top, x='producao', y='estado', color='regiao', orientation='h',
+                 title='Top 10 Estados Produtores', template=TEMA)
+    fig.update_layout(xaxis_title="Produção (toneladas)", yaxis_title="Estado", legend_title="Região")
+    return fig
+
+
+def regiao_px(agregado):
+    return px.pie(agregado.df_regiao, values='producao', names='regiao',
+                  title='Distribuição da Produção por Região', template=TEMA)
+
+
+def main(repeticoes=20):
+    # Avisos de depreciação do pandas emitidos pelo próprio plotly.express
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    load_figure_template(['bootstrap', 'darkly'])
+    temas = {TEMA: {'mapbox_style': MAPBOX_STYLE, 'template': pio.templates[TEMA].to_plotly_json()}}
+
+    inicio = time.perf_counter()
+    esqueleto = montar_esqueletos(temas, MAP_CENTER, MAP_ZOOM)[TEMA]
+    montagem = (time.perf_counter() - inicio) * 1000
+
+    agregado = AgregadoFiltrado(CuboProducao(carregar_dados()), (2000, 2024), None, None)
+    graficos = [
+        ('mapa', mapa_px,
+         lambda: figura_mapa(esqueleto, agregado.df_totais.sort_values('sigla').reset_index(drop=True))),
+        ('série temporal', serie_px, lambda: figura_serie(esqueleto, agregado.anos, agregado.serie)),
+        ('top 10', top_px, lambda: figura_top(esqueleto, agregado.ranking_estados(10).iloc[::-1])),
+        ('regiões', regiao_px, lambda: figura_regiao(esqueleto, agregado.df_regiao)),
+    ]
+
+    print(f"Montagem dos esqueletos (uma vez, na inicialização): {montagem:.1f} ms\n")
+    print(f"{'gráfico':<16}{'px (ms)':>10}{'esqueleto (ms)':>16}{'ganho':>8}")
+    total_px = total_novo = 0
+    for nome, antigo, novo in graficos:
+        t_px = cronometrar(lambda: antigo(agregado), repeticoes)
+        t_novo = cronometrar(novo, repeticoes)
+        total_px += t_px
+        total_novo += t_novo
+        print(f"{nome:<16}{t_px:>10.2f}{t_novo:>16.3f}{t_px / t_novo:>7.0f}x")
+    print(f"{'total':<16}{total_px:>10.2f}{total_novo:>16.3f}{total_px / total_novo:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
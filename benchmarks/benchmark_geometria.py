@@ -0,0 +1,115 @@
+# Benchmark: payload das fronteiras do mapa antes e depois da simplificação
+# topológica e da quantização (simplificacao.py).
+#
+# Gera uma partição sintética do território com fronteiras densas e
+# irregulares (semelhantes às malhas do IBGE) e compara GeoJSON original,
+# TopoJSON por nível de zoom e o GeoJSON quantizado servido ao plotly.js.
+# Confere também que vizinhos continuam compartilhando exatamente a mesma
+# fronteira após a simplificação (sem buracos nem sobreposições).
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_geometria.py [celulas_por_eixo] [pontos_por_aresta]
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import GEO_SIMPLIFY_TOLERANCE_PX, GEO_ZOOM_LEVELS
+from simplificacao import (Quantizacao, Topologia, graus_por_pixel, topojson_para_geojson)
+
+LIMITES = (-74.0, -34.0, -34.0, 5.5)  # lon mín, lat mín, lon máx, lat máx
+
+
+def aresta_irregular(a, b, pontos, seed):
+    """Fronteira densa entre dois nós da grade (a mesma para os dois vizinhos)"""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 1, pontos + 2)
+    passeio = np.cumsum(rng.normal(0, 1, pontos + 2))
+    passeio -= passeio[0] + t * (passeio[-1] - passeio[0])  # extremos fixos
+    passeio *= np.sin(np.pi * t)  # afasta-se pouco dos cantos: fronteiras não se cruzam
+    normal = np.array([-(b[1] - a[1]), b[0] - a[0]])
+    desvio = 0.1 * passeio[:, None] * normal / (np.abs(passeio).max() + 1e-12)
+    return a + t[:, None] * (b - a) + desvio
+
+
+def particao_sintetica(celulas=12, pontos=400):
+    """FeatureCollection com celulas × celulas polígonos vizinhos"""
+    lon0, lat0, lon1, lat1 = LIMITES
+    xs, ys = np.linspace(lon0, lon1, celulas + 1), np.linspace(lat0, lat1, celulas + 1)
+    arestas = {}
+
+    def aresta(p, q):
+        chave = (min(p, q), max(p, q))
+        if chave not in arestas:
+            a = np.array([xs[chave[0][0]], ys[chave[0][1]]])
+            b = np.array([xs[chave[1][0]], ys[chave[1][1]]])
+            arestas[chave] = aresta_irregular(a, b, pontos, seed=hash(chave) & 0xffffffff)
+        linha = arestas[chave]
+        return linha if chave == (p, q) else linha[::-1]
+
+    feicoes = []
+    for i in range(celulas):
+        for j in range(celulas):
+            cantos = [(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1), (i, j)]
+            anel = np.vstack([aresta(p, q)[:-1] for p, q in zip(cantos[:-1], cantos[1:])])
+            anel = np.vstack([anel, anel[:1]])
+            feicoes.append({'type': 'Feature', 'id': f'C{i}_{j}',
+                            'properties': {'sigla': f'C{i}_{j}'},
+                            'geometry': {'type': 'Polygon', 'coordinates': [anel.tolist()]}})
+    return {'type': 'FeatureCollection', 'features': feicoes}
+
+
+def vertices(geojson):
+    return sum(len(anel) for f in geojson['features'] for anel in f['geometry']['coordinates'])
+
+
+def fronteiras_consistentes(geojson):
+    """Toda aresta interna aparece em exatamente dois anéis, em sentidos opostos"""
+    contagem = Counter()
+    for feicao in geojson['features']:
+        for anel in feicao['geometry']['coordinates']:
+            pontos = [tuple(p) for p in anel]
+            for p, q in zip(pontos[:-1], pontos[1:]):
+                contagem[(p, q)] += 1
+    return all(n == 1 for n in contagem.values()) and all(
+        contagem.get((q, p), 0) <= 1 for (p, q) in contagem)
+
+
+def tamanho(objeto):
+    return len(json.dumps(objeto, separators=(',', ':')).encode('utf-8'))
+
+
+def main(celulas=12, pontos=400):
+    original = particao_sintetica(celulas, pontos)
+    bytes_original = tamanho(original)
+    print(f"GeoJSON original: {len(original['features'])} polígonos, "
+          f"{vertices(original):,} vértices, {bytes_original:,} bytes\n")
+
+    inicio = time.perf_counter()
+    topologia = Topologia(original, Quantizacao(original))
+    t_topologia = (time.perf_counter() - inicio) * 1000
+    print(f"Topologia: {len(topologia.arcos)} arcos únicos ({t_topologia:.0f} ms)\n")
+
+    print(f"{'zoom':<6}{'vértices':>10}{'TopoJSON (B)':>14}{'GeoJSON (B)':>13}"
+          f"{'redução':>9}{'build (ms)':>12}{'fronteiras':>12}")
+    for zoom in GEO_ZOOM_LEVELS:
+        inicio = time.perf_counter()
+        tolerancia = GEO_SIMPLIFY_TOLERANCE_PX * graus_por_pixel(zoom) / topologia.quantizacao.scale.min()
+        topojson = topologia.para_topojson(topologia.simplificar(tolerancia))
+        t_build = (time.perf_counter() - inicio) * 1000
+        servido = topojson_para_geojson(topojson)
+        bytes_servido = tamanho(servido)
+        consistente = 'ok' if fronteiras_consistentes(servido) else 'FALHOU'
+        print(f"{zoom:<6}{vertices(servido):>10,}{tamanho(topojson):>14,}{bytes_servido:>13,}"
+              f"{bytes_original / bytes_servido:>8.1f}x{t_build:>12.0f}{consistente:>12}")
+
+
+if __name__ == '__main__':
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    main(*argumentos)
@@ -0,0 +1,105 @@
+# Benchmark: memória por processo com o cubo montado em cada worker x anexado
+# ao segmento compartilhado (memoria_compartilhada.py). Um cubo sintético de
+# granularidade municipal é gravado no formato colunar; N processos (spawn,
+# sem herdar páginas do pai) carregam os dados, montam ou anexam o cubo e
+# informam USS (memória só deles) e PSS (memória compartilhada dividida
+# entre quem a usa), lidos de /proc/self/smaps_rollup (Linux).
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_memoria.py [linhas_do_cubo] [anos]
+
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cubo import CuboProducao
+from dados import carregar_dados, salvar_colunas
+from memoria_compartilhada import SegmentoCubo
+
+REGIOES = ['Centro-Oeste', 'Nordeste', 'Norte', 'Sudeste', 'Sul']
+
+
+def gravar_dados_sinteticos(diretorio, linhas, anos, seed=42):
+    """Formato colunar com `linhas` unidades (estados do cubo) × `anos` anos"""
+    rng = np.random.default_rng(seed)
+    dimensao = {
+        'estado': [f'Município {i:06d}' for i in range(linhas)],
+        'sigla': [f'M{i:06d}' for i in range(linhas)],
+        'regiao_id': rng.integers(0, len(REGIOES), linhas).tolist(),
+        'lon': rng.uniform(-73, -35, linhas).tolist(),
+        'lat': rng.uniform(-33, 5, linhas).tolist()
+    }
+    fatos = pd.DataFrame({
+        'ano': np.tile(np.arange(2025 - anos, 2025, dtype=np.int16), linhas),
+        'estado_id': np.repeat(np.arange(linhas, dtype=np.int16), anos),
+        'producao': rng.lognormal(8, 2, linhas * anos).astype(np.int64)
+    })
+    salvar_colunas(fatos, dimensao, REGIOES, diretorio)
+
+
+def memoria_processo():
+    """(USS, PSS) em MB do processo atual"""
+    campos = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for linha in f:
+            partes = linha.split()
+            if len(partes) == 3 and partes[2] == 'kB':
+                campos[partes[0].rstrip(':')] = int(partes[1])
+    uss = campos.get('Private_Clean', 0) + campos.get('Private_Dirty', 0)
+    return uss / 1024, campos.get('Pss', 0) / 1024
+
+
+def worker(modo, diretorio_dados, diretorio_segmento, barreira, fila):
+    dados = carregar_dados(os.path.join(diretorio_dados, 'ausente.csv'), diretorio_dados,
+                           os.path.join(diretorio_dados, 'ausente.geojson'))
+    if modo == 'compartilhado':
+        cubo = SegmentoCubo(dados, diretorio_segmento).cubo
+    else:
+        cubo = CuboProducao(dados)
+    # Percorre todos os vetores para que as páginas estejam de fato mapeadas
+    for valores in cubo.vetores().values():
+        np.asarray(valores).sum()
+    barreira.wait()  # todos os processos vivos ao mesmo tempo
+    fila.put(memoria_processo())
+    barreira.wait()
+
+
+def medir(modo, n_processos, diretorio_dados, diretorio_segmento):
+    contexto = multiprocessing.get_context('spawn')
+    barreira, fila = contexto.Barrier(n_processos), contexto.Queue()
+    processos = [contexto.Process(target=worker, args=(modo, diretorio_dados, diretorio_segmento,
+                                                       barreira, fila))
+                 for _ in range(n_processos)]
+    for processo in processos:
+        processo.start()
+    medidas = [fila.get() for _ in processos]
+    for processo in processos:
+        processo.join()
+    uss = np.mean([m[0] for m in medidas])
+    pss = np.sum([m[1] for m in medidas])
+    print(f"{modo:<15}{n_processos:>9}{uss:>14.1f}{pss:>14.1f}")
+
+
+def main(linhas=20000, anos=60):
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print('Requer Linux (/proc/self/smaps_rollup)')
+        return
+    with tempfile.TemporaryDirectory() as diretorio_dados, \
+            tempfile.TemporaryDirectory() as diretorio_segmento:
+        gravar_dados_sinteticos(diretorio_dados, linhas, anos)
+        cubo_mb = (linhas * (anos * 8 * 3 + anos)) / 2 ** 20
+        print(f"Cubo sintético: {linhas:,} unidades × {anos} anos (~{cubo_mb:.0f} MB de vetores)")
+        print(f"{'modo':<15}{'processos':>9}{'USS médio MB':>14}{'PSS total MB':>14}")
+        for n_processos in (1, 2, 4, 8):
+            medir('por processo', n_processos, diretorio_dados, diretorio_segmento)
+            medir('compartilhado', n_processos, diretorio_dados, diretorio_segmento)
+
+
+if __name__ == '__main__':
+    main(*(int(argumento) for argumento in sys.argv[1:3]))
@@ -0,0 +1,79 @@
+# Benchmark: serialização das figuras (json padrão x orjson), tamanho do
+# payload e respostas de callback com e sem o cache de JSON serializado.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_serializacao.py [repeticoes]
+
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+import app as dashboard
+from comum import cronometrar, requisicao
+from figuras import figura_mapa
+
+FILTROS = ((2000, 2024), (), ())
+
+
+def mapa_municipal(linhas=5570, seed=42):
+    """Mapa de bolhas sintético na granularidade municipal"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'estado': [f'Município {i}' for i in range(linhas)],
+        'regiao': rng.choice(dashboard.base_atual().regioes, linhas),
+        'lat': rng.uniform(-33, 5, linhas),
+        'lon': rng.uniform(-73, -35, linhas),
+        'producao': rng.lognormal(9, 2, linhas).astype(np.int64)
+    })
+    return figura_mapa(dashboard.ESQUELETOS['darkly'], df)
+
+
+def main(repeticoes=50):
+    figuras = {
+        'mapa': dashboard.criar_mapa(*FILTROS, 'darkly', 'bubbles', None),
+        'série temporal': dashboard.criar_serie_temporal(*FILTROS, 'darkly'),
+        'top 10': dashboard.criar_top_estados(*FILTROS, 'darkly'),
+        'regiões': dashboard.criar_distribuicao_regiao(*FILTROS, 'darkly'),
+        'mapa municipal': mapa_municipal(),
+    }
+
+    print(f"{'figura':<16}{'json (ms)':>10}{'orjson (ms)':>12}{'tamanho (B)':>13}")
+    for nome, figura in figuras.items():
+        t_json = cronometrar(lambda: to_json_plotly(figura, engine='json'), repeticoes)
+        t_orjson = cronometrar(lambda: to_json_plotly(figura, engine='orjson'), repeticoes)
+        tamanho = len(to_json_plotly(figura, engine='orjson'))
+        print(f"{nome:<16}{t_json:>10.3f}{t_orjson:>12.3f}{tamanho:>13,}")
+
+    # Respostas HTTP dos callbacks: estado novo x estado repetido
+    cliente = dashboard.app.server.test_client()
+    cliente.get('/')
+    dependencias = json.loads(cliente.get('/_dash-dependencies').data)
+    valores = {'range-slider-ano.value': list(FILTROS[0]), 'dropdown-ordenacao.value': 'producao',
+               'theme-store.data': {'theme': 'darkly'}}
+    corpos = [requisicao(d, valores) for d in dependencias
+              if not d.get('clientside_function') and 'aio' not in d['output']]
+
+    def responder():
+        for corpo in corpos:
+            cliente.post('/_dash-update-component', json=corpo)
+
+    def sem_cache():
+        dashboard.cache_respostas.limpar()
+        dashboard.cache_saidas.limpar()
+        responder()
+
+    print(f"\n{len(corpos)} callbacks por atualização da página:")
+    print(f"  sem cache:              {cronometrar(sem_cache, repeticoes // 5 or 1):.2f} ms")
+    print(f"  JSON em cache (repete): {cronometrar(responder, repeticoes // 5 or 1):.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,93 @@
+# Benchmark: vazão dos callbacks no servidor de desenvolvimento (python app.py,
+# com e sem debug) e no gunicorn com preload (gunicorn.conf.py). Cada servidor
+# é iniciado em um subprocesso e recebe a mesma sequência de requisições de
+# callback, com filtros sorteados a partir de uma seed, de vários clientes
+# concorrentes.
+#
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_servidor.py [requisicoes] [clientes]
+
+import http.client
+import json
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from comum import HOST, requisicao, servidor_local
+
+PORTA = 8765
+ROTA = '/_dash-update-component'
+
+
+def obter(caminho):
+    conexao = http.client.HTTPConnection(HOST, PORTA, timeout=30)
+    conexao.request('GET', caminho)
+    return conexao.getresponse().read()
+
+
+def corpos_requisicoes(quantidade, seed=42):
+    """Requisições de callback com janelas de anos e regiões sorteadas"""
+    dependencias = [d for d in json.loads(obter('/_dash-dependencies'))
+                    if not d.get('clientside_function') and 'aio' not in d['output']]
+    rng = np.random.default_rng(seed)
+    regioes = ['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul']
+    corpos = []
+    for _ in range(quantidade):
+        inicio = int(rng.integers(2000, 2024))
+        valores = {'range-slider-ano.value': [inicio, int(rng.integers(inicio, 2025))],
+                   'dropdown-regiao.value': list(rng.choice(regioes, rng.integers(0, 3), replace=False)),
+                   'dropdown-ordenacao.value': 'producao', 'theme-store.data': {'theme': 'darkly'},
+                   'modo-mapa.value': 'bubbles', 'tabela-dados.page_current': 0,
+                   'tabela-dados.page_size': 100}
+        dependencia = dependencias[int(rng.integers(len(dependencias)))]
+        corpos.append(json.dumps(requisicao(dependencia, valores)).encode())
+    return corpos
+
+
+def disparar(corpos, clientes):
+    """Envia os corpos com `clientes` conexões concorrentes; devolve (duração, latências, erros)"""
+    def cliente(parte):
+        conexao = http.client.HTTPConnection(HOST, PORTA, timeout=60)
+        latencias, erros = [], 0
+        for corpo in parte:
+            inicio = time.perf_counter()
+            conexao.request('POST', ROTA, corpo, {'Content-Type': 'application/json'})
+            resposta = conexao.getresponse()
+            resposta.read()
+            latencias.append(time.perf_counter() - inicio)
+            erros += resposta.status not in (200, 204)
+        return latencias, erros
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(clientes) as executor:
+        resultados = list(executor.map(cliente, [corpos[i::clientes] for i in range(clientes)]))
+    duracao = time.perf_counter() - inicio
+    latencias = np.concatenate([r[0] for r in resultados])
+    return duracao, latencias, sum(r[1] for r in resultados)
+
+
+def medir(nome, servidor, debug, quantidade, clientes):
+    with servidor_local(servidor, PORTA, debug):
+        corpos = corpos_requisicoes(quantidade)
+        disparar(corpos[:clientes * 5], clientes)  # aquecimento das conexões e imports tardios
+        duracao, latencias, erros = disparar(corpos, clientes)
+        p50, p95 = np.percentile(latencias, [50, 95]) * 1000
+        print(f"{nome:<28}{quantidade / duracao:>10.1f}{p50:>10.2f}{p95:>10.2f}{erros:>8}")
+
+
+def main(quantidade=600, clientes=8):
+    print(f"{quantidade} requisições de callback, {clientes} clientes concorrentes")
+    print(f"{'servidor':<28}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'erros':>8}")
+    medir('python app.py (debug=True)', 'dev', True, quantidade, clientes)
+    medir('python app.py (debug=False)', 'dev', False, quantidade, clientes)
+    if shutil.which('gunicorn') is None:
+        print('gunicorn não instalado (pip install -r requirements.txt)')
+        return
+    medir('gunicorn (preload)', 'gunicorn', False, quantidade, clientes)
+
+
+if __name__ == '__main__':
+    main(*(int(argumento) for argumento in sys.argv[1:3]))
@@ -0,0 +1,69 @@
+# Benchmark: rankings e primeira página da tabela por ordenação completa
+# (sort_values + head/tail) versus seleção parcial (ranking.py).
+#
+# Os tamanhos simulam a granularidade municipal (5.570 municípios, 25 anos).
+# Execute a partir da raiz do projeto:
+#   python benchmarks/benchmark_topk.py [repeticoes]
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comum import cronometrar
+from ranking import maiores_posicoes
+from tabela import pagina_tabela
+
+TAMANHOS = [
+    ('estados × anos', 19 * 25),
+    ('municípios', 5570),
+    ('municípios × anos', 5570 * 25),
+    ('municípios × anos × 10', 5570 * 250),
+]
+
+
+def gerar_tabela(linhas, seed=42):
+    """Tabela longa sintética com colunas no formato da tabela do dashboard"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'estado': rng.choice([f'Município {i}' for i in range(5570)], linhas),
+        'regiao': rng.choice(['Centro-Oeste', 'Nordeste', 'Norte', 'Sudeste', 'Sul'], linhas),
+        'ano': rng.integers(2000, 2025, linhas),
+        'producao': rng.lognormal(9, 2, linhas).astype(np.int64)
+    })
+
+
+def casos(df):
+    """(nome, caminho por ordenação completa, caminho por seleção parcial)"""
+    producao = df['producao'].values
+    return [
+        ('top 10',
+         lambda: df.sort_values('producao', ascending=True).tail(10),
+         lambda: df.iloc[maiores_posicoes(producao, 10)].iloc[::-1]),
+        ('líder',
+         lambda: df.sort_values('producao', ascending=False).iloc[0],
+         lambda: df.iloc[maiores_posicoes(producao, 1)[0]]),
+        ('tabela, 1ª página',
+         lambda: df.sort_values('producao', ascending=False).head(100),
+         lambda: pagina_tabela(df, [('producao', False)], 0, 100)),
+        ('tabela por estado',
+         lambda: df.sort_values('estado', kind='stable').head(100),
+         lambda: pagina_tabela(df, [('estado', True)], 0, 100)),
+    ]
+
+
+def main(repeticoes=7):
+    print(f"{'linhas':<24}{'caso':<20}{'sort (ms)':>11}{'top-k (ms)':>12}{'ganho':>8}")
+    for nome, linhas in TAMANHOS:
+        df = gerar_tabela(linhas)
+        for caso, completo, parcial in casos(df):
+            t_sort = cronometrar(completo, repeticoes)
+            t_topk = cronometrar(parcial, repeticoes)
+            print(f"{nome:<24}{caso:<20}{t_sort:>11.2f}{t_topk:>12.2f}{t_sort / t_topk:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
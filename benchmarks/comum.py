@@ -0,0 +1,91 @@
+# Funções compartilhadas pelos benchmarks: a mediana de tempo de uma função,
+# o início e a parada do servidor local em um subprocesso e o corpo das
+# requisições de callback. Não importa o app: quem gera carga não carrega os dados.
+
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = '127.0.0.1'
+
+
+def cronometrar(funcao, repeticoes):
+    """Mediana, em ms, de `repeticoes` execuções de `funcao`"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return np.median(tempos) * 1000
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def comando_servidor(servidor, porta, debug=False):
+    """Linha de comando do servidor: 'dev' (python app.py) ou 'gunicorn' (gunicorn.conf.py)"""
+    if servidor == 'gunicorn':
+        if shutil.which('gunicorn') is None:
+            raise SystemExit('gunicorn não instalado (pip install -r requirements.txt)')
+        return [shutil.which('gunicorn'), '-c', 'gunicorn.conf.py', '--bind', f'{HOST}:{porta}',
+                '--access-logfile', os.devnull, 'app:server']
+    codigo = f"import app; app.app.run(debug={debug}, host='{HOST}', port={porta})"
+    return [sys.executable, '-c', codigo]
+
+
+def aguardar_porta(host, porta, segundos=120):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        try:
+            with socket.create_connection((host, porta), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Servidor não respondeu em {host}:{porta}')
+
+
+@contextmanager
+def servidor_local(servidor, porta, debug=False):
+    """Inicia o servidor em um subprocesso, espera a porta abrir e o encerra na saída"""
+    processo = subprocess.Popen(comando_servidor(servidor, porta, debug), cwd=RAIZ,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=True)
+    try:
+        aguardar_porta(HOST, porta)
+        yield processo
+    finally:
+        # Encerra o grupo inteiro (reloader do debug e workers do gunicorn)
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait()
+
+
+def requisicao(dependencia, valores, alteradas=None):
+    """Corpo de POST /_dash-update-component para uma dependência do layout
+
+    `alteradas` são as propriedades que dispararam o callback (changedPropIds);
+    None considera todas as entradas.
+    """
+    saidas = [dict(zip(('id', 'property'), s.rsplit('.', 1)))
+              for s in dependencia['output'].strip('.').split('...')]
+
+    def valores_de(lista):
+        return [{'id': x['id'], 'property': x['property'],
+                 'value': valores.get(f"{x['id']}.{x['property']}")} for x in lista]
+
+    if alteradas is None:
+        alteradas = [f"{x['id']}.{x['property']}" for x in dependencia['inputs']]
+    return {'output': dependencia['output'],
+            'outputs': saidas if dependencia['output'].startswith('..') else saidas[0],
+            'inputs': valores_de(dependencia['inputs']), 'state': valores_de(dependencia['state']),
+            'changedPropIds': alteradas}
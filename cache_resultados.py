@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================================
+# CACHE DE RESULTADOS (LRU + TTL)
+# ============================================================================
+
+
+def normalizar_filtros(range_ano, regioes=None, estados=None, *extras):
+    """Forma canônica dos filtros: listas vazias/None equivalem e a ordem não importa"""
+    return (
+        (int(range_ano[0]), int(range_ano[1])),
+        tuple(sorted(regioes or ())),
+        tuple(sorted(estados or ())),
+    ) + tuple(extras)
+
+
+class CacheResultados:
+    """Cache LRU em memória com expiração por tempo e contadores de acerto/erro"""
+
+    def __init__(self, max_itens, timeout, ativo=True):
+        self.max_itens = max_itens
+        self.timeout = timeout
+        self.ativo = ativo
+        self.acertos = 0
+        self.erros = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna (True, valor) em caso de acerto ou (False, None)"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and agora - item[0] <= self.timeout:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, item[1]
+            if item is not None:
+                del self._itens[chave]
+            self.erros += 1
+            return False, None
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (time.monotonic(), valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def obter_ou_calcular(self, chave, funcao, *args):
+        """Consulta o cache e, em caso de erro, calcula e guarda o resultado"""
+        if not self.ativo:
+            return funcao(*args)
+        achou, valor = self.obter(chave)
+        if not achou:
+            valor = funcao(*args)
+            self.guardar(chave, valor)
+        return valor
+
+    def migrar(self, nova_chave):
+        """Reindexa os itens: nova_chave(chave) devolve a chave nova, ou None para descartar"""
+        with self._lock:
+            itens, self._itens = self._itens, OrderedDict()
+            for chave, item in itens.items():
+                nova = nova_chave(chave)
+                if nova is not None:
+                    self._itens[nova] = item
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.erros
+            return {
+                'itens': len(self._itens),
+                'acertos': self.acertos,
+                'erros': self.erros,
+                'taxa_acerto': self.acertos / total if total else 0.0
+            }
@@ -1,12 +1,15 @@
 import pandas as pd
+from dados import carregar_dados
 import plotly.express as px
 import plotly.graph_objects as go
 
-# Load the cotton production data
-df = pd.read_csv("dados_algodao.csv")
+# Load the cotton production data (state codes + dimension tables)
+dados = carregar_dados()
+df = dados.fatos.assign(regiao_id=dados.regiao_id())
 
-# Aggregate data by year and region
-df_agg = df.groupby(['ano', 'regiao'])['producao'].sum().reset_index()
+# Aggregate data by year and region code, then attach region labels
+df_agg = df.groupby(['ano', 'regiao_id'])['producao'].sum().reset_index()
+df_agg['regiao'] = df_agg['regiao_id'].map(dict(enumerate(dados.regioes)))
 
 # Create the time series chart
 fig = px.line(df_agg, 
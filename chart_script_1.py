@@ -1,15 +1,18 @@
 import pandas as pd
+from dados import carregar_dados
 import plotly.graph_objects as go
 import plotly.express as px
 
-# Load the cotton data
-df = pd.read_csv("dados_algodao.csv")
+# Load the cotton data (state codes + dimension tables)
+dados = carregar_dados()
+df = dados.fatos
 
 # Filter data for 2020-2024
 df_filtered = df[df['ano'].between(2020, 2024)]
 
-# Aggregate production by state and region for 2020-2024
-state_production = df_filtered.groupby(['estado', 'regiao'])['producao'].sum().reset_index()
+# Aggregate production by state code for 2020-2024, then attach state/region labels
+state_production = df_filtered.groupby('estado_id')['producao'].sum().reset_index()
+state_production = dados.com_rotulos(state_production)
 
 # Sort by production and get top 10
 top_10 = state_production.sort_values('producao', ascending=False).head(10)
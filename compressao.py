@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import threading
+import time
+
+from flask import g, request
+
+from instrumentacao import nome_callback, registrar_etapa
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ============================================================================
+# COMPRESSÃO DAS RESPOSTAS
+# ============================================================================
+#
+# Respostas dos callbacks (figuras e linhas da tabela), assets, bundles do
+# Dash e o GeoJSON são comprimidos na saída do servidor Flask. A codificação
+# é negociada pelo Accept-Encoding (brotli quando instalado e aceito, senão
+# gzip) e respostas pequenas seguem sem compressão, onde o cabeçalho custaria
+# mais do que a economia. Os corpos já comprimidos ficam em cache pelo hash
+# do conteúdo: respostas repetidas e arquivos estáticos são comprimidos uma
+# única vez.
+
+# Tipos de conteúdo que valem a pena comprimir (imagens e fontes já são comprimidas)
+TIPOS_COMPRIMIVEIS = {
+    'application/json', 'application/geo+json', 'application/javascript',
+    'text/javascript', 'text/css', 'text/html', 'text/plain', 'image/svg+xml',
+}
+
+# Rota dos bundles do Dash, que comparam o If-None-Match com o próprio ETag literalmente
+ROTA_BUNDLES_DASH = '_dash-component-suites/'
+
+
+def codificacoes_disponiveis():
+    """Codificações suportadas neste ambiente, da preferida para a menos preferida"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def escolher_codificacao(aceitas, disponiveis):
+    """Codificação de maior qualidade no Accept-Encoding (empate: ordem de preferência)"""
+    melhor, qualidade_melhor = None, 0
+    for codificacao in disponiveis:
+        qualidade = aceitas.quality(codificacao)
+        if qualidade > qualidade_melhor:
+            melhor, qualidade_melhor = codificacao, qualidade
+    return melhor
+
+
+def comprimir(corpo, codificacao, nivel_gzip=6, qualidade_brotli=5):
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=qualidade_brotli)
+    # mtime fixo: o mesmo corpo gera sempre os mesmos bytes
+    return gzip.compress(corpo, compresslevel=nivel_gzip, mtime=0)
+
+
+class EstatisticasCompressao:
+    """Bytes originais e enviados por callback (ou rota), para medir a economia"""
+
+    def __init__(self):
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, chave, codificacao, bytes_originais, bytes_enviados):
+        with self._lock:
+            contador = self._contadores.setdefault(
+                (chave, codificacao), {'respostas': 0, 'bytes_originais': 0, 'bytes_enviados': 0})
+            contador['respostas'] += 1
+            contador['bytes_originais'] += bytes_originais
+            contador['bytes_enviados'] += bytes_enviados
+
+    def resumo(self):
+        """Lista de contadores por (chave, codificação), dos que mais trafegam primeiro"""
+        with self._lock:
+            linhas = [{'chave': chave, 'codificacao': codificacao, **contador}
+                      for (chave, codificacao), contador in self._contadores.items()]
+        for linha in linhas:
+            linha['razao'] = linha['bytes_originais'] / max(linha['bytes_enviados'], 1)
+        return sorted(linhas, key=lambda linha: linha['bytes_enviados'], reverse=True)
+
+
+def chave_resposta(rota_callbacks):
+    """Callback (pelas saídas) ou regra de rota que gerou a resposta atual"""
+    if request.path == rota_callbacks:
+        corpo = request.get_json(silent=True) or {}
+        return nome_callback(corpo['output']) if 'output' in corpo else request.path
+    return request.url_rule.rule if request.url_rule is not None else request.path
+
+
+def registrar_compressao(servidor, rota_callbacks, minimo=500, nivel_gzip=6,
+                         qualidade_brotli=5, cache=None, estatisticas=None):
+    """Comprime as respostas do servidor Flask conforme o Accept-Encoding do cliente"""
+    disponiveis = codificacoes_disponiveis()
+
+    def comprimir_em_cache(corpo, codificacao):
+        if cache is None:
+            return comprimir(corpo, codificacao, nivel_gzip, qualidade_brotli)
+        chave = (hashlib.blake2b(corpo, digest_size=16).digest(), codificacao)
+        achou, comprimido = cache.obter(chave)
+        if not achou:
+            comprimido = comprimir(corpo, codificacao, nivel_gzip, qualidade_brotli)
+            cache.guardar(chave, comprimido)
+        return comprimido
+
+    @servidor.after_request
+    def comprimir_resposta(resposta):
+        if (resposta.status_code != 200 or resposta.mimetype not in TIPOS_COMPRIMIVEIS
+                or 'Content-Encoding' in resposta.headers
+                or (resposta.is_streamed and not resposta.direct_passthrough)
+                or (resposta.content_length is not None and resposta.content_length < minimo)):
+            return resposta
+
+        # Arquivos estáticos (send_file) chegam em modo passthrough: lê o conteúdo
+        resposta.direct_passthrough = False
+        corpo = resposta.get_data()
+        if len(corpo) < minimo:
+            return resposta
+
+        # A representação varia com o Accept-Encoding, comprimida ou não
+        resposta.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao(request.accept_encodings, disponiveis)
+        if codificacao is None:
+            enviado = corpo
+            codificacao = 'identity'
+        else:
+            inicio = time.perf_counter()
+            enviado = comprimir_em_cache(corpo, codificacao)
+            registrar_etapa('compressao', time.perf_counter() - inicio)
+            resposta.set_data(enviado)
+            resposta.headers['Content-Encoding'] = codificacao
+            # Mesmo conteúdo em outra codificação: o ETag passa a ser fraco, exceto nos
+            # bundles do Dash, que deixariam de responder 304 a um ETag 'W/"..."'
+            etag, _ = resposta.get_etag()
+            regra = request.url_rule.rule if request.url_rule is not None else ''
+            if etag is not None and ROTA_BUNDLES_DASH not in regra:
+                resposta.set_etag(etag, weak=True)
+
+        # Tamanho original para os histogramas da instrumentação
+        g.bytes_originais = len(corpo)
+        if estatisticas is not None:
+            estatisticas.registrar(chave_resposta(rota_callbacks), codificacao,
+                                   len(corpo), len(enviado))
+        return resposta
+
+    return disponiveis
@@ -2,12 +2,29 @@
 # Configurações para produção
 # Modifique estas configurações conforme necessário
 
+import os
+
 # Configurações do servidor
 HOST = '0.0.0.0'  # Para aceitar conexões externas use '0.0.0.0', para local use '127.0.0.1'
 PORT = 8050       # Porta do servidor
 DEBUG = False     # Mudar para False em produção
 
+# Servidor de produção (gunicorn -c gunicorn.conf.py app:server)
+WORKERS = 0           # Processos do gunicorn; 0 = automático (2 × núcleos + 1)
+THREADS = 1           # Threads por processo (acima de 1 usa o worker gthread)
+WORKER_TIMEOUT = 60   # Segundos sem resposta antes de reiniciar um processo
+
 # Configurações de dados
+DATA_CSV = 'dados_algodao.csv'                     # Fonte de intercâmbio dos dados
+DATA_COLUMNAR_DIR = 'dados_algodao_colunar'        # Colunas .npy geradas a partir do CSV
+DATA_GEOJSON = 'brasil_estados_poligonos.geojson'  # Polígonos dos estados (centroides do mapa)
+DATA_REVISIONS = 'revisoes_algodao.csv'            # Log das revisões ingeridas (python ingestao.py)
+DATA_PARQUET_DIR = 'dados_algodao_parquet'         # Tabela de fatos em Parquet (motor 'duckdb')
+SYNTHETIC_CSV = 'dados_sinteticos.csv'             # CSV gerado por gerar_dados_sinteticos.py
+SYNTHETIC_COLUMNAR_DIR = 'dados_sinteticos'        # Formato colunar dos dados sintéticos
+DATA_RELOAD = True          # Recarrega os dados quando o CSV muda, sem reiniciar o servidor
+DATA_RELOAD_INTERVAL = 5    # Intervalo (segundos) entre as verificações do CSV
+INGEST_TOKEN = os.environ.get('INGEST_TOKEN')  # Token da rota /api/ingestao (None = rota desativada)
 MAX_RECORDS_TABLE = 100  # Máximo de registros na tabela
 CACHE_TIMEOUT = 300      # Timeout do cache em segundos
 
@@ -22,7 +39,29 @@ THEMES = {
 MAP_CENTER = {"lat": -14, "lon": -55}  # Centro do mapa (Brasil)
 MAP_ZOOM = 3.5                         # Zoom inicial
 MAP_STYLE = "carto-positron"           # Estilo do mapa
+MAP_MODE = "bubbles"                   # Modo inicial do mapa: "bubbles" ou "choropleth"
+
+# Geometria do mapa coroplético (python simplificacao.py)
+GEOMETRY_DIR = 'geometria_simplificada'  # TopoJSON simplificado por nível de zoom
+GEO_ZOOM_LEVELS = (3, 5, 7)              # Zoom a partir do qual cada nível é usado
+GEO_SIMPLIFY_TOLERANCE_PX = 1.0          # Tolerância da simplificação, em pixels no zoom do nível
+GEO_QUANTIZATION = 100000                # Passos da grade de quantização por eixo
 
 # Configurações de performance
-ENABLE_CACHING = True
-MAX_FILTER_COMBINATIONS = 1000
+ENABLE_CACHING = True           # Cache LRU dos resultados por combinação de filtros
+MAX_FILTER_COMBINATIONS = 1000  # Máximo de combinações mantidas no cache
+CLIENTSIDE_FILTERING = False    # Filtros e agregações no navegador (datasets pequenos)
+QUERY_ENGINE = 'cubo'           # Motor das consultas: 'cubo', 'pandas' ou 'duckdb' (pip install duckdb)
+JSON_ENGINE = 'auto'            # Motor JSON das respostas: 'auto' (orjson se instalado), 'orjson' ou 'json'
+CACHE_RESPONSES = True          # Guarda o JSON já serializado das respostas dos callbacks
+SHARED_MEMORY = False           # Cubo em um segmento de memória compartilhado por todos os processos
+SHARED_MEMORY_DIR = None        # Diretório do segmento (None = /dev/shm/algodao ou o temporário)
+
+# Compressão das respostas (brotli com 'pip install brotli', senão gzip)
+COMPRESS_RESPONSES = True       # Comprime callbacks, assets e GeoJSON conforme o Accept-Encoding
+COMPRESS_MIN_SIZE = 500         # Respostas menores que isso (bytes) seguem sem compressão
+COMPRESS_GZIP_LEVEL = 6         # Nível do gzip (1 = mais rápido, 9 = menor)
+COMPRESS_BROTLI_QUALITY = 5     # Qualidade do brotli (0 a 11; acima de ~6 fica lento para respostas dinâmicas)
+
+# Instrumentação (métricas no formato do Prometheus)
+METRICS_ENABLED = True          # Publica contadores e histogramas dos callbacks em /metrics
@@ -0,0 +1,155 @@
+import glob
+import logging
+import os
+
+import numpy as np
+
+from config import DATA_PARQUET_DIR
+from cubo import ConsultaCubo, DimensaoEstados
+
+try:
+    import duckdb
+except ImportError:  # motor 'duckdb' indisponível: usa o cubo
+    duckdb = None
+
+# ============================================================================
+# MOTORES DE CONSULTA
+# ============================================================================
+#
+# O dashboard só pede "janela de anos, regiões e estados, agregado por
+# estado × ano" (consultar) e recebe uma ConsultaCubo, da qual saem mapa,
+# série, rankings, tabela e métricas. Quem executa é o motor configurado em
+# QUERY_ENGINE:
+#
+#   cubo    somas prefixas pré-calculadas (cubo.py), o padrão
+#   pandas  filtro e groupby sobre a tabela de fatos, a cada consulta
+#   duckdb  SQL no DuckDB embutido sobre a tabela de fatos em Parquet: o
+#           filtro de anos/estados e a soma rodam no motor, que lê só os
+#           row groups da janela (o arquivo é ordenado por ano)
+#
+# Todos devolvem exatamente o mesmo resultado (python teste_motores.py).
+
+logger = logging.getLogger(__name__)
+
+MOTORES = ('cubo', 'pandas', 'duckdb')
+
+
+class MotorConsulta(DimensaoEstados):
+    """Consulta por janela e seleção de estados; subclasses implementam agregar()"""
+
+    ano_min = ano_max = 0
+
+    def agregar(self, ano_inicial, ano_final, codigos):
+        """(estado_id, ano, producao) de cada célula com registros; codigos=None: todos os estados"""
+        raise NotImplementedError
+
+    def consultar(self, ano_inicial, ano_final, regioes=None, estados=None):
+        """Seleciona uma janela de anos e um subconjunto de regiões/estados"""
+        # Mesma janela do cubo: limitada aos anos existentes nos dados
+        inicio, fim = max(int(ano_inicial), self.ano_min), min(int(ano_final), self.ano_max)
+        anos = np.arange(inicio, fim + 1)
+        mascara = self.selecao_estados(regioes, estados)
+        codigos = None if mascara.all() else np.flatnonzero(mascara)
+
+        if len(anos) == 0 or not mascara.any():
+            vazio = np.zeros(0, dtype=np.int64)
+            estado_id, ano, producao = vazio, vazio, vazio
+        else:
+            estado_id, ano, producao = self.agregar(inicio, fim, codigos)
+
+        # Células agregadas → matriz densa estado × ano dos estados com registros na janela
+        indices = np.unique(estado_id)
+        linhas, colunas = np.searchsorted(indices, estado_id), ano - inicio
+        matriz = np.zeros((len(indices), len(anos)), dtype=np.int64)
+        matriz[linhas, colunas] = producao
+        presente = np.zeros(matriz.shape, dtype=bool)
+        presente[linhas, colunas] = True
+        return ConsultaCubo(self, indices, anos, matriz, presente, matriz.sum(axis=1))
+
+
+class MotorPandas(MotorConsulta):
+    """Filtro e agregação com pandas sobre a tabela de fatos (dados pequenos)"""
+
+    def __init__(self, dados):
+        super().__init__(dados)
+        self.fatos = dados.fatos
+        self.ano_min, self.ano_max = int(self.fatos['ano'].min()), int(self.fatos['ano'].max())
+
+    def agregar(self, ano_inicial, ano_final, codigos):
+        fatos = self.fatos
+        filtro = fatos['ano'].between(ano_inicial, ano_final)
+        if codigos is not None:
+            filtro &= fatos['estado_id'].isin(codigos)
+        somas = fatos[filtro].groupby(['estado_id', 'ano'])['producao'].sum()
+        return (somas.index.get_level_values(0).to_numpy(dtype=np.int64),
+                somas.index.get_level_values(1).to_numpy(dtype=np.int64),
+                somas.to_numpy(dtype=np.int64))
+
+
+def exportar_parquet(conexao, dados, diretorio=DATA_PARQUET_DIR):
+    """Grava (uma vez por versão dos dados) a tabela de fatos em Parquet, ordenada por ano"""
+    os.makedirs(diretorio, exist_ok=True)
+    arquivo = os.path.join(diretorio, f'fatos.{dados.versao or "memoria"}.parquet')
+    if os.path.exists(arquivo):
+        return arquivo
+
+    temporario = f'{arquivo}.{os.getpid()}.tmp'
+    conexao.register('fatos_origem', dados.fatos)
+    try:
+        conexao.execute(f"COPY (SELECT ano, estado_id, producao FROM fatos_origem "
+                        f"ORDER BY ano, estado_id) TO '{sql_texto(temporario)}' (FORMAT PARQUET)")
+    finally:
+        conexao.unregister('fatos_origem')
+    os.replace(temporario, arquivo)
+
+    # Mantém a versão anterior: outros processos podem consultá-la até trocarem a base
+    anteriores = sorted(glob.glob(os.path.join(diretorio, 'fatos.*.parquet')), key=os.path.getmtime)
+    for antigo in anteriores[:-2]:
+        try:
+            os.remove(antigo)
+        except FileNotFoundError:
+            pass
+    return arquivo
+
+
+def sql_texto(valor):
+    """Literal de texto SQL (aspas simples duplicadas)"""
+    return str(valor).replace("'", "''")
+
+
+class MotorDuckDB(MotorConsulta):
+    """Filtro e agregação no DuckDB embutido, sobre a tabela de fatos em Parquet"""
+
+    def __init__(self, dados, diretorio=DATA_PARQUET_DIR):
+        super().__init__(dados)
+        self.conexao = duckdb.connect()
+        self.arquivo = exportar_parquet(self.conexao, dados, diretorio)
+        self.conexao.execute(f"CREATE VIEW fatos AS SELECT * FROM read_parquet('{sql_texto(self.arquivo)}')")
+        self.ano_min, self.ano_max = self.conexao.execute(
+            'SELECT min(ano), max(ano) FROM fatos').fetchone()
+
+    def agregar(self, ano_inicial, ano_final, codigos):
+        sql = 'SELECT estado_id, ano, sum(producao)::BIGINT AS producao FROM fatos WHERE ano BETWEEN ? AND ?'
+        parametros = [ano_inicial, ano_final]
+        if codigos is not None:
+            sql += f" AND estado_id IN ({', '.join('?' * len(codigos))})"
+            parametros += codigos.tolist()
+        # Um cursor por consulta: a conexão é compartilhada entre as threads do servidor
+        with self.conexao.cursor() as cursor:
+            colunas = cursor.execute(sql + ' GROUP BY estado_id, ano', parametros).fetchnumpy()
+        return tuple(np.asarray(colunas[nome], dtype=np.int64)
+                     for nome in ('estado_id', 'ano', 'producao'))
+
+
+def criar_motor(nome, dados, cubo):
+    """Motor de consultas configurado: o próprio cubo, pandas ou DuckDB"""
+    if nome == 'duckdb' and duckdb is None:
+        logger.warning("Motor 'duckdb' requer o pacote duckdb (pip install duckdb); usando o cubo")
+        nome = 'cubo'
+    if nome == 'cubo':
+        return cubo
+    if nome == 'pandas':
+        return MotorPandas(dados)
+    if nome == 'duckdb':
+        return MotorDuckDB(dados)
+    raise ValueError(f"Motor de consultas desconhecido: {nome} (use {', '.join(MOTORES)})")
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CUBO PRÉ-AGREGADO ESTADO × ANO
+# ============================================================================
+#
+# O cubo é montado uma única vez na inicialização a partir da tabela de fatos
+# codificada (qualquer granularidade: estado, município, ...), agrupando pelos
+# códigos inteiros de estado e ano. Cada célula guarda
+# a produção somada de um estado em um ano e as somas prefixas ao longo dos
+# anos permitem obter o total de qualquer janela do slider com uma subtração
+# por estado, sem varrer o DataFrame original.
+
+# Vetores numéricos do cubo (os que podem ser publicados em memória compartilhada)
+VETORES_CUBO = ('anos', 'producao', 'presente', 'prefixo', 'prefixo_presente')
+
+
+class ConsultaCubo:
+    """Resultado de uma consulta: matriz estado × ano de uma janela de anos e seleção de estados"""
+
+    def __init__(self, cubo, indices, anos, producao, presente, totais):
+        # cubo: origem da consulta (o cubo ou outro motor de consultas.py), com a dimensão
+        self.cubo = cubo
+        self.indices = indices
+        self.anos = anos
+        self.producao = producao
+        self.presente = presente
+        self.totais = totais
+
+    @property
+    def vazia(self):
+        return len(self.indices) == 0
+
+    def dimensao(self):
+        """Tabela de dimensão (estado, sigla, regiao, centroide) dos estados selecionados"""
+        return self.cubo.dimensao.iloc[self.indices].reset_index(drop=True)
+
+    def totais_por_estado(self):
+        """Produção total da janela por estado"""
+        df_totais = self.dimensao()
+        df_totais['producao'] = self.totais
+        return df_totais
+
+    def para_dataframe(self):
+        """Tabela longa estado × ano equivalente ao groupby(['estado', 'regiao', 'ano'])"""
+        linhas, colunas = np.nonzero(self.presente)
+        dimensao = self.cubo.dimensao
+        indices = self.indices[linhas]
+        return pd.DataFrame({
+            'estado': dimensao['estado'].values[indices],
+            'regiao': dimensao['regiao'].values[indices],
+            'ano': self.anos[colunas],
+            'producao': self.producao[linhas, colunas]
+        })
+
+
+class DimensaoEstados:
+    """Dimensão dos estados e a tradução dos filtros de região/estado para códigos inteiros"""
+
+    def __init__(self, dados):
+        # Tabela de dimensão dos estados (código = posição na tabela)
+        self.dimensao = dados.estados.reset_index(drop=True)
+        self.nomes_regioes = list(dados.regioes)
+        self.regiao_id = self.dimensao['regiao_id'].values
+        self.codigo_estado = {estado: i for i, estado in enumerate(self.dimensao['estado'])}
+
+    def selecao_estados(self, regioes=None, estados=None):
+        """Máscara dos estados que passam nos filtros de região e estado"""
+        mascara = np.ones(len(self.dimensao), dtype=bool)
+        if regioes:
+            codigos = [self.nomes_regioes.index(r) for r in regioes if r in self.nomes_regioes]
+            mascara &= np.isin(self.regiao_id, codigos)
+        if estados:
+            codigos = [self.codigo_estado[e] for e in estados if e in self.codigo_estado]
+            selecionados = np.zeros(len(self.dimensao), dtype=bool)
+            selecionados[codigos] = True
+            mascara &= selecionados
+        return mascara
+
+
+class CuboProducao(DimensaoEstados):
+    """Cubo denso estado × ano com somas prefixas cumulativas sobre os anos"""
+
+    def __init__(self, dados, vetores=None):
+        super().__init__(dados)
+
+        if vetores is not None:
+            # Vetores já calculados (por exemplo, anexados de um segmento compartilhado)
+            for nome in VETORES_CUBO:
+                setattr(self, nome, vetores[nome])
+            return
+
+        fatos = dados.fatos
+        self.anos = np.arange(int(fatos['ano'].min()), int(fatos['ano'].max()) + 1)
+
+        n_estados, n_anos = len(self.dimensao), len(self.anos)
+        celulas = (fatos['estado_id'].values.astype(np.int64) * n_anos
+                   + (fatos['ano'].values - self.anos[0]))
+
+        # Soma e contagem de registros por célula em uma única passada
+        soma = np.bincount(celulas, weights=fatos['producao'].values, minlength=n_estados * n_anos)
+        contagem = np.bincount(celulas, minlength=n_estados * n_anos)
+
+        self.producao = np.rint(soma).astype(np.int64).reshape(n_estados, n_anos)
+        self.presente = (contagem > 0).reshape(n_estados, n_anos)
+
+        # prefixo[:, j] = produção acumulada dos anos anteriores ao índice j
+        self.prefixo = np.zeros((n_estados, n_anos + 1), dtype=np.int64)
+        np.cumsum(self.producao, axis=1, out=self.prefixo[:, 1:])
+        self.prefixo_presente = np.zeros((n_estados, n_anos + 1), dtype=np.int64)
+        np.cumsum(self.presente, axis=1, out=self.prefixo_presente[:, 1:])
+
+    def consultar(self, ano_inicial, ano_final, regioes=None, estados=None):
+        """Seleciona uma janela de anos e um subconjunto de regiões/estados"""
+        i_ini = int(np.clip(ano_inicial - self.anos[0], 0, len(self.anos)))
+        i_fim = int(np.clip(ano_final - self.anos[0], -1, len(self.anos) - 1))
+
+        # Rótulos selecionados são traduzidos para códigos inteiros
+        mascara = self.selecao_estados(regioes, estados)
+
+        # Mantém apenas estados com pelo menos um registro na janela
+        if i_ini <= i_fim:
+            mascara &= (self.prefixo_presente[:, i_fim + 1] - self.prefixo_presente[:, i_ini]) > 0
+        else:
+            mascara[:] = False
+            i_fim = i_ini - 1
+
+        indices = np.flatnonzero(mascara)
+        return ConsultaCubo(self, indices, self.anos[i_ini:i_fim + 1],
+                            self.producao[indices, i_ini:i_fim + 1],
+                            self.presente[indices, i_ini:i_fim + 1],
+                            self.prefixo[indices, i_fim + 1] - self.prefixo[indices, i_ini])
+
+    def com_deltas(self, dados, anos, estado_ids, deltas):
+        """Novo cubo com deltas de produção por (ano, estado); só os estados afetados são reacumulados"""
+        anos, estado_ids = np.asarray(anos, dtype=np.int64), np.asarray(estado_ids, dtype=np.int64)
+        novos_anos = np.arange(min(int(self.anos[0]), int(anos.min())),
+                               max(int(self.anos[-1]), int(anos.max())) + 1)
+        inicio, n_anos = int(self.anos[0] - novos_anos[0]), len(self.anos)
+        fim = inicio + n_anos
+
+        # Cópias: o cubo atual continua em uso (e pode estar mapeado só para leitura)
+        producao = np.zeros((len(self.dimensao), len(novos_anos)), dtype=np.int64)
+        producao[:, inicio:fim] = self.producao
+        presente = np.zeros(producao.shape, dtype=bool)
+        presente[:, inicio:fim] = self.presente
+        colunas = anos - novos_anos[0]
+        np.add.at(producao, (estado_ids, colunas), np.asarray(deltas, dtype=np.int64))
+        presente[estado_ids, colunas] = True
+
+        # Anos acrescentados nas pontas não mudam os prefixos dos demais estados
+        vetores = {'anos': novos_anos, 'producao': producao, 'presente': presente}
+        for nome in ('prefixo', 'prefixo_presente'):
+            prefixo = np.empty((producao.shape[0], len(novos_anos) + 1), dtype=np.int64)
+            prefixo[:, :inicio + 1] = 0
+            prefixo[:, inicio + 1:fim + 1] = getattr(self, nome)[:, 1:]
+            prefixo[:, fim + 1:] = getattr(self, nome)[:, -1:]
+            vetores[nome] = prefixo
+        afetados = np.unique(estado_ids)
+        vetores['prefixo'][afetados, 1:] = np.cumsum(producao[afetados], axis=1)
+        vetores['prefixo_presente'][afetados, 1:] = np.cumsum(presente[afetados], axis=1)
+        return CuboProducao(dados, vetores)
+
+    def vetores(self):
+        """Vetores numéricos do cubo, por nome"""
+        return {nome: getattr(self, nome) for nome in VETORES_CUBO}
+
+    def para_colunas(self):
+        """Codificação colunar compacta do cubo (listas simples, serializáveis em JSON)"""
+        return {
+            'anos': self.anos.tolist(),
+            'estados': self.dimensao['estado'].tolist(),
+            'siglas': self.dimensao['sigla'].tolist(),
+            'regioes': self.nomes_regioes,
+            'regiao_estado': self.regiao_id.tolist(),
+            'lat': self.dimensao['lat'].tolist(),
+            'lon': self.dimensao['lon'].tolist(),
+            'producao': self.producao.ravel().tolist(),
+            'presente': self.presente.ravel().astype(np.int8).tolist()
+        }
@@ -0,0 +1,315 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_CSV, DATA_COLUMNAR_DIR, DATA_GEOJSON, DATA_REVISIONS
+from geometria import centroides_geojson, ler_geojson
+
+# ============================================================================
+# FORMATO COLUNAR BINÁRIO
+# ============================================================================
+#
+# O CSV continua sendo a fonte de intercâmbio; a partir dele é gerado um
+# diretório com uma coluna por arquivo .npy (tipos explícitos), carregado
+# com memory-map. O arquivo meta.json aponta para a versão atual das colunas
+# e é substituído atomicamente, de modo que leitores nunca veem uma conversão
+# pela metade. A conversão é refeita sempre que o CSV for mais novo.
+#
+# Estado, sigla e região são codificados em dicionário: a tabela de fatos
+# guarda apenas o código inteiro do estado e os rótulos ficam em uma tabela
+# de dimensão pequena, juntada aos agregados somente na hora de exibir. O
+# centroide de cada estado é calculado a partir dos polígonos do GeoJSON.
+#
+# Revisões pontuais (ano, sigla, producao) não reescrevem o CSV: ficam em um
+# log de revisões e entram na tabela de fatos como linhas de delta (valor
+# novo menos o total atual da célula), tanto na ingestão quanto ao refazer a
+# conversão a partir do CSV.
+
+# Versão do layout do diretório colunar (mudanças forçam nova conversão)
+FORMATO = 3
+
+# Tipos explícitos de cada coluna do CSV (evita a inferência do read_csv)
+TIPOS_CSV = {
+    'ano': np.int16,
+    'estado': 'category',
+    'sigla': 'category',
+    'regiao': 'category',
+    'producao': np.int64
+}
+
+# Colunas da tabela de fatos gravadas em disco
+TIPOS_FATOS = {
+    'ano': np.int16,
+    'estado_id': np.int16,
+    'producao': np.int64
+}
+
+ARQUIVO_META = 'meta.json'
+
+class DadosProducao:
+    """Tabela de fatos codificada (ano, estado_id, producao) e tabelas de dimensão"""
+
+    def __init__(self, fatos, estados, regioes, versao=None, revisao=None):
+        self.fatos = fatos
+        # Dimensão dos estados indexada por estado_id: estado, sigla, regiao, regiao_id, lat, lon
+        self.estados = estados
+        # Nomes das regiões indexados por regiao_id
+        self.regioes = regioes
+        # Versão do formato colunar de origem (None para dados montados em memória)
+        self.versao = versao
+        # Versão anterior e número de linhas dela, quando esta versão só acrescentou deltas
+        self.revisao = revisao
+
+    def regiao_id(self):
+        """Código da região de cada linha dos fatos (junção vetorizada pela dimensão)"""
+        return self.estados['regiao_id'].values[self.fatos['estado_id'].values]
+
+    def com_rotulos(self, df, coluna='estado_id'):
+        """Junta estado, sigla e região a um agregado indexado por código de estado"""
+        rotulos = self.estados[['estado', 'sigla', 'regiao']].take(df[coluna].values)
+        return pd.concat([rotulos.reset_index(drop=True), df.reset_index(drop=True)], axis=1)
+
+
+def ler_csv(caminho_csv=DATA_CSV):
+    """Lê o CSV de produção com os tipos declarados em TIPOS_CSV"""
+    return pd.read_csv(caminho_csv, dtype=TIPOS_CSV)
+
+
+def ler_revisoes(caminho_revisoes=DATA_REVISIONS):
+    """Log de revisões (ano, sigla, producao), na ordem em que chegaram; vazio se não existir"""
+    if not os.path.exists(caminho_revisoes):
+        return pd.DataFrame({'ano': pd.Series(dtype=np.int16), 'sigla': pd.Series(dtype=str),
+                             'producao': pd.Series(dtype=np.int64)})
+    return pd.read_csv(caminho_revisoes, dtype={'ano': np.int16, 'sigla': str, 'producao': np.int64})
+
+
+def aplicar_revisoes(df, revisoes):
+    """Acrescenta ao CSV lido as linhas de delta que levam cada (ano, sigla) ao valor revisado"""
+    revisoes = revisoes.drop_duplicates(['ano', 'sigla'], keep='last')
+    if revisoes.empty:
+        return df
+    siglas = df['sigla'].astype(str)
+    rotulos = df.assign(sigla=siglas).drop_duplicates('sigla').set_index('sigla')
+    desconhecidas = sorted(set(revisoes['sigla']) - set(rotulos.index))
+    if desconhecidas:
+        raise ValueError(f"Revisões com siglas ausentes do CSV: {', '.join(desconhecidas)}")
+
+    totais = df['producao'].groupby([df['ano'], siglas]).sum()
+    celulas = pd.MultiIndex.from_arrays([revisoes['ano'], revisoes['sigla']])
+    atual = totais.reindex(celulas)
+    delta = revisoes['producao'].to_numpy() - atual.fillna(0).to_numpy(dtype=np.int64)
+    linhas = pd.DataFrame({
+        'ano': revisoes['ano'].to_numpy(dtype=np.int16),
+        'estado': rotulos['estado'].astype(str).reindex(revisoes['sigla']).to_numpy(),
+        'sigla': revisoes['sigla'].to_numpy(),
+        'regiao': rotulos['regiao'].astype(str).reindex(revisoes['sigla']).to_numpy(),
+        'producao': delta
+    })[(delta != 0) | atual.isna().to_numpy()]
+    return pd.concat([df.astype({'estado': str, 'sigla': str, 'regiao': str}), linhas],
+                     ignore_index=True)
+
+
+def codificar(df, centroides=None):
+    """Separa o DataFrame em fatos com códigos inteiros e a dimensão dos estados"""
+    centroides = centroides or {}
+    estado = df['estado'].astype('category')
+    estado = estado.cat.reorder_categories(sorted(estado.cat.categories))
+    regioes = sorted(df['regiao'].astype(str).unique())
+
+    # Primeira linha de cada estado, na ordem dos códigos
+    codigos = estado.cat.codes.to_numpy(dtype=np.int16)
+    _, primeira = np.unique(codigos, return_index=True)
+    siglas = df['sigla'].astype(str).to_numpy()[primeira]
+    regiao_estado = df['regiao'].astype(str).to_numpy()[primeira]
+    centroides = np.array([centroides.get(s, (np.nan, np.nan)) for s in siglas], dtype=float)
+
+    dimensao = {
+        'estado': list(estado.cat.categories),
+        'sigla': list(siglas),
+        'regiao_id': [regioes.index(r) for r in regiao_estado],
+        'lon': centroides[:, 0].tolist(),
+        'lat': centroides[:, 1].tolist()
+    }
+    fatos = pd.DataFrame({
+        'ano': df['ano'].to_numpy(dtype=np.int16),
+        'estado_id': codigos,
+        'producao': df['producao'].to_numpy(dtype=np.int64)
+    })
+    return fatos, dimensao, regioes
+
+
+def montar_dimensao(dimensao, regioes):
+    estados = pd.DataFrame(dimensao)
+    estados['regiao'] = np.asarray(regioes, dtype=object)[estados['regiao_id'].values]
+    estados.index.name = 'estado_id'
+    return estados[['estado', 'sigla', 'regiao', 'regiao_id', 'lat', 'lon']]
+
+
+def ler_meta(diretorio=DATA_COLUMNAR_DIR):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_META), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def colunar_desatualizado(caminho_csv=DATA_CSV, diretorio=DATA_COLUMNAR_DIR,
+                          caminho_geojson=DATA_GEOJSON):
+    """True se o formato colunar não existe, é de outro formato ou é mais antigo que o CSV/GeoJSON"""
+    meta = ler_meta(diretorio)
+    if meta is None or meta.get('formato') != FORMATO:
+        return True
+    if os.path.exists(caminho_geojson) and os.path.getmtime(caminho_geojson) > meta['geojson_mtime']:
+        return True
+    if not os.path.exists(caminho_csv):
+        return False
+    return os.path.getmtime(caminho_csv) > meta['csv_mtime']
+
+
+def carregar_centroides(caminho_geojson=DATA_GEOJSON):
+    """Centroides (lon, lat) por sigla calculados a partir dos polígonos do GeoJSON"""
+    if not os.path.exists(caminho_geojson):
+        return {}, 0.0
+    return centroides_geojson(ler_geojson(caminho_geojson)), os.path.getmtime(caminho_geojson)
+
+
+def converter_csv(caminho_csv=DATA_CSV, diretorio=DATA_COLUMNAR_DIR, caminho_geojson=DATA_GEOJSON,
+                  caminho_revisoes=DATA_REVISIONS):
+    """Converte o CSV (mais o log de revisões) para o formato colunar (uma coluna .npy por arquivo)"""
+    csv_mtime = os.path.getmtime(caminho_csv)
+    centroides, geojson_mtime = carregar_centroides(caminho_geojson)
+    df = aplicar_revisoes(ler_csv(caminho_csv), ler_revisoes(caminho_revisoes))
+    fatos, dimensao, regioes = codificar(df, centroides)
+    return salvar_colunas(fatos, dimensao, regioes, diretorio, csv_mtime, geojson_mtime)
+
+
+def salvar_colunas(fatos, dimensao, regioes, diretorio=DATA_COLUMNAR_DIR, csv_mtime=None,
+                   geojson_mtime=0.0):
+    """Grava fatos e dimensões e publica a nova versão via meta.json"""
+    return salvar_colunas_em_partes([fatos], len(fatos), dimensao, regioes, diretorio, csv_mtime,
+                                    geojson_mtime)
+
+
+def salvar_colunas_em_partes(partes, linhas, dimensao, regioes, diretorio=DATA_COLUMNAR_DIR,
+                             csv_mtime=None, geojson_mtime=0.0):
+    """Como salvar_colunas, com os fatos chegando em partes que nunca ficam inteiras na memória"""
+    os.makedirs(diretorio, exist_ok=True)
+    versao = f'{time.time_ns():x}'
+    meta_anterior = ler_meta(diretorio)
+
+    # Cada coluna é pré-alocada com o total de linhas e preenchida parte a parte
+    colunas, destinos = {}, {}
+    for coluna, tipo in TIPOS_FATOS.items():
+        arquivo = f'{coluna}.{versao}.npy'
+        destinos[coluna] = np.lib.format.open_memmap(os.path.join(diretorio, arquivo), mode='w+',
+                                                     dtype=tipo, shape=(linhas,))
+        colunas[coluna] = {'arquivo': arquivo, 'dtype': destinos[coluna].dtype.str}
+    inicio = 0
+    for parte in partes:
+        fim = inicio + len(parte)
+        if fim > linhas:
+            raise ValueError(f'Mais linhas que as {linhas} declaradas')
+        for coluna, destino in destinos.items():
+            destino[inicio:fim] = parte[coluna].to_numpy(dtype=destino.dtype)
+        inicio = fim
+    if inicio != linhas:
+        raise ValueError(f'{inicio} linhas recebidas, {linhas} declaradas')
+    for destino in destinos.values():
+        destino.flush()
+    del destinos
+
+    arquivo_dimensao = f'dimensao.{versao}.json'
+    with open(os.path.join(diretorio, arquivo_dimensao), 'w', encoding='utf-8') as f:
+        json.dump({'estados': dimensao, 'regioes': regioes}, f, ensure_ascii=False)
+
+    meta = {
+        'formato': FORMATO,
+        'versao': versao,
+        'linhas': linhas,
+        'csv_mtime': csv_mtime if csv_mtime is not None else time.time(),
+        'geojson_mtime': geojson_mtime,
+        'colunas': colunas,
+        'dimensao': arquivo_dimensao
+    }
+    publicar_meta(meta, diretorio)
+
+    # Arquivos da versão anterior podem ser removidos mesmo se ainda mapeados
+    if meta_anterior is not None:
+        arquivos = [info['arquivo'] for info in meta_anterior['colunas'].values()]
+        if 'dimensao' in meta_anterior:
+            arquivos.append(meta_anterior['dimensao'])
+        remover_arquivos(arquivos, diretorio)
+    return meta
+
+
+def publicar_meta(meta, diretorio=DATA_COLUMNAR_DIR):
+    """Substitui meta.json atomicamente, publicando a versão descrita"""
+    temporario = os.path.join(diretorio, f"{ARQUIVO_META}.{meta['versao']}.tmp")
+    with open(temporario, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporario, os.path.join(diretorio, ARQUIVO_META))
+
+
+def remover_arquivos(arquivos, diretorio=DATA_COLUMNAR_DIR):
+    for arquivo in arquivos:
+        try:
+            os.remove(os.path.join(diretorio, arquivo))
+        except FileNotFoundError:
+            pass
+
+
+def acrescentar_fatos(novos, diretorio=DATA_COLUMNAR_DIR):
+    """Publica uma versão com linhas acrescentadas à tabela de fatos (dimensões inalteradas)"""
+    anteriores, _, meta_anterior = carregar_colunas(diretorio)
+    versao = f'{time.time_ns():x}'
+
+    colunas = {}
+    for coluna, tipo in TIPOS_FATOS.items():
+        valores = np.concatenate([anteriores[coluna], novos[coluna].to_numpy(dtype=tipo)])
+        arquivo = f'{coluna}.{versao}.npy'
+        np.save(os.path.join(diretorio, arquivo), valores)
+        colunas[coluna] = {'arquivo': arquivo, 'dtype': valores.dtype.str}
+
+    # As linhas novas ficam no fim: quem tem a versão base só precisa aplicá-las
+    meta = dict(meta_anterior, versao=versao, linhas=meta_anterior['linhas'] + len(novos),
+                colunas=colunas,
+                revisao={'base': meta_anterior['versao'], 'linhas_base': meta_anterior['linhas']})
+    publicar_meta(meta, diretorio)
+    remover_arquivos([info['arquivo'] for info in meta_anterior['colunas'].values()], diretorio)
+    return meta
+
+
+def carregar_colunas(diretorio=DATA_COLUMNAR_DIR):
+    """Colunas, dimensões e meta da versão atual (colunas mapeadas em memória, somente leitura)"""
+    for _ in range(3):
+        meta = ler_meta(diretorio)
+        if meta is None:
+            raise FileNotFoundError(f'Formato colunar ausente em {diretorio} (execute python dados.py)')
+        try:
+            colunas = {coluna: np.load(os.path.join(diretorio, info['arquivo']), mmap_mode='r')
+                       for coluna, info in meta['colunas'].items()}
+            with open(os.path.join(diretorio, meta['dimensao']), 'r', encoding='utf-8') as f:
+                dimensao = json.load(f)
+            return colunas, dimensao, meta
+        except FileNotFoundError:
+            # Outra conversão publicou uma nova versão entre a leitura do meta e das colunas
+            continue
+    raise FileNotFoundError(f'Formato colunar inconsistente em {diretorio}')
+
+
+def carregar_dados(caminho_csv=DATA_CSV, diretorio=DATA_COLUMNAR_DIR, caminho_geojson=DATA_GEOJSON):
+    """Dados de produção a partir do formato colunar, reconvertendo se necessário"""
+    if colunar_desatualizado(caminho_csv, diretorio, caminho_geojson):
+        converter_csv(caminho_csv, diretorio, caminho_geojson)
+    colunas, dimensao, meta = carregar_colunas(diretorio)
+    fatos = pd.DataFrame(colunas, copy=False)
+    return DadosProducao(fatos, montar_dimensao(dimensao['estados'], dimensao['regioes']),
+                         dimensao['regioes'], meta['versao'], meta.get('revisao'))
+
+
+if __name__ == '__main__':
+    meta = converter_csv()
+    print(f"Formato colunar gerado em: {DATA_COLUMNAR_DIR} ({meta['linhas']} registros)")
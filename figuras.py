@@ -0,0 +1,186 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# ============================================================================
+# FIGURAS A PARTIR DE ESQUELETOS PRÉ-MONTADOS
+# ============================================================================
+#
+# Layout, eixos, legendas e hovertemplates de cada gráfico são montados (e
+# validados pelo plotly) uma única vez por tema, na inicialização. A cada
+# requisição apenas os vetores de dados são encaixados em dicionários de
+# traços, sem passar pela validação e pelo remodelamento do plotly.express.
+# A saída é equivalente à figura que o px gerava. Vetores numéricos seguem
+# como numpy (o orjson os escreve diretamente); rótulos de texto seguem como
+# listas, pois vetores de objetos obrigariam o plotly a limpar a figura inteira.
+# Os traços não trazem cor: o plotly aplica o colorway do template em ordem,
+# e assim a troca de tema no navegador (tema.aplicarFiguras) recolore tudo.
+
+# Tamanho máximo das bolhas do mapa (equivalente ao size_max do px)
+TAMANHO_MAXIMO_BOLHA = 50
+
+# Escala e opacidade do mapa coroplético
+ESCALA_COROPLETICO = 'Viridis'
+OPACIDADE_COROPLETICO = 0.7
+
+
+def montar_esqueletos(temas, mapa_centro, mapa_zoom):
+    """Layouts validados de cada gráfico para cada tema"""
+    esqueletos = {}
+    for nome, tema in temas.items():
+        template = tema['template']
+        esqueletos[nome] = {
+            'mapa': go.Layout(
+                template=template,
+                mapbox={'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]}, 'center': mapa_centro,
+                        'zoom': mapa_zoom, 'style': tema['mapbox_style']},
+                # Mantém zoom e centro do usuário entre atualizações (inclusive na troca
+                # do nível de geometria, que não pode devolver o mapa à visão inicial)
+                uirevision='mapa',
+                legend={'title': {'text': 'regiao'}, 'tracegroupgap': 0, 'itemsizing': 'constant'},
+                margin={'t': 30, 'r': 0, 'l': 0, 'b': 0},
+                title={'text': 'Produção de Algodão por Estado'},
+                coloraxis={'colorbar': {'title': {'text': 'Produção (ton)'}}}
+            ).to_plotly_json(),
+            'coropletico': go.Layout(
+                template=template,
+                mapbox={'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]}, 'center': mapa_centro,
+                        'zoom': mapa_zoom, 'style': tema['mapbox_style']},
+                uirevision='mapa',
+                legend={'tracegroupgap': 0},
+                margin={'t': 30, 'r': 0, 'l': 0, 'b': 0},
+                title={'text': 'Produção de Algodão por Estado'},
+                coloraxis={'colorscale': ESCALA_COROPLETICO,
+                           'colorbar': {'title': {'text': 'Produção (ton)'}}}
+            ).to_plotly_json(),
+            'serie': go.Layout(
+                template=template,
+                xaxis={'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': 'Ano'}},
+                yaxis={'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': 'Produção (toneladas)'}},
+                legend={'tracegroupgap': 0},
+                title={'text': 'Evolução da Produção Nacional'},
+                hovermode='x unified'
+            ).to_plotly_json(),
+            'top': go.Layout(
+                template=template,
+                xaxis={'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': 'Produção (toneladas)'}},
+                yaxis={'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': 'Estado'}},
+                legend={'title': {'text': 'Região'}, 'tracegroupgap': 0},
+                title={'text': 'Top 10 Estados Produtores'},
+                barmode='relative'
+            ).to_plotly_json(),
+            'regiao': go.Layout(
+                template=template,
+                legend={'tracegroupgap': 0},
+                title={'text': 'Distribuição da Produção por Região'}
+            ).to_plotly_json()
+        }
+    return esqueletos
+
+
+def grupos_por_regiao(regioes):
+    """(região, posições) na ordem da primeira ocorrência, como o color= do px"""
+    nomes, primeira, codigos = np.unique(regioes, return_index=True, return_inverse=True)
+    for grupo in np.argsort(primeira, kind='stable'):
+        yield str(nomes[grupo]), np.flatnonzero(codigos == grupo)
+
+
+def figura_mapa(esqueleto, df_mapa):
+    """Bolhas proporcionais à produção, uma série por região"""
+    producao = df_mapa['producao'].values
+    lat, lon, estado = df_mapa['lat'].values, df_mapa['lon'].values, df_mapa['estado'].values
+    sizeref = (producao.max() if len(producao) else 0) / TAMANHO_MAXIMO_BOLHA ** 2
+
+    tracos = []
+    for i, (regiao, posicoes) in enumerate(grupos_por_regiao(df_mapa['regiao'].values)):
+        tracos.append({
+            'customdata': producao[posicoes, None],
+            'hovertemplate': (f'<b>%{{hovertext}}</b><br><br>regiao={regiao}'
+                              '<br>producao=%{customdata[0]:,}<br>lat=%{lat}<br>lon=%{lon}<extra></extra>'),
+            'hovertext': estado[posicoes].tolist(),
+            'lat': lat[posicoes],
+            'legendgroup': regiao,
+            'lon': lon[posicoes],
+            'marker': {'size': producao[posicoes], 'sizemode': 'area', 'sizeref': sizeref},
+            'mode': 'markers',
+            'name': regiao,
+            'showlegend': True,
+            'subplot': 'mapbox',
+            'type': 'scattermapbox'
+        })
+    return {'data': tracos, 'layout': esqueleto['mapa']}
+
+
+def figura_coropletico(esqueleto, df_mapa, url_geojson):
+    """Estados coloridos pela produção; a geometria é referenciada por URL, nunca embutida"""
+    return {'data': [{
+        'coloraxis': 'coloraxis',
+        'customdata': df_mapa[['regiao']].values.tolist(),
+        'featureidkey': 'properties.sigla',
+        'geojson': url_geojson,
+        'hovertemplate': ('<b>%{hovertext}</b><br><br>regiao=%{customdata[0]}'
+                          '<br>producao=%{z:,}<extra></extra>'),
+        'hovertext': df_mapa['estado'].tolist(),
+        'locations': df_mapa['sigla'].tolist(),
+        'marker': {'opacity': OPACIDADE_COROPLETICO},
+        'name': '',
+        'subplot': 'mapbox',
+        'z': df_mapa['producao'].values,
+        'type': 'choroplethmapbox'
+    }], 'layout': esqueleto['coropletico']}
+
+
+def figura_serie(esqueleto, anos, serie):
+    """Linha da produção anual"""
+    return {'data': [{
+        'hovertemplate': 'ano=%{x}<br>producao=%{y}<extra></extra>',
+        'legendgroup': '',
+        'line': {'dash': 'solid', 'width': 3},
+        'marker': {'symbol': 'circle'},
+        'mode': 'lines',
+        'name': '',
+        'orientation': 'v',
+        'showlegend': False,
+        'x': anos,
+        'xaxis': 'x',
+        'y': serie,
+        'yaxis': 'y',
+        'type': 'scatter'
+    }], 'layout': esqueleto['serie']}
+
+
+def figura_top(esqueleto, df_top):
+    """Barras horizontais do ranking, coloridas por região"""
+    producao, estado = df_top['producao'].values, df_top['estado'].values
+    tracos = []
+    for i, (regiao, posicoes) in enumerate(grupos_por_regiao(df_top['regiao'].values)):
+        tracos.append({
+            'alignmentgroup': 'True',
+            'hovertemplate': f'regiao={regiao}<br>producao=%{{x}}<br>estado=%{{y}}<extra></extra>',
+            'legendgroup': regiao,
+            'marker': {'pattern': {'shape': ''}},
+            'name': regiao,
+            'offsetgroup': regiao,
+            'orientation': 'h',
+            'showlegend': True,
+            'textposition': 'auto',
+            'x': producao[posicoes],
+            'xaxis': 'x',
+            'y': estado[posicoes].tolist(),
+            'yaxis': 'y',
+            'type': 'bar'
+        })
+    return {'data': tracos, 'layout': esqueleto['top']}
+
+
+def figura_regiao(esqueleto, df_regiao):
+    """Pizza da participação de cada região"""
+    return {'data': [{
+        'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]},
+        'hovertemplate': 'regiao=%{label}<br>producao=%{value}<extra></extra>',
+        'labels': df_regiao['regiao'].tolist(),
+        'legendgroup': '',
+        'name': '',
+        'showlegend': True,
+        'values': df_regiao['producao'].values,
+        'type': 'pie'
+    }], 'layout': esqueleto['regiao']}
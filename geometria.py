@@ -0,0 +1,93 @@
+import hashlib
+import json
+
+import numpy as np
+from flask import Response, request
+
+# ============================================================================
+# GEOMETRIA DO GEOJSON
+# ============================================================================
+#
+# Centroides ponderados pela área (fórmula do laço/shoelace) de cada feição do
+# GeoJSON, calculados uma única vez na conversão dos dados e guardados na
+# tabela de dimensão. Furos são descontados e multipolígonos somam as áreas
+# de todas as partes.
+
+
+def ler_geojson(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def momentos_anel(anel):
+    """Área com sinal e momentos (área·x, área·y) de um anel de coordenadas"""
+    pontos = np.asarray(anel, dtype=float)[:, :2]
+    if len(pontos) and not np.array_equal(pontos[0], pontos[-1]):
+        pontos = np.vstack([pontos, pontos[:1]])
+    x, y = pontos[:, 0], pontos[:, 1]
+    cruzado = x[:-1] * y[1:] - x[1:] * y[:-1]
+    area = cruzado.sum() / 2
+    return area, ((x[:-1] + x[1:]) * cruzado).sum() / 6, ((y[:-1] + y[1:]) * cruzado).sum() / 6
+
+
+def centroide_geometria(geometria):
+    """(lon, lat) do centroide de área de um Polygon ou MultiPolygon"""
+    if geometria['type'] == 'Polygon':
+        poligonos = [geometria['coordinates']]
+    elif geometria['type'] == 'MultiPolygon':
+        poligonos = geometria['coordinates']
+    else:
+        raise ValueError(f"Geometria sem área: {geometria['type']}")
+
+    area_total = momento_x = momento_y = 0.0
+    for poligono in poligonos:
+        for i, anel in enumerate(poligono):
+            area, mx, my = momentos_anel(anel)
+            # Contorno externo soma e furos subtraem, qualquer que seja a orientação
+            sinal = np.sign(area) if i == 0 else -np.sign(area)
+            area_total += sinal * area
+            momento_x += sinal * mx
+            momento_y += sinal * my
+
+    if area_total == 0:
+        # Geometria degenerada: média dos vértices do contorno externo
+        vertices = np.asarray(poligonos[0][0], dtype=float)[:, :2]
+        return tuple(float(v) for v in vertices.mean(axis=0))
+    return float(momento_x / area_total), float(momento_y / area_total)
+
+
+def centroides_geojson(geojson, propriedade='sigla'):
+    """Centroide (lon, lat) de cada feição, indexado por uma propriedade (ou pelo id)"""
+    centroides = {}
+    for feicao in geojson['features']:
+        chave = feicao.get('properties', {}).get(propriedade, feicao.get('id'))
+        centroides[chave] = centroide_geometria(feicao['geometry'])
+    return centroides
+
+
+# ============================================================================
+# PUBLICAÇÃO DA GEOMETRIA
+# ============================================================================
+#
+# A geometria é serializada uma única vez e servida em uma URL versionada
+# pelo conteúdo. As figuras referenciam apenas a URL: o plotly.js baixa o
+# arquivo uma vez (e o guarda em window.PlotlyGeoAssets) e o navegador pode
+# mantê-lo em cache indefinidamente, já que um conteúdo novo gera outra URL.
+
+def publicar_geojson(servidor, geojson, rota_base, prefixo_url, nome='estados'):
+    """Registra a rota do GeoJSON no servidor Flask e devolve a URL para as figuras"""
+    corpo = json.dumps(geojson, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    versao = hashlib.blake2b(corpo, digest_size=8).hexdigest()
+    arquivo = f'{nome}.{versao}.geojson'
+
+    def servir_geojson():
+        if request.if_none_match.contains_weak(versao):
+            resposta = Response(status=304)
+        else:
+            resposta = Response(corpo, mimetype='application/json')
+        resposta.set_etag(versao)
+        resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return resposta
+
+    servidor.add_url_rule(f'{rota_base}geo/{arquivo}', f'geojson_{nome}', servir_geojson)
+    return f'{prefixo_url}geo/{arquivo}'
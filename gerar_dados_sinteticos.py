@@ -0,0 +1,234 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_GEOJSON, SYNTHETIC_CSV, SYNTHETIC_COLUMNAR_DIR
+from dados import carregar_centroides, salvar_colunas_em_partes
+
+# ============================================================================
+# GERADOR SINTÉTICO VETORIZADO
+# ============================================================================
+#
+# Mesma estrutura do script.py (produção base por estado, queda de 2% ao ano
+# até 2005 e alta de 3% depois, variação normal de 15% por estado e ano), mas
+# com numpy sobre matrizes inteiras e reprodutível a partir de uma seed. Para
+# testes de carga, cada total estado × ano é repartido em municípios, meses
+# de colheita e safras: as linhas somam exatamente o total do estado, então
+# o dashboard mostra os mesmos números em qualquer escala e só o volume de
+# dados muda.
+#
+# A geração é feita ano a ano e cada bloco vai direto para o CSV e para as
+# colunas do formato colunar, sem montar a tabela inteira na memória. Por
+# padrão as saídas vão para SYNTHETIC_CSV e SYNTHETIC_COLUMNAR_DIR, nunca
+# para os dados reais do dashboard.
+#
+#   python gerar_dados_sinteticos.py --escala 1000 --seed 42
+
+ANOS = (2000, 2024)
+
+# (estado, sigla, região, produção base em toneladas), como no script.py
+ESTADOS = [
+    ('Mato Grosso', 'MT', 'Centro-Oeste', 2500000),
+    ('Bahia', 'BA', 'Nordeste', 1200000),
+    ('Goiás', 'GO', 'Centro-Oeste', 600000),
+    ('Mato Grosso do Sul', 'MS', 'Centro-Oeste', 400000),
+    ('Maranhão', 'MA', 'Nordeste', 300000),
+    ('Piauí', 'PI', 'Nordeste', 200000),
+    ('Ceará', 'CE', 'Nordeste', 150000),
+    ('Minas Gerais', 'MG', 'Sudeste', 100000),
+    ('São Paulo', 'SP', 'Sudeste', 80000),
+    ('Paraná', 'PR', 'Sul', 60000),
+    ('Tocantins', 'TO', 'Norte', 40000),
+    ('Pará', 'PA', 'Norte', 30000),
+    ('Alagoas', 'AL', 'Nordeste', 20000),
+    ('Paraíba', 'PB', 'Nordeste', 15000),
+    ('Rio Grande do Norte', 'RN', 'Nordeste', 10000),
+    ('Pernambuco', 'PE', 'Nordeste', 8000),
+    ('Sergipe', 'SE', 'Nordeste', 5000),
+    ('Rondônia', 'RO', 'Norte', 3000),
+    ('Distrito Federal', 'DF', 'Centro-Oeste', 2000)
+]
+
+# Fração da colheita de algodão em cada mês (concentrada de junho a setembro)
+PERFIL_MENSAL = np.array([0.005, 0.005, 0.01, 0.02, 0.07, 0.17, 0.25, 0.24, 0.15, 0.06, 0.015, 0.005])
+
+# Participação de cada safra do algodão (1ª safra, 2ª safra, 3ª safra)
+PARTICIPACAO_SAFRAS = np.array([0.35, 0.60, 0.05])
+
+
+def dimensoes_escala(escala):
+    """(municípios por estado, meses, safras) com cerca de `escala` linhas por estado e ano"""
+    meses = 12 if escala >= 12 else 1
+    safras = 2 if escala >= 24 else 1
+    return max(1, round(escala / (meses * safras))), meses, safras
+
+
+def totais_estado_ano(anos, seed):
+    """Produção de cada estado em cada ano (anos × estados), com a tendência do script.py"""
+    rng = np.random.default_rng(seed)
+    base = np.array([estado[3] for estado in ESTADOS], dtype=float)
+    anos = np.asarray(anos)[:, None]
+    crescimento = np.where(anos > 2005, 0.03, -0.02)
+    variacao = rng.normal(1, 0.15, (len(anos), len(ESTADOS)))
+    producao = base * (1 + crescimento * (anos - 2000)) * variacao
+    return np.maximum(producao, 0).astype(np.int64)
+
+
+def repartir(totais, pesos):
+    """Divide cada total nos pesos da sua linha, em inteiros que somam exatamente o total"""
+    pesos = pesos / pesos.sum(axis=1, keepdims=True)
+    partes = np.floor(totais[:, None] * pesos).astype(np.int64)
+    # O que sobrou do arredondamento (menos de uma unidade por parte) vai para as primeiras
+    resto = totais - partes.sum(axis=1)
+    partes += np.arange(pesos.shape[1])[None, :] < resto[:, None]
+    return partes
+
+
+class GeradorSintetico:
+    """Blocos anuais (DataFrames) da produção sintética em municípios, meses e safras"""
+
+    def __init__(self, escala=1, anos=ANOS, seed=42, municipios=None, meses=None, safras=None):
+        padrao = dimensoes_escala(escala)
+        self.municipios = municipios or padrao[0]
+        self.meses = meses or padrao[1]
+        self.safras = safras or padrao[2]
+        self.anos = np.arange(anos[0], anos[1] + 1)
+        self.seed = seed
+        self.totais = totais_estado_ano(self.anos, seed)
+
+        # Peso fixo de cada município no seu estado (poucos municípios grandes, muitos pequenos)
+        rng = np.random.default_rng([seed, 1])
+        self.peso_municipios = rng.lognormal(0, 1, (len(ESTADOS), self.municipios))
+        self.perfil_mensal = PERFIL_MENSAL if self.meses == 12 else np.ones(1)
+        self.participacao_safras = PARTICIPACAO_SAFRAS[:self.safras]
+
+        # Rótulos de cada linha dentro de um estado (município, mês, safra em ordem C)
+        forma = (self.municipios, len(self.perfil_mensal), self.safras)
+        self.por_estado = int(np.prod(forma))
+        municipio, mes, safra = np.indices(forma).reshape(3, -1)
+        self.municipio = municipio
+        self.mes = (mes + 1).astype(np.int8)
+        self.safra = (safra + 1).astype(np.int8)
+        siglas = np.array([estado[1] for estado in ESTADOS], dtype=object)
+        self.nomes_municipios = (siglas[:, None] + ' ' + np.char.zfill(
+            np.arange(1, self.municipios + 1).astype(str), 4).astype(object)[None, :])
+
+    @property
+    def linhas(self):
+        return len(self.anos) * len(ESTADOS) * self.por_estado
+
+    def colunas_csv(self):
+        colunas = ['ano']
+        if self.meses > 1:
+            colunas.append('mes')
+        colunas += ['estado', 'sigla', 'regiao']
+        if self.municipios > 1:
+            colunas.append('municipio')
+        if self.safras > 1:
+            colunas.append('safra')
+        return colunas + ['producao']
+
+    def bloco(self, i_ano):
+        """Linhas de um ano, na ordem estado, município, mês, safra"""
+        ano = int(self.anos[i_ano])
+        rng = np.random.default_rng([self.seed, 2, ano])
+
+        # Pesos de cada linha: município (com ruído do ano) × mês × safra
+        municipios = self.peso_municipios * rng.lognormal(0, 0.1, self.peso_municipios.shape)
+        pesos = (municipios[:, :, None, None] * self.perfil_mensal[None, None, :, None]
+                 * self.participacao_safras[None, None, None, :]).reshape(len(ESTADOS), -1)
+        producao = repartir(self.totais[i_ano], pesos).ravel()
+
+        n_estados, por_estado = len(ESTADOS), self.por_estado
+        estado = np.repeat(np.arange(n_estados), por_estado)
+        rotulos = np.array(ESTADOS, dtype=object)
+        bloco = {'ano': np.full(len(producao), ano, dtype=np.int16)}
+        if self.meses > 1:
+            bloco['mes'] = np.tile(self.mes, n_estados)
+        bloco['estado'] = rotulos[estado, 0]
+        bloco['sigla'] = rotulos[estado, 1]
+        bloco['regiao'] = rotulos[estado, 2]
+        if self.municipios > 1:
+            bloco['municipio'] = self.nomes_municipios[estado, np.tile(self.municipio, n_estados)]
+        if self.safras > 1:
+            bloco['safra'] = np.tile(self.safra, n_estados)
+        bloco['producao'] = producao
+        return pd.DataFrame(bloco)
+
+    def blocos(self):
+        for i_ano in range(len(self.anos)):
+            yield self.bloco(i_ano)
+
+
+def dimensao_estados(centroides):
+    """Dimensão dos estados na mesma codificação de dados.codificar (nomes em ordem alfabética)"""
+    ordem = sorted(range(len(ESTADOS)), key=lambda i: ESTADOS[i][0])
+    regioes = sorted({estado[2] for estado in ESTADOS})
+    codigos = np.empty(len(ESTADOS), dtype=np.int16)
+    codigos[ordem] = np.arange(len(ESTADOS))
+    dimensao = {
+        'estado': [ESTADOS[i][0] for i in ordem],
+        'sigla': [ESTADOS[i][1] for i in ordem],
+        'regiao_id': [regioes.index(ESTADOS[i][2]) for i in ordem],
+        'lon': [centroides.get(ESTADOS[i][1], (np.nan, np.nan))[0] for i in ordem],
+        'lat': [centroides.get(ESTADOS[i][1], (np.nan, np.nan))[1] for i in ordem]
+    }
+    return dimensao, regioes, codigos
+
+
+def gerar(gerador, caminho_csv=SYNTHETIC_CSV, diretorio=SYNTHETIC_COLUMNAR_DIR,
+          caminho_geojson=DATA_GEOJSON):
+    """Grava o CSV e/ou o formato colunar (None pula) bloco a bloco; devolve o meta do colunar"""
+    centroides, geojson_mtime = carregar_centroides(caminho_geojson)
+    dimensao, regioes, codigos = dimensao_estados(centroides)
+    siglas = {estado[1]: i for i, estado in enumerate(ESTADOS)}
+
+    def partes():
+        # O CSV é escrito junto: o formato colunar é publicado depois dele, já atualizado
+        arquivo = open(caminho_csv, 'w', encoding='utf-8', newline='') if caminho_csv else None
+        try:
+            for i, bloco in enumerate(gerador.blocos()):
+                if arquivo is not None:
+                    bloco.to_csv(arquivo, columns=gerador.colunas_csv(), header=i == 0, index=False)
+                yield pd.DataFrame({'ano': bloco['ano'],
+                                    'estado_id': codigos[bloco['sigla'].map(siglas).to_numpy()],
+                                    'producao': bloco['producao']})
+        finally:
+            if arquivo is not None:
+                arquivo.close()
+
+    if diretorio is None:
+        for _ in partes():
+            pass
+        return None
+    return salvar_colunas_em_partes(partes(), gerador.linhas, dimensao, regioes, diretorio,
+                                    geojson_mtime=geojson_mtime)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos de produção de algodão')
+    parser.add_argument('--escala', type=int, default=1,
+                        help='linhas por estado e ano (1 = mesmo tamanho do script.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anos', type=int, nargs=2, default=ANOS, metavar=('INICIO', 'FIM'))
+    parser.add_argument('--municipios', type=int, help='municípios por estado')
+    parser.add_argument('--meses', type=int, choices=(1, 12), help='1 (anual) ou 12 (mensal)')
+    parser.add_argument('--safras', type=int, choices=(1, 2, 3))
+    parser.add_argument('--csv', default=SYNTHETIC_CSV, help="CSV de saída ('' para não gravar)")
+    parser.add_argument('--colunar', default=SYNTHETIC_COLUMNAR_DIR,
+                        help="diretório do formato colunar ('' para não gravar)")
+    argumentos = parser.parse_args()
+
+    gerador = GeradorSintetico(argumentos.escala, argumentos.anos, argumentos.seed,
+                               argumentos.municipios, argumentos.meses, argumentos.safras)
+    print(f"{gerador.linhas:,} linhas: {len(ESTADOS)} estados × {len(gerador.anos)} anos × "
+          f"{gerador.municipios} municípios × {gerador.meses} meses × {gerador.safras} safras")
+    inicio = time.perf_counter()
+    gerar(gerador, argumentos.csv or None, argumentos.colunar or None)
+    duracao = time.perf_counter() - inicio
+    for caminho in (argumentos.csv, argumentos.colunar):
+        if caminho:
+            print(f"Gravado em: {caminho}")
+    print(f"{duracao:.1f}s ({gerador.linhas / duracao:,.0f} linhas/s)")
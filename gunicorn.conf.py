@@ -0,0 +1,44 @@
+import gc
+import os
+
+from config import HOST, PORT, WORKERS, THREADS, WORKER_TIMEOUT
+
+# ============================================================================
+# CONFIGURAÇÃO DO GUNICORN
+# ============================================================================
+#
+# Execute com: gunicorn -c gunicorn.conf.py app:server
+#
+# Com preload_app o processo mestre importa app.py uma única vez: colunas
+# mapeadas em memória, cubo, geometria, esqueletos das figuras e os caches
+# da carga inicial são montados antes do fork e compartilhados pelos
+# workers em copy-on-write.
+
+
+def numero_workers():
+    """WEB_CONCURRENCY (definido por plataformas como o Render), WORKERS ou 2 × núcleos + 1"""
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    if WORKERS:
+        return WORKERS
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    return 2 * (nucleos or 1) + 1
+
+
+# A porta pode vir da plataforma de hospedagem (variável PORT)
+bind = f"{HOST}:{os.environ.get('PORT', PORT)}"
+workers = numero_workers()
+threads = THREADS
+worker_class = 'gthread' if THREADS > 1 else 'sync'
+timeout = WORKER_TIMEOUT
+preload_app = True
+accesslog = '-'
+
+
+def when_ready(server):
+    """No mestre, após o preload: aquece os caches e congela os objetos antes do fork"""
+    import app
+    app.aquecer_caches()
+    # Objetos congelados saem do rastreio do coletor de ciclos, que não volta a
+    # escrever nas páginas herdadas (e não quebra o compartilhamento copy-on-write)
+    gc.freeze()
@@ -0,0 +1,159 @@
+import hmac
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+
+from config import DATA_REVISIONS
+from dados import acrescentar_fatos, ler_meta
+from memoria_compartilhada import trava
+from recarga import RecarregadorDados, montar_base
+
+# ============================================================================
+# INGESTÃO INCREMENTAL DE REVISÕES
+# ============================================================================
+#
+# Estimativas por estado (ano, sigla, producao) chegam ao longo da safra. Em
+# vez de regenerar o CSV, cada lote vira linhas de delta (valor novo menos o
+# total atual da célula) acrescentadas ao formato colunar como uma nova
+# versão que aponta para a anterior. Os processos que estão na versão
+# anterior aplicam os deltas ao cubo (recarga.py), e só os resultados em
+# cache cuja janela de anos contém um ano alterado são descartados.
+#
+# Os registros também vão para um log (DATA_REVISIONS), reaplicado sempre que
+# o CSV é convertido de novo: uma revisão não se perde quando o CSV muda.
+#
+#   python ingestao.py revisoes.csv
+#   curl -H "Authorization: Bearer $INGEST_TOKEN" -H "Content-Type: text/csv" \
+#        --data-binary @revisoes.csv http://localhost:8050/api/ingestao
+
+COLUNAS = ('ano', 'sigla', 'producao')
+
+
+def normalizar_registros(registros):
+    """DataFrame (ano, sigla, producao) validado, a partir de um DataFrame ou lista de dicionários"""
+    df = pd.DataFrame(registros)
+    if df.empty:
+        raise ValueError('Nenhum registro informado')
+    faltando = [coluna for coluna in COLUNAS if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes: {', '.join(faltando)}")
+    df = df[list(COLUNAS)]
+    if df.isna().any().any():
+        raise ValueError('Registros com valores vazios')
+
+    try:
+        ano = pd.to_numeric(df['ano']).astype(np.int64)
+        producao = pd.to_numeric(df['producao']).round().astype(np.int64)
+    except (TypeError, ValueError):
+        raise ValueError('ano e producao devem ser numéricos') from None
+    if (producao < 0).any():
+        raise ValueError('producao não pode ser negativa')
+    return pd.DataFrame({'ano': ano.astype(np.int16).to_numpy(),
+                         'sigla': df['sigla'].astype(str).str.strip().str.upper().to_numpy(),
+                         'producao': producao.to_numpy()})
+
+
+def ler_registros(arquivo):
+    """Registros de um CSV com as colunas ano, sigla e producao (caminho ou arquivo aberto)"""
+    return normalizar_registros(pd.read_csv(arquivo, dtype={'sigla': str}))
+
+
+def calcular_deltas(base, registros):
+    """Linhas de fatos (ano, estado_id, producao) que levam cada célula ao valor revisado"""
+    registros = registros.drop_duplicates(['ano', 'sigla'], keep='last')
+    codigos = {sigla: i for i, sigla in enumerate(base.dados.estados['sigla'])}
+    desconhecidas = sorted(set(registros['sigla']) - set(codigos))
+    if desconhecidas:
+        raise ValueError(f"Siglas desconhecidas: {', '.join(desconhecidas)}")
+
+    cubo = base.cubo
+    anos = registros['ano'].to_numpy(dtype=np.int64)
+    estado_ids = registros['sigla'].map(codigos).to_numpy(dtype=np.int64)
+    atual = np.zeros(len(registros), dtype=np.int64)
+    presente = np.zeros(len(registros), dtype=bool)
+    dentro = (anos >= cubo.anos[0]) & (anos <= cubo.anos[-1])
+    celulas = (estado_ids[dentro], anos[dentro] - cubo.anos[0])
+    atual[dentro] = cubo.producao[celulas]
+    presente[dentro] = cubo.presente[celulas]
+
+    # Células novas entram mesmo com produção zero (passam a existir na série)
+    delta = registros['producao'].to_numpy(dtype=np.int64) - atual
+    mudou = (delta != 0) | ~presente
+    return pd.DataFrame({'ano': anos[mudou].astype(np.int16),
+                         'estado_id': estado_ids[mudou].astype(np.int16),
+                         'producao': delta[mudou]})
+
+
+def gravar_revisoes(registros, caminho_revisoes=DATA_REVISIONS):
+    """Acrescenta os registros ao log de revisões"""
+    novo = not os.path.exists(caminho_revisoes)
+    registros.to_csv(caminho_revisoes, mode='a', header=novo, index=False)
+
+
+def ingerir(recarregador, registros, caminho_revisoes=DATA_REVISIONS, tentativas=3):
+    """Grava as revisões, publica os deltas no formato colunar e troca a base deste processo"""
+    inicio = time.perf_counter()
+    registros = normalizar_registros(registros)
+    for _ in range(tentativas):
+        # Os deltas são calculados sobre a versão publicada, que este processo precisa ter
+        recarregador.verificar()
+        base = recarregador.atual
+        with trava(recarregador.diretorio):
+            meta = ler_meta(recarregador.diretorio)
+            if meta is None or meta['versao'] != base.versao:
+                continue
+            deltas = calcular_deltas(base, registros)
+            if not deltas.empty:
+                gravar_revisoes(registros, caminho_revisoes)
+                acrescentar_fatos(deltas, recarregador.diretorio)
+        recarregador.verificar()
+        return {
+            'versao': recarregador.atual.versao,
+            'registros': len(registros),
+            'celulas_alteradas': len(deltas),
+            'anos_alterados': sorted(set(deltas['ano'].tolist())),
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+    raise RuntimeError('Os dados mudaram durante a ingestão; tente novamente')
+
+
+def registrar_ingestao(servidor, rota, recarregador, token, caminho_revisoes=DATA_REVISIONS):
+    """Publica a rota POST de ingestão, protegida por token (Authorization: Bearer <token>)"""
+
+    def ingerir_requisicao():
+        informado = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(informado.encode(), token.encode()):
+            return jsonify(erro='Token inválido'), 401
+        try:
+            if request.mimetype == 'text/csv':
+                registros = ler_registros(io.BytesIO(request.get_data()))
+            else:
+                # Lista de registros, solta ou em {"registros": [...]}
+                corpo = request.get_json(silent=True)
+                registros = corpo.get('registros') if isinstance(corpo, dict) else corpo
+                if not isinstance(registros, list):
+                    raise ValueError('Envie uma lista JSON de registros ou um CSV (text/csv)')
+            resumo = ingerir(recarregador, registros, caminho_revisoes)
+        except ValueError as erro:
+            return jsonify(erro=str(erro)), 400
+        return jsonify(resumo)
+
+    servidor.add_url_rule(rota, 'ingestao', ingerir_requisicao, methods=['POST'])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Uso: python ingestao.py revisoes.csv [...]')
+        sys.exit(1)
+    # Servidores com DATA_RELOAD aplicam a nova versão na próxima verificação
+    recarregador = RecarregadorDados(montar_base)
+    for caminho in sys.argv[1:]:
+        resumo = ingerir(recarregador, ler_registros(caminho))
+        anos = ', '.join(str(ano) for ano in resumo['anos_alterados']) or 'nenhum'
+        print(f"{caminho}: {resumo['registros']} registros, {resumo['celulas_alteradas']} células "
+              f"alteradas (anos: {anos}) em {resumo['segundos']:.2f}s; versão {resumo['versao']}")
@@ -0,0 +1,262 @@
+import bisect
+import functools
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+# ============================================================================
+# MÉTRICAS NO FORMATO DO PROMETHEUS
+# ============================================================================
+#
+# Contadores e histogramas em memória, exportados em texto (formato de
+# exposição 0.0.4) pela rota /metrics. Cada requisição de callback acumula
+# em flask.g o tempo gasto em cada etapa (filtro, agregação, montagem da
+# figura, serialização e compressão); ao final da requisição os tempos, a
+# latência total e o tamanho da resposta vão para os histogramas do callback.
+# Com vários processos cada worker tem seus próprios contadores.
+
+# Limites dos histogramas: latência em segundos e tamanho em bytes
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000,
+                 1000000, 2000000, 5000000)
+
+
+def nome_callback(saida):
+    """Rótulo curto de um callback: a primeira saída ('..a.b...c.d..' → 'a.b')"""
+    return saida.strip('.').split('...')[0]
+
+
+def escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatar_rotulos(nomes, valores, extra=()):
+    pares = [f'{nome}="{escapar_rotulo(valor)}"' for nome, valor in zip(nomes, valores)]
+    pares += [f'{nome}="{valor}"' for nome, valor in extra]
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def formatar_valor(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador monotônico por combinação de rótulos"""
+
+    tipo = 'counter'
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos, quantidade=1):
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + quantidade
+
+    def amostras(self):
+        with self._lock:
+            itens = sorted(self._valores.items())
+        return [f'{self.nome}{formatar_rotulos(self.rotulos, chave)} {formatar_valor(valor)}'
+                for chave, valor in itens]
+
+
+class Histograma:
+    """Histograma cumulativo (buckets, soma e contagem) por combinação de rótulos"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_LATENCIA):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(limites)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_rotulos):
+        # Bucket do primeiro limite >= valor; o último é o +Inf
+        posicao = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][posicao] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def amostras(self):
+        with self._lock:
+            itens = sorted((chave, (list(serie[0]), serie[1], serie[2]))
+                           for chave, serie in self._series.items())
+        linhas = []
+        for chave, (buckets, soma, contagem) in itens:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float('inf'),), buckets):
+                acumulado += quantidade
+                rotulos = formatar_rotulos(self.rotulos, chave, [('le', formatar_valor(float(limite)))])
+                linhas.append(f'{self.nome}_bucket{rotulos} {acumulado}')
+            rotulos = formatar_rotulos(self.rotulos, chave)
+            linhas.append(f'{self.nome}_sum{rotulos} {formatar_valor(soma)}')
+            linhas.append(f'{self.nome}_count{rotulos} {contagem}')
+        return linhas
+
+
+class Medidor:
+    """Valores lidos no momento da coleta: função que devolve {rótulos: valor}"""
+
+    def __init__(self, nome, ajuda, rotulos, funcao, tipo='gauge'):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.funcao = funcao
+        self.tipo = tipo
+
+    def amostras(self):
+        return [f'{self.nome}{formatar_rotulos(self.rotulos, chave)} {formatar_valor(valor)}'
+                for chave, valor in sorted(self.funcao().items())]
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportado em texto pela rota /metrics"""
+
+    def __init__(self):
+        self.metricas = []
+
+    def registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def exportar(self):
+        linhas = []
+        for metrica in self.metricas:
+            linhas.append(f'# HELP {metrica.nome} {metrica.ajuda}')
+            linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+            linhas.extend(metrica.amostras())
+        return '\n'.join(linhas) + '\n'
+
+
+# ============================================================================
+# TEMPO POR ETAPA DA REQUISIÇÃO
+# ============================================================================
+
+def registrar_etapa(etapa, segundos):
+    """Soma a duração de uma etapa à requisição atual (sem efeito fora de uma requisição)"""
+    if not has_request_context():
+        return
+    etapas = g.setdefault('etapas', {})
+    etapas[etapa] = etapas.get(etapa, 0.0) + segundos
+    g.tempo_etapas = g.get('tempo_etapas', 0.0) + segundos
+
+
+def medir_etapa(etapa, funcao, *args):
+    """Executa funcao(*args) e registra seu tempo próprio, sem as etapas internas já medidas"""
+    if not has_request_context():
+        return funcao(*args)
+    inicio = time.perf_counter()
+    internas = g.get('tempo_etapas', 0.0)
+    resultado = funcao(*args)
+    registrar_etapa(etapa, time.perf_counter() - inicio - (g.get('tempo_etapas', 0.0) - internas))
+    return resultado
+
+
+def instrumentar_callback(funcao):
+    """Mede a execução de um callback (o restante da requisição é serialização do Dash)"""
+
+    @functools.wraps(funcao)
+    def medido(*args):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            g.tempo_callback = g.get('tempo_callback', 0.0) + time.perf_counter() - inicio
+
+    return medido
+
+
+def registrar_instrumentacao(servidor, rota_callbacks, rota_metricas, caches=None,
+                             compressao=None):
+    """Instala as métricas dos callbacks no servidor Flask e publica a rota /metrics"""
+    registro = RegistroMetricas()
+    requisicoes = registro.registrar(Contador(
+        'dashboard_callback_requests_total', 'Requisições de callback por status HTTP',
+        ('callback', 'status')))
+    latencia = registro.registrar(Histograma(
+        'dashboard_callback_duration_seconds', 'Latência total das requisições de callback',
+        ('callback',)))
+    etapas = registro.registrar(Histograma(
+        'dashboard_callback_stage_duration_seconds',
+        'Tempo de cada etapa do callback (filtro, agregacao, montagem, serializacao, compressao)',
+        ('callback', 'etapa')))
+    tamanho = registro.registrar(Histograma(
+        'dashboard_callback_response_bytes', 'Tamanho do JSON da resposta, antes da compressão',
+        ('callback',), LIMITES_BYTES))
+    enviados = registro.registrar(Histograma(
+        'dashboard_callback_response_sent_bytes', 'Bytes enviados por resposta, após a compressão',
+        ('callback',), LIMITES_BYTES))
+
+    caches = caches or {}
+
+    def estatisticas_caches(campo):
+        return lambda: {(nome,): cache.estatisticas()[campo] for nome, cache in caches.items()}
+
+    registro.registrar(Medidor('dashboard_cache_hits_total', 'Acertos acumulados de cada cache',
+                               ('cache',), estatisticas_caches('acertos'), tipo='counter'))
+    registro.registrar(Medidor('dashboard_cache_misses_total', 'Erros acumulados de cada cache',
+                               ('cache',), estatisticas_caches('erros'), tipo='counter'))
+    registro.registrar(Medidor('dashboard_cache_hit_ratio', 'Fração de acertos de cada cache',
+                               ('cache',), estatisticas_caches('taxa_acerto')))
+    registro.registrar(Medidor('dashboard_cache_entries', 'Itens guardados em cada cache',
+                               ('cache',), estatisticas_caches('itens')))
+
+    if compressao is not None:
+        # Bytes originais e enviados por callback/rota e codificação (compressao.py)
+        registro.registrar(Medidor(
+            'dashboard_response_bytes_total', 'Bytes das respostas antes e depois da compressão',
+            ('chave', 'codificacao', 'tipo'),
+            lambda: {(linha['chave'], linha['codificacao'], tipo): linha[campo]
+                     for linha in compressao.resumo()
+                     for tipo, campo in (('original', 'bytes_originais'),
+                                         ('enviado', 'bytes_enviados'))},
+            tipo='counter'))
+
+    @servidor.before_request
+    def iniciar_medicao():
+        if request.path == rota_callbacks:
+            g.inicio_requisicao = time.perf_counter()
+
+    @servidor.after_request
+    def registrar_medicao(resposta):
+        inicio = g.get('inicio_requisicao')
+        if inicio is None:
+            return resposta
+        total = time.perf_counter() - inicio
+        corpo = request.get_json(silent=True) or {}
+        callback = nome_callback(corpo.get('output', ''))
+
+        requisicoes.incrementar(callback, str(resposta.status_code))
+        latencia.observar(total, callback)
+        tempos = dict(g.get('etapas', {}))
+        if not g.get('resposta_em_cache', False):
+            # Fora das etapas medidas, o tempo da requisição é a serialização do Dash
+            tempos['serializacao'] = max(
+                total - g.get('tempo_callback', 0.0) - tempos.get('compressao', 0.0), 0.0)
+        for etapa, segundos in tempos.items():
+            etapas.observar(segundos, callback, etapa)
+
+        if not resposta.is_streamed:
+            tamanho_enviado = resposta.content_length or 0
+            tamanho.observar(g.get('bytes_originais', tamanho_enviado), callback)
+            enviados.observar(tamanho_enviado, callback)
+        return resposta
+
+    def exportar_metricas():
+        return Response(registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    servidor.add_url_rule(rota_metricas, 'metricas', exportar_metricas)
+    return registro
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from cubo import CuboProducao
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (a publicação continua atômica)
+    fcntl = None
+
+# ============================================================================
+# SEGMENTO COMPARTILHADO DO CUBO
+# ============================================================================
+#
+# Os vetores do cubo (produção, presença e somas prefixas) são gravados uma
+# única vez em um arquivo no /dev/shm (memória, não disco) e cada processo
+# os mapeia somente para leitura: N workers usam as mesmas páginas físicas,
+# em vez de cada um montar a sua cópia. As colunas da tabela de fatos já são
+# compartilhadas da mesma forma, pelo memory-map dos arquivos .npy.
+#
+# Como no formato colunar, o arquivo atual.json aponta para o segmento
+# vigente e é substituído atomicamente. O segmento leva o carimbo da versão
+# dos dados de origem: um processo com dados de outra versão monta o cubo e
+# publica um segmento novo. Os demais não vigiam o segmento: percebem a nova
+# versão pelo meta do formato colunar (recarga.py) e, ao montar a base nova,
+# anexam o segmento cujo carimbo corresponde a ela.
+
+# Versão do layout do segmento (mudanças forçam uma nova publicação)
+FORMATO = 1
+
+ARQUIVO_ATUAL = 'atual.json'
+ARQUIVO_TRAVA = 'trava'
+
+# Início de cada vetor alinhado em 64 bytes (linha de cache)
+ALINHAMENTO = 64
+
+
+def diretorio_padrao(nome='algodao'):
+    """Diretório dos segmentos: /dev/shm quando existir, senão o temporário do sistema"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, nome)
+
+
+def carimbo_dados(dados):
+    """Versão esperada do segmento para estes dados (None se não vierem do formato colunar)"""
+    if dados.versao is None:
+        return None
+    return f'{FORMATO}-{dados.versao}'
+
+
+@contextmanager
+def trava(diretorio):
+    """Trava exclusiva entre processos sobre um diretório (um único processo publica por vez)"""
+    os.makedirs(diretorio, exist_ok=True)
+    with open(os.path.join(diretorio, ARQUIVO_TRAVA), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ler_atual(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_ATUAL), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def publicar_segmento(diretorio, vetores, carimbo):
+    """Grava os vetores em um único arquivo e publica o segmento via atual.json"""
+    os.makedirs(diretorio, exist_ok=True)
+    anterior = ler_atual(diretorio)
+    arquivo = f'segmento.{time.time_ns():x}.{os.getpid()}.bin'
+
+    layout, deslocamento = {}, 0
+    for nome, valores in vetores.items():
+        valores = np.ascontiguousarray(valores)
+        deslocamento = -(-deslocamento // ALINHAMENTO) * ALINHAMENTO
+        layout[nome] = {'dtype': valores.dtype.str, 'shape': list(valores.shape),
+                        'offset': deslocamento}
+        deslocamento += valores.nbytes
+
+    temporario = os.path.join(diretorio, f'{arquivo}.tmp')
+    with open(temporario, 'wb') as f:
+        for nome, valores in vetores.items():
+            f.seek(layout[nome]['offset'])
+            f.write(np.ascontiguousarray(valores).tobytes())
+        f.truncate(max(deslocamento, 1))
+    os.replace(temporario, os.path.join(diretorio, arquivo))
+
+    atual = {'formato': FORMATO, 'carimbo': carimbo, 'arquivo': arquivo, 'vetores': layout}
+    temporario = os.path.join(diretorio, f'{ARQUIVO_ATUAL}.{os.getpid()}.tmp')
+    with open(temporario, 'w') as f:
+        json.dump(atual, f)
+    os.replace(temporario, os.path.join(diretorio, ARQUIVO_ATUAL))
+
+    # O segmento anterior pode ser removido mesmo se ainda mapeado por outros processos
+    if anterior is not None and anterior['arquivo'] != arquivo:
+        try:
+            os.remove(os.path.join(diretorio, anterior['arquivo']))
+        except FileNotFoundError:
+            pass
+    return atual
+
+
+def anexar_segmento(diretorio, atual):
+    """Vetores do segmento mapeados somente para leitura"""
+    caminho = os.path.join(diretorio, atual['arquivo'])
+    return {nome: np.memmap(caminho, dtype=np.dtype(info['dtype']), mode='r',
+                            offset=info['offset'], shape=tuple(info['shape']))
+            for nome, info in atual['vetores'].items()}
+
+
+class SegmentoCubo:
+    """Cubo anexado ao segmento compartilhado, com o carimbo da versão em uso"""
+
+    def __init__(self, dados, diretorio=None, montar_cubo=CuboProducao):
+        self.diretorio = diretorio or diretorio_padrao()
+        carimbo = carimbo_dados(dados)
+        with trava(self.diretorio):
+            atual = ler_atual(self.diretorio)
+            if atual is None or carimbo is None or atual['carimbo'] != carimbo:
+                # Primeiro processo com esta versão dos dados: monta e publica
+                atual = publicar_segmento(self.diretorio, montar_cubo(dados).vetores(), carimbo)
+            self.cubo = CuboProducao(dados, anexar_segmento(self.diretorio, atual))
+        self.carimbo = atual['carimbo']
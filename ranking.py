@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# SELEÇÃO PARCIAL (TOP-K)
+# ============================================================================
+#
+# Rankings e a primeira página da tabela precisam apenas das k primeiras
+# posições de uma ordenação. Em vez de ordenar o vetor inteiro
+# (O(n log n)), np.partition encontra o k-ésimo valor em O(n) e só os
+# k selecionados são ordenados. Empates são resolvidos pela posição
+# original, de modo que o resultado é idêntico ao de um sort estável.
+
+
+def chave_numerica(valores):
+    """Chave ordenável compatível com np.partition (textos viram postos inteiros)"""
+    valores = np.asarray(valores)
+    if valores.dtype.kind in 'biuf':
+        return valores
+    return pd.factorize(valores, sort=True)[0]
+
+
+def menores_posicoes(chave, k):
+    """Posições dos k menores valores, na ordem de um argsort estável"""
+    chave = np.asarray(chave)
+    n = len(chave)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k == 1:
+        return np.array([np.argmin(chave)], dtype=np.intp)
+    if k >= n:
+        return np.argsort(chave, kind='stable')
+
+    limiar = np.partition(chave, k - 1)[k - 1]
+    menores = np.flatnonzero(chave < limiar)
+    # Entre os empatados no limiar ficam os de menor posição (como no sort estável)
+    empatados = np.flatnonzero(chave == limiar)[:k - len(menores)]
+    selecionados = np.sort(np.concatenate([menores, empatados]))
+    return selecionados[np.argsort(chave[selecionados], kind='stable')]
+
+
+def maiores_posicoes(chave, k):
+    """Posições dos k maiores valores (ordem decrescente, empates pela posição)"""
+    chave = np.asarray(chave)
+    if chave.dtype.kind in 'bu':
+        chave = chave.astype(np.int64)
+    return menores_posicoes(-chave, k)
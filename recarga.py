@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+
+from config import DATA_CSV, DATA_COLUMNAR_DIR, DATA_GEOJSON
+from consultas import criar_motor
+from cubo import CuboProducao
+from dados import carregar_dados, colunar_desatualizado, converter_csv, ler_meta
+from memoria_compartilhada import SegmentoCubo, trava
+
+# ============================================================================
+# RECARGA DOS DADOS SEM REINICIAR O SERVIDOR
+# ============================================================================
+#
+# Os dados em uso ficam em uma BaseDados imutável (dados, cubo e as listas dos
+# filtros). Uma thread de cada processo verifica periodicamente o CSV e o
+# formato colunar: quando o CSV muda (e já parou de ser escrito), a conversão
+# é refeita por um único processo; quando o formato colunar publica outra
+# versão, uma base nova é montada em segundo plano e trocada por uma única
+# atribuição. Quem já leu a base antiga termina com ela; ninguém vê uma base
+# pela metade.
+#
+# Uma versão publicada pela ingestão (ingestao.py) só acrescenta linhas de
+# delta à versão anterior: quem está nela aplica os deltas ao próprio cubo
+# em vez de remontá-lo, e informa os anos alterados para que os caches
+# descartem apenas o que depende deles.
+
+logger = logging.getLogger(__name__)
+
+
+class BaseDados:
+    """Uma versão dos dados: fatos, cubo e os valores dos filtros derivados deles"""
+
+    def __init__(self, dados, cubo, segmento=None, anos_alterados=None, motor=None):
+        self.dados = dados
+        self.cubo = cubo
+        # Quem executa as consultas do dashboard (consultas.py); por padrão o próprio cubo
+        self.motor = motor if motor is not None else cubo
+        self.segmento = segmento
+        self.versao = dados.versao
+        # Anos revisados em relação à base anterior (None: base montada do zero)
+        self.anos_alterados = anos_alterados
+        self.anos = cubo.anos[cubo.presente.any(axis=0)].tolist()
+        self.regioes = list(dados.regioes)
+        self.estados = dados.estados['estado'].tolist()
+
+
+def montar_base(caminho_csv=DATA_CSV, diretorio=DATA_COLUMNAR_DIR, caminho_geojson=DATA_GEOJSON,
+                memoria_compartilhada=False, diretorio_segmento=None, anterior=None, motor='cubo'):
+    """Carrega o formato colunar atual e monta (ou anexa, com memória compartilhada) o cubo
+
+    Se a versão carregada só acrescentou deltas à da base anterior, o cubo
+    novo é o anterior com os deltas aplicados.
+    """
+    dados = carregar_dados(caminho_csv, diretorio, caminho_geojson)
+    montar_cubo, anos_alterados = CuboProducao, None
+    revisao = dados.revisao
+    if anterior is not None and revisao is not None and revisao['base'] == anterior.versao:
+        novos = dados.fatos.iloc[revisao['linhas_base']:]
+        anos_alterados = sorted(set(novos['ano'].tolist()))
+
+        def montar_cubo(dados):
+            return anterior.cubo.com_deltas(dados, novos['ano'].values, novos['estado_id'].values,
+                                            novos['producao'].values)
+
+    if memoria_compartilhada:
+        segmento = SegmentoCubo(dados, diretorio_segmento, montar_cubo)
+        cubo = segmento.cubo
+    else:
+        segmento, cubo = None, montar_cubo(dados)
+    return BaseDados(dados, cubo, segmento, anos_alterados, criar_motor(motor, dados, cubo))
+
+
+class RecarregadorDados:
+    """Base de dados atual e a thread que a substitui quando o CSV ou o formato colunar mudam"""
+
+    def __init__(self, montar, caminho_csv=DATA_CSV, diretorio=DATA_COLUMNAR_DIR,
+                 caminho_geojson=DATA_GEOJSON, intervalo=5.0, ao_trocar=()):
+        self.montar = montar
+        self.caminho_csv = caminho_csv
+        self.diretorio = diretorio
+        self.caminho_geojson = caminho_geojson
+        self.intervalo = intervalo
+        self.ao_trocar = list(ao_trocar)
+        self.atual = montar()
+        self.recargas = 0
+        self._mtime_csv = self._ler_mtime_csv()
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._lock_verificacao = threading.Lock()
+        self._pid_thread = None
+
+    def _ler_mtime_csv(self):
+        try:
+            return os.path.getmtime(self.caminho_csv)
+        except FileNotFoundError:
+            return None
+
+    def verificar(self):
+        """Reconverte o CSV alterado e troca a base se houver outra versão; True se trocou"""
+        # A thread de recarga e a ingestão podem verificar ao mesmo tempo
+        with self._lock_verificacao:
+            return self._verificar()
+
+    def _verificar(self):
+        # Só converte um CSV que não mudou desde a última verificação (cópia já terminada)
+        mtime_csv = self._ler_mtime_csv()
+        estavel = mtime_csv == self._mtime_csv
+        self._mtime_csv = mtime_csv
+        if estavel and colunar_desatualizado(self.caminho_csv, self.diretorio, self.caminho_geojson):
+            with trava(self.diretorio):
+                # Outro processo pode ter convertido enquanto esperávamos a trava
+                if colunar_desatualizado(self.caminho_csv, self.diretorio, self.caminho_geojson):
+                    converter_csv(self.caminho_csv, self.diretorio, self.caminho_geojson)
+
+        meta = ler_meta(self.diretorio)
+        if meta is None or meta['versao'] == self.atual.versao:
+            return False
+        self.trocar(self.montar(anterior=self.atual))
+        return True
+
+    def trocar(self, base):
+        """Publica uma base já montada e avisa os interessados (limpeza de caches)"""
+        anterior, self.atual = self.atual, base
+        self.recargas += 1
+        for funcao in self.ao_trocar:
+            funcao(anterior, base)
+        logger.info('Dados recarregados: versão %s', base.versao)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception:
+                # CSV inválido ou conversão com erro: continua servindo a base atual
+                logger.exception('Falha ao recarregar os dados; mantendo a versão %s',
+                                 self.atual.versao)
+
+    def iniciar(self):
+        """Inicia a verificação periódica neste processo (idempotente; refeita após um fork)"""
+        with self._lock:
+            if self._pid_thread == os.getpid():
+                return
+            self._pid_thread = os.getpid()
+            self._parar.clear()
+            threading.Thread(target=self._executar, name='recarga-dados', daemon=True).start()
+
+    def parar(self):
+        with self._lock:
+            self._parar.set()
+            self._pid_thread = None
@@ -0,0 +1,57 @@
+import hashlib
+
+import plotly.io as pio
+from flask import Response, g, request
+
+# ============================================================================
+# SERIALIZAÇÃO DAS SAÍDAS DOS CALLBACKS
+# ============================================================================
+#
+# O Dash serializa as respostas com plotly.io.json; com o motor orjson os
+# vetores numpy são escritos diretamente, sem virar listas de ints Python.
+# Além disso, o JSON já serializado de cada resposta fica em cache, indexado
+# pelo corpo da requisição: estados repetidos não recalculam nem
+# reserializam nada.
+
+
+def configurar_motor_json(motor='auto'):
+    """Define o motor JSON do plotly (e do Dash); sem orjson instalado cai no json padrão"""
+    if motor in ('auto', 'orjson'):
+        try:
+            import orjson  # noqa: F401
+            motor = 'orjson'
+        except ImportError:
+            motor = 'json'
+    pio.json.config.default_engine = motor
+    return motor
+
+
+def registrar_cache_respostas(servidor, cache, rota, versao=None):
+    """Responde POSTs repetidos de callbacks com o JSON já serializado"""
+
+    def chave_requisicao():
+        # Com versao, a versão dos dados entra na chave: uma recarga invalida as respostas
+        chave = hashlib.blake2b(request.get_data(), digest_size=16)
+        if versao is not None:
+            chave.update(str(versao()).encode())
+        return chave.digest()
+
+    @servidor.before_request
+    def responder_do_cache():
+        if request.method != 'POST' or request.path != rota:
+            return None
+        # A chave é calculada uma vez: a resposta é guardada na versão em que foi pedida
+        g.chave_resposta = chave_requisicao()
+        achou, corpo = cache.obter(g.chave_resposta)
+        if achou:
+            g.resposta_em_cache = True
+            return Response(corpo, mimetype='application/json')
+        return None
+
+    @servidor.after_request
+    def guardar_resposta(resposta):
+        if (request.method == 'POST' and request.path == rota and resposta.status_code == 200
+                and 'Content-Encoding' not in resposta.headers
+                and not g.get('resposta_em_cache', False) and 'chave_resposta' in g):
+            cache.guardar(g.chave_resposta, resposta.get_data())
+        return resposta
@@ -0,0 +1,315 @@
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from config import (DATA_GEOJSON, GEOMETRY_DIR, GEO_QUANTIZATION, GEO_SIMPLIFY_TOLERANCE_PX,
+                    GEO_ZOOM_LEVELS)
+from geometria import ler_geojson
+
+# ============================================================================
+# SIMPLIFICAÇÃO TOPOLÓGICA E TOPOJSON
+# ============================================================================
+#
+# Etapa de build das fronteiras do mapa. As coordenadas são quantizadas em
+# uma grade inteira e cada anel é quebrado em arcos nos pontos de junção
+# (onde muda o conjunto de polígonos que compartilham a borda). Cada arco
+# compartilhado existe uma única vez, então simplificá-lo (Douglas-Peucker)
+# altera igualmente os dois vizinhos: não surgem buracos nem sobreposições.
+#
+# Para cada nível de zoom de GEO_ZOOM_LEVELS a tolerância em pixels
+# (GEO_SIMPLIFY_TOLERANCE_PX) é convertida para graus e um TopoJSON
+# quantizado, com arcos em codificação delta, é gravado em GEOMETRY_DIR.
+# O app lê esses arquivos e serve ao plotly.js um GeoJSON por nível.
+
+ARQUIVO_META = 'meta.json'
+OBJETO = 'estados'
+
+
+def graus_por_pixel(zoom):
+    """Largura de um pixel em graus de longitude no zoom do mapbox (tiles de 256 px)"""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def extrair_aneis(geometria):
+    """Lista de polígonos, cada um como lista de anéis"""
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    raise ValueError(f"Geometria sem área: {geometria['type']}")
+
+
+class Quantizacao:
+    """Transformação entre coordenadas (lon, lat) e a grade inteira do TopoJSON"""
+
+    def __init__(self, geojson, niveis=GEO_QUANTIZATION):
+        pontos = np.concatenate([np.asarray(anel, dtype=float)[:, :2]
+                                 for feicao in geojson['features']
+                                 for poligono in extrair_aneis(feicao['geometry'])
+                                 for anel in poligono])
+        self.translate = pontos.min(axis=0)
+        extensao = pontos.max(axis=0) - self.translate
+        self.scale = np.where(extensao > 0, extensao / (niveis - 1), 1.0)
+
+    def quantizar(self, anel):
+        pontos = np.rint((np.asarray(anel, dtype=float)[:, :2] - self.translate) / self.scale)
+        pontos = pontos.astype(np.int64)
+        # Pontos repetidos após a quantização são descartados
+        manter = np.ones(len(pontos), dtype=bool)
+        manter[1:] = np.any(pontos[1:] != pontos[:-1], axis=1)
+        pontos = pontos[manter]
+        if not np.array_equal(pontos[0], pontos[-1]):
+            pontos = np.vstack([pontos, pontos[:1]])
+        return pontos
+
+    def para_json(self):
+        return {'scale': self.scale.tolist(), 'translate': self.translate.tolist()}
+
+
+def nivel_para_zoom(zoom, niveis):
+    """Nível de geometria usado em um zoom: o mais detalhado cujo zoom mínimo já foi atingido"""
+    niveis = sorted(niveis)
+    atingidos = [nivel for nivel in niveis if nivel <= zoom]
+    return atingidos[-1] if atingidos else niveis[0]
+
+
+def casas_decimais(escala):
+    """Casas decimais suficientes para distinguir dois passos vizinhos da grade"""
+    return max(0, int(math.ceil(-math.log10(np.min(escala)))))
+
+
+def douglas_peucker(pontos, tolerancia):
+    """Máscara dos pontos mantidos de uma polilinha aberta (extremos sempre mantidos)"""
+    n = len(pontos)
+    manter = np.zeros(n, dtype=bool)
+    manter[0] = manter[-1] = True
+    if n <= 2 or tolerancia <= 0:
+        manter[:] = True
+        return manter
+    pontos = pontos.astype(float)
+    pilha = [(0, n - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        a, b = pontos[inicio], pontos[fim]
+        meio = pontos[inicio + 1:fim]
+        direcao = b - a
+        comprimento = np.hypot(*direcao)
+        if comprimento == 0:
+            distancias = np.hypot(*(meio - a).T)
+        else:
+            distancias = np.abs(direcao[0] * (meio[:, 1] - a[1])
+                                - direcao[1] * (meio[:, 0] - a[0])) / comprimento
+        i = int(np.argmax(distancias))
+        if distancias[i] > tolerancia:
+            k = inicio + 1 + i
+            manter[k] = True
+            pilha.append((inicio, k))
+            pilha.append((k, fim))
+    return manter
+
+
+def simplificar_arco(arco, tolerancia):
+    """Arco simplificado; arcos fechados são divididos no ponto mais distante do início"""
+    if len(arco) > 3 and np.array_equal(arco[0], arco[-1]):
+        k = int(np.argmax(np.hypot(*(arco - arco[0]).T)))
+        manter = np.concatenate([douglas_peucker(arco[:k + 1], tolerancia)[:-1],
+                                 douglas_peucker(arco[k:], tolerancia)])
+        return arco[manter]
+    return arco[douglas_peucker(arco, tolerancia)]
+
+
+class Topologia:
+    """Anéis quantizados decompostos em arcos únicos compartilhados entre polígonos"""
+
+    def __init__(self, geojson, quantizacao):
+        self.quantizacao = quantizacao
+        self.feicoes = []
+        aneis = []
+        for feicao in geojson['features']:
+            poligonos = []
+            for poligono in extrair_aneis(feicao['geometry']):
+                poligonos.append([len(aneis) + i for i in range(len(poligono))])
+                aneis.extend(quantizacao.quantizar(anel) for anel in poligono)
+            self.feicoes.append((feicao, poligonos))
+
+        # Anéis que usam cada aresta e anéis que passam por cada vértice
+        arestas, vertices = {}, {}
+        for r, anel in enumerate(aneis):
+            pontos = [tuple(p) for p in anel.tolist()]
+            for p, q in zip(pontos[:-1], pontos[1:]):
+                arestas.setdefault((min(p, q), max(p, q)), set()).add(r)
+            for p in pontos[:-1]:
+                vertices.setdefault(p, set()).add(r)
+
+        self.arcos = []
+        indice_arcos = {}
+        self.aneis = [self._decompor(anel, arestas, vertices, indice_arcos) for anel in aneis]
+
+    def _decompor(self, anel, arestas, vertices, indice_arcos):
+        """Índices (TopoJSON: ~i para arco invertido) dos arcos que formam o anel"""
+        pontos = [tuple(p) for p in anel.tolist()][:-1]
+        n = len(pontos)
+
+        def dono(i):
+            p, q = pontos[i], pontos[(i + 1) % n]
+            return arestas[(min(p, q), max(p, q))]
+
+        juncoes = [i for i in range(n)
+                   if dono(i - 1) != dono(i) or vertices[pontos[i]] != dono(i)]
+        if not juncoes:
+            # Anel isolado: vira um único arco fechado, começando no menor ponto
+            inicio = pontos.index(min(pontos))
+            juncoes = [inicio]
+
+        indices = []
+        for j, inicio in enumerate(juncoes):
+            fim = juncoes[(j + 1) % len(juncoes)]
+            comprimento = (fim - inicio) % n or n
+            arco = tuple(pontos[(inicio + k) % n] for k in range(comprimento + 1))
+            if arco in indice_arcos:
+                indices.append(indice_arcos[arco])
+            elif arco[::-1] in indice_arcos:
+                indices.append(~indice_arcos[arco[::-1]])
+            else:
+                indice_arcos[arco] = len(self.arcos)
+                indices.append(len(self.arcos))
+                self.arcos.append(np.array(arco, dtype=np.int64))
+        return indices
+
+    def simplificar(self, tolerancia):
+        """Arcos simplificados com a tolerância em unidades da grade"""
+        arcos = [simplificar_arco(arco, tolerancia) for arco in self.arcos]
+        # Anéis que degenerariam (menos de 3 pontos distintos) mantêm os arcos originais
+        for anel in self.aneis:
+            if contar_pontos(anel, arcos) < 3:
+                for indice in anel:
+                    i = indice if indice >= 0 else ~indice
+                    arcos[i] = self.arcos[i]
+        return arcos
+
+    def para_topojson(self, arcos):
+        """Topologia no formato TopoJSON, arcos quantizados em codificação delta"""
+        geometrias = []
+        for feicao, poligonos in self.feicoes:
+            aneis = [[self.aneis[r] for r in poligono] for poligono in poligonos]
+            geometria = ({'type': 'Polygon', 'arcs': aneis[0]} if len(aneis) == 1
+                         else {'type': 'MultiPolygon', 'arcs': aneis})
+            geometria['properties'] = feicao.get('properties', {})
+            if 'id' in feicao:
+                geometria['id'] = feicao['id']
+            geometrias.append(geometria)
+
+        arcos_delta = [np.vstack([arco[:1], np.diff(arco, axis=0)]).tolist() for arco in arcos]
+        return {
+            'type': 'Topology',
+            'transform': self.quantizacao.para_json(),
+            'objects': {OBJETO: {'type': 'GeometryCollection', 'geometries': geometrias}},
+            'arcs': arcos_delta
+        }
+
+
+def contar_pontos(anel, arcos):
+    """Número de pontos distintos de um anel montado a partir dos arcos"""
+    return sum(len(arcos[i if i >= 0 else ~i]) - 1 for i in anel)
+
+
+def topojson_para_geojson(topologia, objeto=OBJETO):
+    """Decodifica um TopoJSON quantizado em GeoJSON (coordenadas arredondadas à grade)"""
+    escala = np.asarray(topologia['transform']['scale'])
+    origem = np.asarray(topologia['transform']['translate'])
+    casas = casas_decimais(escala)
+    arcos = [np.round(np.cumsum(np.asarray(arco, dtype=np.int64), axis=0) * escala + origem, casas)
+             for arco in topologia['arcs']]
+
+    def anel(indices):
+        partes = [arcos[i] if i >= 0 else arcos[~i][::-1] for i in indices]
+        pontos = np.vstack([partes[0]] + [parte[1:] for parte in partes[1:]])
+        return pontos.tolist()
+
+    feicoes = []
+    for geometria in topologia['objects'][objeto]['geometries']:
+        if geometria['type'] == 'Polygon':
+            coordenadas = [anel(a) for a in geometria['arcs']]
+        else:
+            coordenadas = [[anel(a) for a in poligono] for poligono in geometria['arcs']]
+        feicao = {'type': 'Feature', 'properties': geometria.get('properties', {}),
+                  'geometry': {'type': geometria['type'], 'coordinates': coordenadas}}
+        if 'id' in geometria:
+            feicao['id'] = geometria['id']
+        feicoes.append(feicao)
+    return {'type': 'FeatureCollection', 'features': feicoes}
+
+
+# ============================================================================
+# BUILD DOS NÍVEIS DE ZOOM
+# ============================================================================
+
+def parametros_build():
+    return {'niveis': list(GEO_ZOOM_LEVELS), 'tolerancia_px': GEO_SIMPLIFY_TOLERANCE_PX,
+            'quantizacao': GEO_QUANTIZATION}
+
+
+def ler_meta(diretorio=GEOMETRY_DIR):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_META), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def geometria_desatualizada(caminho_geojson=DATA_GEOJSON, diretorio=GEOMETRY_DIR):
+    """True se os níveis não existem, usam outros parâmetros ou são mais antigos que o GeoJSON"""
+    meta = ler_meta(diretorio)
+    if meta is None or meta.get('parametros') != parametros_build():
+        return True
+    return os.path.getmtime(caminho_geojson) > meta['geojson_mtime']
+
+
+def gerar_niveis(caminho_geojson=DATA_GEOJSON, diretorio=GEOMETRY_DIR):
+    """Grava um TopoJSON simplificado por nível de zoom e o meta.json que os lista"""
+    geojson = ler_geojson(caminho_geojson)
+    topologia = Topologia(geojson, Quantizacao(geojson))
+    os.makedirs(diretorio, exist_ok=True)
+
+    arquivos = {}
+    for zoom in GEO_ZOOM_LEVELS:
+        # Tolerância em pixels → graus → passos da grade
+        tolerancia = GEO_SIMPLIFY_TOLERANCE_PX * graus_por_pixel(zoom) / topologia.quantizacao.scale.min()
+        topojson = topologia.para_topojson(topologia.simplificar(tolerancia))
+        arquivo = f'{OBJETO}.z{zoom}.topojson'
+        temporario = os.path.join(diretorio, f'{arquivo}.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(topojson, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temporario, os.path.join(diretorio, arquivo))
+        arquivos[str(zoom)] = arquivo
+
+    meta = {'parametros': parametros_build(), 'geojson_mtime': os.path.getmtime(caminho_geojson),
+            'gerado_em': time.time(), 'arquivos': arquivos}
+    temporario = os.path.join(diretorio, f'{ARQUIVO_META}.tmp')
+    with open(temporario, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporario, os.path.join(diretorio, ARQUIVO_META))
+    return meta
+
+
+def carregar_niveis(caminho_geojson=DATA_GEOJSON, diretorio=GEOMETRY_DIR):
+    """GeoJSON quantizado de cada nível de zoom, refazendo o build se necessário"""
+    if geometria_desatualizada(caminho_geojson, diretorio):
+        gerar_niveis(caminho_geojson, diretorio)
+    niveis = {}
+    for zoom, arquivo in ler_meta(diretorio)['arquivos'].items():
+        with open(os.path.join(diretorio, arquivo), 'r', encoding='utf-8') as f:
+            niveis[int(zoom)] = topojson_para_geojson(json.load(f))
+    return niveis
+
+
+if __name__ == '__main__':
+    meta = gerar_niveis()
+    for zoom, arquivo in meta['arquivos'].items():
+        tamanho = os.path.getsize(os.path.join(GEOMETRY_DIR, arquivo))
+        print(f"Zoom {zoom}: {arquivo} ({tamanho:,} bytes)")
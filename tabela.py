@@ -0,0 +1,100 @@
+import math
+import re
+
+import numpy as np
+
+from ranking import chave_numerica, maiores_posicoes, menores_posicoes
+
+# ============================================================================
+# TABELA PAGINADA NO SERVIDOR
+# ============================================================================
+#
+# A DataTable opera em modo 'custom': filtro, ordenação e paginação são
+# resolvidos aqui e apenas as linhas da página visível são serializadas.
+
+# Condição '{coluna} operador valor' da sintaxe filter_query da DataTable;
+# operadores podem vir com prefixo de sensibilidade a caixa, ex.: 'icontains'
+# (ignora a caixa) ou 'scontains' (diferencia); sem prefixo, diferencia, como o
+# filter_options padrão da DataTable (case='sensitive')
+CONDICAO = re.compile(
+    r'^\s*\{(?P<coluna>[^}]+)\}\s*(?P<prefixo>[is]?)'
+    r'(?P<operador>>=|<=|!=|<|>|=|(?:ge|le|lt|gt|ne|eq|contains|datestartswith)\b)'
+    r'\s*(?P<valor>.*?)\s*$'
+)
+
+OPERADORES = {'ge': '>=', 'le': '<=', 'lt': '<', 'gt': '>', 'ne': '!=', 'eq': '=',
+              '>=': '>=', '<=': '<=', '<': '<', '>': '>', '!=': '!=', '=': '=',
+              'contains': 'contains', 'datestartswith': 'datestartswith'}
+
+
+def separar_filtro(parte):
+    """Divide uma condição '{coluna} operador valor' em (coluna, prefixo, operador, valor)"""
+    encontrado = CONDICAO.match(parte)
+    if encontrado is None:
+        return None, None, None, None
+    operador = OPERADORES[encontrado.group('operador')]
+
+    valor = encontrado.group('valor')
+    if len(valor) >= 2 and valor[0] == valor[-1] and valor[0] in ('"', "'", '`'):
+        valor = valor[1:-1].replace('\\' + valor[0], valor[0])
+    else:
+        try:
+            valor = float(valor)
+        except ValueError:
+            pass
+    return encontrado.group('coluna'), encontrado.group('prefixo'), operador, valor
+
+
+def filtrar_tabela(df, filter_query):
+    """Aplica o filter_query da DataTable (condições unidas por '&&')"""
+    if not filter_query:
+        return df
+    mascara = np.ones(len(df), dtype=bool)
+    for parte in filter_query.split(' && '):
+        coluna, prefixo, operador, valor = separar_filtro(parte)
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if operador in ('contains', 'datestartswith'):
+            texto = serie.astype(str)
+            if operador == 'contains':
+                mascara &= texto.str.contains(str(valor), case=prefixo != 'i', regex=False).values
+            else:
+                mascara &= texto.str.startswith(str(valor)).values
+        elif isinstance(valor, str) and serie.dtype != object:
+            mascara[:] = False
+        else:
+            comparacao = {'>=': serie.ge, '<=': serie.le, '<': serie.lt,
+                          '>': serie.gt, '!=': serie.ne, '=': serie.eq}[operador]
+            mascara &= comparacao(valor).values
+    return df[mascara]
+
+
+def criterios_ordenacao(sort_by, ordenacao):
+    """sort_by da tabela tem prioridade; sem ele vale o dropdown de ordenação"""
+    if sort_by:
+        return [(item['column_id'], item['direction'] == 'asc') for item in sort_by]
+    if ordenacao == 'producao':
+        return [('producao', False)]
+    return [(ordenacao, True)]
+
+
+def pagina_tabela(df, criterios, page_current, page_size):
+    """Ordena e devolve apenas as linhas da página pedida (e a página efetiva)"""
+    total = len(df)
+    page_count = max(1, math.ceil(total / page_size))
+    page_current = min(max(page_current or 0, 0), page_count - 1)
+
+    inicio = page_current * page_size
+    if len(criterios) == 1:
+        # Uma única coluna: seleção parcial das linhas até o fim da página pedida
+        coluna, crescente = criterios[0]
+        chave = chave_numerica(df[coluna].values)
+        selecionar = menores_posicoes if crescente else maiores_posicoes
+        posicoes = selecionar(chave, inicio + page_size)[inicio:]
+        return df.iloc[posicoes], total, page_count, page_current
+
+    colunas = [coluna for coluna, _ in criterios]
+    crescente = [asc for _, asc in criterios]
+    df = df.sort_values(colunas, ascending=crescente, kind='stable')
+    return df.iloc[inicio:inicio + page_size], total, page_count, page_current
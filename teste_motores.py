@@ -0,0 +1,121 @@
+# Paridade dos motores de consulta (consultas.py)
+# Para combinações de filtros sorteadas, mapa, série, top 10, pizza, tabela e
+# métricas montados com o cubo, com pandas e com o DuckDB (se instalado)
+# precisam ser idênticos, byte a byte no JSON enviado ao navegador. Roda nos
+# dados reais e em uma tabela de fatos sintética com vários registros por
+# célula e lacunas de anos/estados.
+#
+# Execute a partir da raiz do projeto:
+#   python teste_motores.py
+
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import app
+from consultas import MotorDuckDB, MotorPandas, duckdb
+from cubo import CuboProducao
+from dados import DadosProducao
+from recarga import BaseDados
+
+def dados_fragmentados(dados, seed=42):
+    """Cada célula estado × ano dividida em vários registros, com ~10% das células removidas"""
+    rng = np.random.default_rng(seed)
+    fatos = dados.fatos[rng.random(len(dados.fatos)) > 0.1]
+    partes = rng.integers(1, 6, len(fatos))
+    producao = np.repeat(fatos['producao'].to_numpy(), partes)
+    fracao = rng.integers(0, 1000, len(producao))
+    # Divide cada valor em partes inteiras que somam exatamente o original
+    grupo = np.repeat(np.arange(len(fatos)), partes)
+    peso = fracao / np.bincount(grupo, weights=fracao, minlength=len(fatos)).clip(1)[grupo]
+    valores = np.floor(producao * peso).astype(np.int64)
+    ultimo = np.cumsum(partes) - 1
+    valores[ultimo] += fatos['producao'].to_numpy() - np.bincount(grupo, weights=valores).astype(np.int64)
+    fragmentos = pd.DataFrame({'ano': np.repeat(fatos['ano'].to_numpy(), partes),
+                               'estado_id': np.repeat(fatos['estado_id'].to_numpy(), partes),
+                               'producao': valores})
+    return DadosProducao(fragmentos.sample(frac=1, random_state=seed).reset_index(drop=True),
+                         dados.estados, dados.regioes, f'{dados.versao}-fragmentado')
+
+
+def combinacoes_filtros(base, quantidade=60, seed=42):
+    rng = np.random.default_rng(seed)
+    anos = base.anos
+    combinacoes = [((anos[0], anos[-1]), [], []),               # tudo
+                   ((anos[0] - 10, anos[0] - 5), [], []),       # janela antes dos dados
+                   ((anos[-1] - 2, anos[-1] + 10), [], []),     # janela além dos dados
+                   ((anos[0], anos[-1]), ['Inexistente'], [])]  # seleção vazia
+    for _ in range(quantidade):
+        inicio = int(rng.integers(anos[0], anos[-1] + 1))
+        janela = (inicio, int(rng.integers(inicio, anos[-1] + 1)))
+        regioes = list(rng.choice(base.regioes, rng.integers(0, 3), replace=False))
+        estados = list(rng.choice(base.estados, rng.integers(0, 2) * rng.integers(1, 6),
+                                  replace=False))
+        combinacoes.append((janela, regioes, estados))
+    return combinacoes
+
+
+def saidas(filtros):
+    """JSON de todas as saídas do dashboard para uma combinação de filtros"""
+    app.cache_agregados.limpar()
+    nivel = min(app.urls_geojson)
+    return pio.json.to_json_plotly([
+        app.criar_mapa(*filtros, 'bootstrap', 'bubbles', nivel),
+        app.criar_mapa(*filtros, 'bootstrap', 'choropleth', nivel),
+        app.criar_serie_temporal(*filtros, 'bootstrap'),
+        app.criar_top_estados(*filtros, 'bootstrap'),
+        app.criar_distribuicao_regiao(*filtros, 'bootstrap'),
+        app.criar_tabela(*filtros, 'producao', 0, 100, [], ''),
+        app.obter_agregado(*filtros).metricas
+    ])
+
+
+def comparar(nome, dados, diretorio_parquet):
+    cubo = CuboProducao(dados)
+    motores = {'cubo': cubo, 'pandas': MotorPandas(dados)}
+    if duckdb is not None:
+        motores['duckdb'] = MotorDuckDB(dados, diretorio_parquet)
+
+    resultados = {}
+    for motor, instancia in motores.items():
+        app.recarregador.atual = base = BaseDados(dados, cubo, motor=instancia)
+        resultados[motor] = [saidas(filtros) for filtros in combinacoes_filtros(base)]
+
+    falhas = 0
+    for motor in motores:
+        diferentes = sum(a != b for a, b in zip(resultados['cubo'], resultados[motor]))
+        if diferentes:
+            print(f"❌ {nome} - {motor}: {diferentes} de {len(resultados[motor])} combinações diferem do cubo")
+        else:
+            print(f"✅ {nome} - {motor}: {len(resultados[motor])} combinações idênticas")
+        falhas += diferentes
+    return falhas
+
+
+def main():
+    """Número de combinações em que algum motor diverge do cubo"""
+    print("🧪 Comparando os motores de consulta...")
+    print("=" * 50)
+
+    base_original = app.recarregador.atual
+    try:
+        with tempfile.TemporaryDirectory() as diretorio_parquet:
+            falhas = comparar('dados reais', base_original.dados, diretorio_parquet)
+            falhas += comparar('fatos fragmentados', dados_fragmentados(base_original.dados),
+                               diretorio_parquet)
+    finally:
+        app.recarregador.atual = base_original
+
+    if duckdb is None:
+        print("⚠️  duckdb não instalado: motor DuckDB não comparado (pip install duckdb)")
+
+    print("=" * 50)
+    print("❌ Motores divergentes!" if falhas else "✅ Todos os motores retornam as mesmas figuras!")
+    return falhas
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)